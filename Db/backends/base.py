@@ -0,0 +1,235 @@
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+import logging
+
+from config import SIMHASH_MAX_DISTANCE
+from Db.codec import decode_content
+from utils.simhash import band_values, hamming
+
+logger = logging.getLogger('clipboard_manager')
+
+#? Timeline key sorting after every row, used to fetch the first page
+TIMELINE_START = ("9999-12-31 23:59:59", 2**63 - 1)
+
+
+class StorageBackend(ABC):
+    """
+    What the app needs from clipboard_history.db, independent of the driver.
+
+    Implementations: Db.repository.ClipboardRepository (QtSql, used by the GUI)
+    and Db.backends.sqlite_backend.SqliteBackend (stdlib sqlite3, no Qt needed).
+    Both run the SQL constants from Db/sql_queries. Failures are logged and
+    reported through return values (None / False / empty result), never raised.
+    """
+
+    #? Explicit transactions, the caller decides what is atomic
+
+    @abstractmethod
+    def begin(self):
+        """Start a transaction, returns success"""
+
+    @abstractmethod
+    def commit(self):
+        """Commit the open transaction, returns success"""
+
+    @abstractmethod
+    def rollback(self):
+        """Roll back the open transaction"""
+
+    @contextmanager
+    def transaction(self):
+        """
+        with backend.transaction() as ok: ...
+        Commits when the block finishes, rolls back if it raises.
+        `ok` is False when the transaction could not be started.
+        """
+        ok = self.begin()
+        try:
+            yield ok
+        except Exception:
+            if ok:
+                self.rollback()
+            raise
+        if ok and not self.commit():
+            self.rollback()
+
+    #? Raw statements, used by the migrations and by one-off tools
+
+    @abstractmethod
+    def execute(self, sql, params=None):
+        """Run one statement, returns its rows as a list of tuples or None on failure"""
+
+    @abstractmethod
+    def executemany(self, sql, params_seq):
+        """Run one statement once per parameter set, returns success"""
+
+    def schema_version(self):
+        rows = self.execute("PRAGMA user_version")
+        return int(rows[0][0]) if rows else 0
+
+    #? Clipboard history
+
+    @abstractmethod
+    def insert_items(self, contents, codecs, hashes, kinds, simhashes, timestamps, dates, count_repeats=True):
+        """
+        Insert many raw clips (one list per column). A text is stored once in contents,
+        and once per day in occurrences: a repeat on the same day counts one more copy
+        there, or is skipped without `count_repeats` (bulk import).
+        `kinds` are utils.content_kind values, stored with the text's length,
+        `simhashes` utils.simhash fingerprints.
+        """
+
+    @abstractmethod
+    def insert_compressed_item(self, value, codec, content_hash, kind, simhash, timestamp, date, text,
+                               count_repeats=True):
+        """Insert one compressed clip, indexing its original `text` the first time it is stored"""
+
+    @abstractmethod
+    def insert_occurrences(self, hashes, timestamps, dates, count_repeats=True):
+        """Add occurrences of texts already in contents, repeats per (content_hash, date) as for insert_items"""
+
+    @abstractmethod
+    def insert_blob_item(self, text, mime_type, blob_hash, content_hash, kind, timestamp, date, count_repeats=True):
+        """Insert one clip kept in the blob store, `text` is its description"""
+
+    @abstractmethod
+    def load_day_items(self, date):
+        """[(text, mime_type, blob_hash, content_hash, kind), ...] saved on `date` (YYYY-MM-DD), oldest first"""
+
+    def load_day(self, date):
+        """Texts saved on `date` (YYYY-MM-DD), oldest first"""
+        return [item[0] for item in self.load_day_items(date)]
+
+    @abstractmethod
+    def load_content(self, content_hash):
+        """The stored text with this hash, None if there is none"""
+
+    @abstractmethod
+    def load_timeline_page(self, limit, before=TIMELINE_START, kind=None):
+        """
+        [(id, timestamp, content, date, simhash), ...] newest first, keyset-paginated on
+        (timestamp, id), only clips of contents.kind `kind` if given. simhash is None for
+        blob store payloads and texts not fingerprinted yet. content is None for a clip that
+        could not be decoded (logged), it is still returned so the next page continues after it.
+        """
+
+    @abstractmethod
+    def export_page(self, after_id, limit):
+        """
+        [(id, content, content_hash, timestamp, date, mime_type, blob_hash, kind), ...]
+        for the next `limit` occurrences by id
+        """
+
+    @abstractmethod
+    def month_summary(self, year, month):
+        """{day: (item_count, bytes)} for the days of year/month that have clips"""
+
+    @abstractmethod
+    def search(self, match_expression, limit, kind=None):
+        """
+        [(content, date, mime_type, blob_hash), ...] for an FTS5 MATCH expression, best first,
+        only of `kind` if given. blob_hash is None unless the clip is kept in the blob store.
+        """
+
+    @abstractmethod
+    def kind_counts(self):
+        """{kind: (distinct clips, characters)} over the whole history"""
+
+    @abstractmethod
+    def unclassified_contents(self, after_id, limit):
+        """[(id, text, mime_type), ...] for the next `limit` stored texts by id that have no kind yet"""
+
+    @abstractmethod
+    def set_kinds(self, kinds):
+        """Store [(id, kind, length), ...], returns success"""
+
+    @abstractmethod
+    def near_duplicate_candidates(self, bands):
+        """[(content_hash, simhash), ...] of the texts sharing a band value with utils.simhash.band_values()"""
+
+    def near_duplicates(self, fingerprint, max_distance=SIMHASH_MAX_DISTANCE):
+        """
+        [(content_hash, distance), ...] of the texts whose fingerprints are within
+        `max_distance` bits of `fingerprint`, closest first (the text itself included)
+        """
+        matches = []
+        for content_hash, simhash in self.near_duplicate_candidates(band_values(fingerprint)):
+            distance = hamming(fingerprint, simhash)
+            if distance <= max_distance:
+                matches.append((content_hash, distance))
+        return sorted(matches, key=lambda match: match[1])
+
+    @abstractmethod
+    def content_simhash(self, content_hash):
+        """Fingerprint of the stored text with this hash, None if it has none"""
+
+    @abstractmethod
+    def unfingerprinted_contents(self, after_id, limit):
+        """[(id, text), ...] for the next `limit` stored texts by id that have no fingerprint yet"""
+
+    @abstractmethod
+    def set_simhashes(self, fingerprints):
+        """Store [(id, simhash), ...], returns success"""
+
+    @abstractmethod
+    def copy_count(self, content_hash):
+        """How many times the text with this hash was copied, over all days"""
+
+    @abstractmethod
+    def stored_kind(self, content_hash):
+        """Kind (utils.content_kind) of the stored text with this hash, None if it was never stored"""
+
+    @abstractmethod
+    def content_hashes(self, after_id, limit):
+        """[(id, content_hash), ...] for the next `limit` stored texts by id"""
+
+    @abstractmethod
+    def day_hashes(self, date):
+        """{content_hash: content id} for the texts copied on `date`"""
+
+    @abstractmethod
+    def history_totals(self):
+        """(item_count, bytes) over the whole history, a text counts once per day it was copied on"""
+
+    @abstractmethod
+    def oldest_items(self, limit, before="9999-12-31"):
+        """Ids of the oldest occurrences dated before `before`"""
+
+    @abstractmethod
+    def delete_items(self, items):
+        """
+        Delete occurrences returned by oldest_items, and texts left without any.
+        The caller owns the transaction.
+        """
+
+    @abstractmethod
+    def referenced_blobs(self):
+        """Set of blob_hash values still referenced by contents, None on failure"""
+
+    @abstractmethod
+    def load_dictionaries(self):
+        """Register every stored compression dictionary, returns their ids oldest first"""
+
+    @abstractmethod
+    def save_dictionary(self, data):
+        """Store and register a compression dictionary, returns its id or None on failure"""
+
+    @abstractmethod
+    def sample_contents(self, limit):
+        """Most recent uncompressed clips, used to train a compression dictionary"""
+
+    @abstractmethod
+    def close(self):
+        """Release the statements/connection held for the calling thread"""
+
+    def _decode(self, codec, value):
+        try:
+            return decode_content(codec, value)
+        except ValueError:
+            # Dictionary written by another connection/process, load them and retry once
+            self.load_dictionaries()
+        try:
+            return decode_content(codec, value)
+        except Exception as e:
+            logger.error(f"Could not decode {codec} clip: {e}")
+            return None
@@ -0,0 +1,373 @@
+import os
+import sqlite3
+import threading
+import logging
+from urllib.request import pathname2url
+
+from config import DATABASE_PATH, SQLITE_BUSY_TIMEOUT_MS
+from Db.backends.base import StorageBackend, TIMELINE_START
+from Db.codec import register_dictionary
+from Db.sql_queries.sql_command_for_connection import CONNECTION_PRAGMAS, READ_ONLY_PRAGMAS
+from Db.sql_queries.sql_command_for_data_insertion import (
+    SQL_INSERT_CONTENT,
+    SQL_INSERT_OCCURRENCE,
+    SQL_INSERT_OCCURRENCE_ONCE,
+    SQL_INDEX_COMPRESSED_CONTENT,
+    SQL_INSERT_BLOB_CONTENT,
+)
+from Db.sql_queries.sql_command_for_compression import (
+    SQL_LOAD_COMPRESSION_DICTIONARIES,
+    SQL_SAVE_COMPRESSION_DICTIONARY,
+    SQL_SAMPLE_CONTENTS,
+)
+from Db.sql_queries.sql_command_for_load_histories import (
+    SQL_QUERY_FOR_LOAD_HISTORIES,
+    SQL_LOAD_CONTENT,
+    SQL_COPY_COUNT,
+)
+from Db.sql_queries.sql_command_for_load_alltime_histories import SQL_LOAD_TIMELINE_PAGE, SQL_LOAD_TIMELINE_PAGE_BY_KIND
+from Db.sql_queries.sql_command_for_month_navigation import SQL_MONTH_SUMMARY
+from Db.sql_queries.sql_command_for_search import SQL_SEARCH_HISTORY, SQL_SEARCH_HISTORY_BY_KIND
+from Db.sql_queries.sql_command_for_transfer import SQL_EXPORT_ITEMS
+from Db.sql_queries.sql_command_for_dedupe import SQL_CONTENT_HASHES, SQL_DAY_CONTENT_HASHES, SQL_STORED_KIND
+from Db.sql_queries.sql_command_for_content_kinds import (
+    SQL_KIND_COUNTS,
+    SQL_UNCLASSIFIED_CONTENTS,
+    SQL_SET_KIND,
+)
+from Db.sql_queries.sql_command_for_near_duplicates import (
+    SQL_NEAR_DUPLICATE_CANDIDATES,
+    SQL_CONTENT_SIMHASH,
+    SQL_UNFINGERPRINTED_CONTENTS,
+    SQL_SET_SIMHASH,
+)
+from Db.sql_queries.sql_command_for_retention import (
+    SQL_HISTORY_TOTALS,
+    SQL_OLDEST_ITEMS,
+    SQL_DELETE_ITEM,
+    SQL_ORPHANED_COMPRESSED_CONTENTS,
+    SQL_UNINDEX_COMPRESSED_CONTENT,
+    SQL_DELETE_CONTENT,
+    SQL_REFERENCED_BLOBS,
+)
+
+logger = logging.getLogger('clipboard_manager')
+
+
+class SqliteBackend(StorageBackend):
+    """
+    StorageBackend on the stdlib sqlite3 module, usable without Qt.
+
+    Every thread gets its own connection on first use (sqlite3 connections
+    must stay on the thread that opened them), with the same pragmas as the
+    Qt connections. Connections run in autocommit mode, so nothing is held
+    open between statements unless begin() was called.
+
+    `read_only` opens the file with mode=ro and only READ_ONLY_PRAGMAS, so
+    reading never converts it to WAL or changes its header; every write fails.
+    """
+
+    def __init__(self, database_path=DATABASE_PATH, read_only=False):
+        self.database_path = database_path
+        self.read_only = read_only
+        self._local = threading.local()
+
+    @property
+    def connection(self):
+        """The calling thread's connection, opened on first use"""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            database, pragmas = self.database_path, CONNECTION_PRAGMAS
+            if self.read_only:
+                database = f"file:{pathname2url(os.path.abspath(self.database_path))}?mode=ro"
+                pragmas = READ_ONLY_PRAGMAS
+            connection = sqlite3.connect(
+                database,
+                timeout=SQLITE_BUSY_TIMEOUT_MS / 1000,
+                isolation_level=None,
+                # The prepared statement cache is per connection, keep every app query in it
+                cached_statements=256,
+                uri=self.read_only,
+            )
+            for pragma in pragmas:
+                try:
+                    connection.execute(pragma).fetchall()
+                except sqlite3.Error as e:
+                    logger.error(f"{pragma} failed: {e}")
+            self._local.connection = connection
+        return connection
+
+    def close(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+    def begin(self):
+        try:
+            self.connection.execute("BEGIN")
+            return True
+        except sqlite3.Error as e:
+            logger.error(f"Could not start a transaction: {e}")
+            return False
+
+    def commit(self):
+        try:
+            self.connection.execute("COMMIT")
+            return True
+        except sqlite3.Error as e:
+            logger.error(f"Commit failed: {e}")
+            return False
+
+    def rollback(self):
+        if self.connection.in_transaction:
+            self.connection.execute("ROLLBACK")
+
+    def _run(self, name, sql, params=()):
+        """Execute one statement, returns the cursor or None on failure"""
+        try:
+            return self.connection.execute(sql, params)
+        except sqlite3.Error as e:
+            logger.error(f"{name} failed: {e}")
+            return None
+
+    def execute(self, sql, params=None):
+        cursor = self._run("Statement", sql, params or ())
+        return None if cursor is None else cursor.fetchall()
+
+    def executemany(self, sql, params_seq):
+        try:
+            self.connection.executemany(sql, params_seq)
+            return True
+        except sqlite3.Error as e:
+            logger.error(f"Batch statement failed: {e}")
+            return False
+
+    def insert_items(self, contents, codecs, hashes, kinds, simhashes, timestamps, dates, count_repeats=True):
+        return self.executemany(SQL_INSERT_CONTENT, [
+            {
+                "content_hash": item_hash,
+                "content": content,
+                "codec": codec,
+                "kind": kind,
+                "length": len(content),
+                "simhash": simhash,
+            }
+            for content, codec, item_hash, kind, simhash in zip(contents, codecs, hashes, kinds, simhashes)
+        ]) and self.insert_occurrences(hashes, timestamps, dates, count_repeats)
+
+    def insert_occurrences(self, hashes, timestamps, dates, count_repeats=True):
+        return self.executemany(SQL_INSERT_OCCURRENCE if count_repeats else SQL_INSERT_OCCURRENCE_ONCE, [
+            {"timestamp": timestamp, "date": date, "content_hash": item_hash}
+            for item_hash, timestamp, date in zip(hashes, timestamps, dates)
+        ])
+
+    def insert_compressed_item(self, value, codec, content_hash, kind, simhash, timestamp, date, text,
+                               count_repeats=True):
+        cursor = self._run("insert_compressed_content", SQL_INSERT_CONTENT, {
+            "content_hash": content_hash,
+            "content": value,
+            "codec": codec,
+            "kind": kind,
+            "length": len(text),
+            "simhash": simhash,
+        })
+        if cursor is None:
+            return False
+        # Copied before, the text and its index entry already exist
+        if cursor.rowcount > 0 and self._run("index_compressed_content", SQL_INDEX_COMPRESSED_CONTENT, {
+            "id": cursor.lastrowid,
+            "content": text,
+        }) is None:
+            return False
+        return self._insert_occurrence(content_hash, timestamp, date, count_repeats)
+
+    def insert_blob_item(self, text, mime_type, blob_hash, content_hash, kind, timestamp, date, count_repeats=True):
+        return self._run("insert_blob_content", SQL_INSERT_BLOB_CONTENT, {
+            "content_hash": content_hash,
+            "content": text,
+            "mime_type": mime_type,
+            "blob_hash": blob_hash,
+            "kind": kind,
+            "length": len(text),
+        }) is not None and self._insert_occurrence(content_hash, timestamp, date, count_repeats)
+
+    def _insert_occurrence(self, content_hash, timestamp, date, count_repeats):
+        sql = SQL_INSERT_OCCURRENCE if count_repeats else SQL_INSERT_OCCURRENCE_ONCE
+        return self._run("insert_occurrence", sql, {
+            "timestamp": timestamp,
+            "date": date,
+            "content_hash": content_hash,
+        }) is not None
+
+    def load_day_items(self, date):
+        cursor = self._run("load_day", SQL_QUERY_FOR_LOAD_HISTORIES, {"date": date})
+        if cursor is None:
+            return []
+        items = [
+            (self._decode(codec, value), mime_type, blob_hash, item_hash, kind)
+            for value, codec, mime_type, blob_hash, item_hash, kind in cursor
+        ]
+        return [item for item in items if item[0] is not None]
+
+    def load_content(self, content_hash):
+        cursor = self._run("load_content", SQL_LOAD_CONTENT, {"content_hash": content_hash})
+        row = None if cursor is None else cursor.fetchone()
+        return self._decode(row[1], row[0]) if row else None
+
+    def load_timeline_page(self, limit, before=TIMELINE_START, kind=None):
+        before_timestamp, before_id = before
+        params = {"before_timestamp": before_timestamp, "before_id": before_id, "limit": limit}
+        if kind is None:
+            cursor = self._run("load_timeline_page", SQL_LOAD_TIMELINE_PAGE, params)
+        else:
+            cursor = self._run("load_timeline_page_by_kind", SQL_LOAD_TIMELINE_PAGE_BY_KIND, {**params, "kind": kind})
+        if cursor is None:
+            return []
+        return [
+            (item_id, timestamp, self._decode(codec, value), date, simhash)
+            for item_id, timestamp, value, codec, date, simhash in cursor
+        ]
+
+    def export_page(self, after_id, limit):
+        cursor = self._run("export_page", SQL_EXPORT_ITEMS, {"after_id": after_id, "limit": limit})
+        if cursor is None:
+            return []
+        return [
+            (item_id, self._decode(codec, value), item_hash, timestamp, date, mime_type, blob_hash, kind)
+            for item_id, value, codec, item_hash, timestamp, date, mime_type, blob_hash, kind in cursor
+        ]
+
+    def month_summary(self, year, month):
+        next_year, next_month = (year + 1, 1) if month == 12 else (year, month + 1)
+        cursor = self._run("month_summary", SQL_MONTH_SUMMARY, {
+            "month_start": f"{year}-{month:02d}-01",
+            "month_end": f"{next_year}-{next_month:02d}-01",
+        })
+        if cursor is None:
+            return {}
+        return {
+            day: (item_count, total_bytes)
+            for day, item_count, total_bytes in cursor
+            if day and item_count
+        }
+
+    def near_duplicate_candidates(self, bands):
+        cursor = self._run("near_duplicate_candidates", SQL_NEAR_DUPLICATE_CANDIDATES, {
+            f"band{index}": value for index, value in enumerate(bands)
+        })
+        return [] if cursor is None else cursor.fetchall()
+
+    def content_simhash(self, content_hash):
+        cursor = self._run("content_simhash", SQL_CONTENT_SIMHASH, {"content_hash": content_hash})
+        row = None if cursor is None else cursor.fetchone()
+        return row[0] if row else None
+
+    def unfingerprinted_contents(self, after_id, limit):
+        cursor = self._run("unfingerprinted_contents", SQL_UNFINGERPRINTED_CONTENTS, {
+            "after_id": after_id,
+            "limit": limit,
+        })
+        if cursor is None:
+            return []
+        return [(content_id, self._decode(codec, value)) for content_id, value, codec in cursor]
+
+    def set_simhashes(self, fingerprints):
+        return self.executemany(SQL_SET_SIMHASH, [
+            {"id": content_id, "simhash": simhash} for content_id, simhash in fingerprints
+        ])
+
+    def copy_count(self, content_hash):
+        cursor = self._run("copy_count", SQL_COPY_COUNT, {"content_hash": content_hash})
+        return 0 if cursor is None else cursor.fetchone()[0]
+
+    def stored_kind(self, content_hash):
+        cursor = self._run("stored_kind", SQL_STORED_KIND, {"content_hash": content_hash})
+        row = None if cursor is None else cursor.fetchone()
+        return row[0] if row else None
+
+    def content_hashes(self, after_id, limit):
+        cursor = self._run("content_hashes", SQL_CONTENT_HASHES, {"after_id": after_id, "limit": limit})
+        return [] if cursor is None else cursor.fetchall()
+
+    def day_hashes(self, date):
+        cursor = self._run("day_hashes", SQL_DAY_CONTENT_HASHES, {"date": date})
+        return {} if cursor is None else dict(cursor)
+
+    def history_totals(self):
+        cursor = self._run("history_totals", SQL_HISTORY_TOTALS)
+        return (0, 0) if cursor is None else cursor.fetchone()
+
+    def search(self, match_expression, limit, kind=None):
+        params = {"query": match_expression, "limit": limit}
+        if kind is None:
+            cursor = self._run("search", SQL_SEARCH_HISTORY, params)
+        else:
+            cursor = self._run("search_by_kind", SQL_SEARCH_HISTORY_BY_KIND, {**params, "kind": kind})
+        if cursor is None:
+            return []
+        rows = [
+            (self._decode(codec, value), date, mime_type, blob_hash)
+            for value, codec, date, mime_type, blob_hash in cursor
+        ]
+        return [row for row in rows if row[0] is not None]
+
+    def oldest_items(self, limit, before="9999-12-31"):
+        cursor = self._run("oldest_items", SQL_OLDEST_ITEMS, {"before": before, "limit": limit})
+        return [] if cursor is None else [item_id for item_id, in cursor]
+
+    def delete_items(self, items):
+        if not self.executemany(SQL_DELETE_ITEM, [{"id": item_id} for item_id in items]):
+            return False
+        cursor = self._run("orphaned_compressed_contents", SQL_ORPHANED_COMPRESSED_CONTENTS)
+        if cursor is None:
+            return False
+        orphans = cursor.fetchall()
+        for content_id, codec, value in orphans:
+            text = self._decode(codec, value)
+            if text is not None and self._run("unindex_compressed_content", SQL_UNINDEX_COMPRESSED_CONTENT, {
+                "id": content_id,
+                "content": text,
+            }) is None:
+                return False
+        return self.executemany(SQL_DELETE_CONTENT, [{"id": content_id} for content_id, _, _ in orphans])
+
+    def kind_counts(self):
+        cursor = self._run("kind_counts", SQL_KIND_COUNTS)
+        return {} if cursor is None else {kind: (count, length) for kind, count, length in cursor}
+
+    def unclassified_contents(self, after_id, limit):
+        cursor = self._run("unclassified_contents", SQL_UNCLASSIFIED_CONTENTS, {
+            "after_id": after_id,
+            "limit": limit,
+        })
+        if cursor is None:
+            return []
+        return [
+            (content_id, self._decode(codec, value), mime_type)
+            for content_id, value, codec, mime_type in cursor
+        ]
+
+    def set_kinds(self, kinds):
+        return self.executemany(SQL_SET_KIND, [
+            {"id": content_id, "kind": kind, "length": length} for content_id, kind, length in kinds
+        ])
+
+    def referenced_blobs(self):
+        cursor = self._run("referenced_blobs", SQL_REFERENCED_BLOBS)
+        return None if cursor is None else {blob_hash for blob_hash, in cursor}
+
+    def load_dictionaries(self):
+        cursor = self._run("load_dictionaries", SQL_LOAD_COMPRESSION_DICTIONARIES)
+        if cursor is None:
+            return []
+        return [register_dictionary(data) for _, data in cursor]
+
+    def save_dictionary(self, data):
+        key = register_dictionary(data)
+        cursor = self._run("save_dictionary", SQL_SAVE_COMPRESSION_DICTIONARY, {"id": key, "data": data})
+        return key if cursor is not None else None
+
+    def sample_contents(self, limit):
+        cursor = self._run("sample_contents", SQL_SAMPLE_CONTENTS, {"limit": limit})
+        return [] if cursor is None else [content for content, in cursor]
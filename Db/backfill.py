@@ -0,0 +1,128 @@
+import threading
+import time
+import logging
+
+from config import BACKFILL_BATCH_SIZE
+from utils.content_kind import classify
+from utils.simhash import simhash
+
+logger = logging.getLogger('clipboard_manager')
+
+#? Let startup finish before the first batch
+BACKFILL_INITIAL_DELAY_S = 10
+#? Pause between batches so the writer can take the lock
+BACKFILL_BATCH_PAUSE_S = 0.05
+
+
+class ContentBackfill(threading.Thread):
+    """
+    Fills in what texts saved by an older version lack, once, in the background:
+    the utils.content_kind kind and length added by migration v11, then the
+    utils.simhash fingerprint added by v12. Clips saved since then get both from
+    the writer, so a pass that finds nothing left is the last one.
+
+    Contents are walked forward by id, `batch_size` rows per transaction with a
+    pause in between, so the write lock is never held for long and a restart
+    resumes where the partial indexes of missing rows leave off. Blob store
+    payloads (images, file lists) are classified by their MIME type but never
+    fingerprinted: their text is only a description, idx_contents_unfingerprinted
+    and the query skip them.
+
+    Runs on its own QtSql connection unless `backend` is given, as for ClipboardWriter.
+    """
+
+    def __init__(self, batch_size=BACKFILL_BATCH_SIZE,
+                 initial_delay_s=BACKFILL_INITIAL_DELAY_S, backend=None):
+        super().__init__(name="clipboard-backfill", daemon=True)
+        self.batch_size = batch_size
+        self.initial_delay = initial_delay_s
+        self.backend = backend
+        self._stop_event = threading.Event()
+        self.items_classified = 0
+        self.items_fingerprinted = 0
+
+    def stop(self):
+        self._stop_event.set()
+        if self.is_alive():
+            self.join()
+
+    def run(self):
+        if self._stop_event.wait(self.initial_delay):
+            return
+
+        if self.backend is not None:
+            repository = self.backend
+        else:
+            # Imported here so a backfill given a stdlib backend never loads QtSql
+            from Db.database import thread_connection_name
+            from Db.repository import get_repository
+            repository = get_repository(thread_connection_name())
+        if not repository:
+            logger.error("Backfill could not open the database")
+            return
+
+        self.classify_kinds(repository)
+        self.fingerprint(repository)
+
+        del repository
+        if self.backend is not None:
+            self.backend.close()
+        else:
+            from Db.database import close_thread_connection
+            close_thread_connection()
+
+    def classify_kinds(self, repository):
+        """Work out kind and length of texts that have none yet, returns how many were"""
+        started = time.perf_counter()
+        classified = self._walk(
+            repository,
+            repository.unclassified_contents,
+            lambda rows: [
+                (content_id, classify(text, mime_type), len(text))
+                for content_id, text, mime_type in rows if text is not None
+            ],
+            repository.set_kinds,
+        )
+        self.items_classified += classified
+        if classified:
+            logger.info(f"Classified {classified} clips in {(time.perf_counter() - started) * 1000:.0f} ms")
+        return classified
+
+    def fingerprint(self, repository):
+        """Fingerprint texts that have no simhash yet, returns how many were"""
+        started = time.perf_counter()
+        fingerprinted = self._walk(
+            repository,
+            repository.unfingerprinted_contents,
+            lambda rows: [(content_id, simhash(text)) for content_id, text in rows if text is not None],
+            repository.set_simhashes,
+        )
+        self.items_fingerprinted += fingerprinted
+        if fingerprinted:
+            logger.info(f"Fingerprinted {fingerprinted} clips in {(time.perf_counter() - started) * 1000:.0f} ms")
+        return fingerprinted
+
+    def _walk(self, repository, fetch, compute, store):
+        """
+        fetch(after_id, limit) rows forward by id, store(compute(rows)) one transaction
+        per batch. Texts that cannot be decoded are left out by compute() and stay as
+        they are, after_id moves past them. Returns how many rows were stored.
+        """
+        done = 0
+        after_id = 0
+        while not self._stop_event.is_set():
+            rows = fetch(after_id, self.batch_size)
+            if not rows:
+                break
+            after_id = rows[-1][0]
+            values = compute(rows)
+
+            if not repository.begin():
+                break
+            if not store(values) or not repository.commit():
+                logger.error("Backfill batch failed")
+                repository.rollback()
+                break
+            done += len(values)
+            self._stop_event.wait(BACKFILL_BATCH_PAUSE_S)
+        return done
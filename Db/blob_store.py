@@ -0,0 +1,94 @@
+import hashlib
+import os
+import time
+import logging
+
+from config import BLOB_STORE_PATH
+
+logger = logging.getLogger('clipboard_manager')
+
+#? Value of contents.mime_type, plain text clips keep their text in contents.content
+MIME_TEXT = "text/plain"
+MIME_HTML = "text/html"
+MIME_URI_LIST = "text/uri-list"
+MIME_PNG = "image/png"
+
+#? Files younger than this are never garbage collected, their row may not be committed yet
+_GC_GRACE_S = 3600
+
+
+class BlobStore:
+    """
+    Content-addressed files for clipboard payloads that are not plain text.
+
+    A payload is stored once as <root>/<first two hex digits>/<sha256>, so a
+    repeated copy only costs the hash. Writes go to a temporary file that is
+    renamed into place, readers never see a partial blob. Thumbnails are
+    cached under <root>/thumbs. Failures are logged and return None/False.
+    """
+
+    def __init__(self, root=BLOB_STORE_PATH):
+        self.root = root
+
+    def path(self, blob_hash):
+        return os.path.join(self.root, blob_hash[:2], blob_hash)
+
+    def thumbnail_path(self, blob_hash, size):
+        return os.path.join(self.root, "thumbs", f"{blob_hash}-{size}.png")
+
+    def exists(self, blob_hash):
+        return os.path.exists(self.path(blob_hash))
+
+    def put(self, data):
+        """Store `data`, returns its hash (the blob's name) or None on failure"""
+        blob_hash = hashlib.sha256(data).hexdigest()
+        path = self.path(blob_hash)
+        if os.path.exists(path):
+            return blob_hash
+        temporary = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(temporary, "wb") as out:
+                out.write(data)
+            os.replace(temporary, path)
+        except OSError as e:
+            logger.error(f"Could not store blob {blob_hash}: {e}")
+            return None
+        return blob_hash
+
+    def read(self, blob_hash):
+        try:
+            with open(self.path(blob_hash), "rb") as source:
+                return source.read()
+        except OSError as e:
+            logger.error(f"Could not read blob {blob_hash}: {e}")
+            return None
+
+    def collect_garbage(self, referenced):
+        """Delete blobs (and their thumbnails) whose hash is not in `referenced`, returns how many"""
+        if not os.path.isdir(self.root):
+            return 0
+        cutoff = time.time() - _GC_GRACE_S
+        removed = set()
+        for entry in os.scandir(self.root):
+            if not entry.is_dir() or len(entry.name) != 2:
+                continue
+            for blob in os.scandir(entry.path):
+                if blob.name in referenced or blob.name.endswith(".tmp"):
+                    continue
+                try:
+                    if blob.stat().st_mtime < cutoff:
+                        os.remove(blob.path)
+                        removed.add(blob.name)
+                except OSError as e:
+                    logger.error(f"Could not delete blob {blob.name}: {e}")
+
+        thumbs = os.path.join(self.root, "thumbs")
+        if removed and os.path.isdir(thumbs):
+            for thumb in os.scandir(thumbs):
+                if thumb.name.split("-")[0] in removed:
+                    try:
+                        os.remove(thumb.path)
+                    except OSError:
+                        pass
+        return len(removed)
@@ -0,0 +1,90 @@
+import hashlib
+import zlib
+from collections import Counter
+
+from config import COMPRESSION_THRESHOLD_BYTES, COMPRESSION_LEVEL
+
+#? Value of contents.codec
+CODEC_RAW = "raw"
+CODEC_ZLIB = "zlib"
+#? zlib primed with a stored dictionary, the marker is followed by the dictionary id
+CODEC_ZLIB_DICT_PREFIX = "zlib-dict:"
+
+ZLIB_DICTIONARY_SIZE = 32 * 1024
+
+#? dictionary id -> bytes, filled from the compression_dictionaries table
+_dictionaries = {}
+
+
+def dictionary_id(data):
+    return hashlib.sha256(data).hexdigest()[:16]
+
+
+def register_dictionary(data):
+    """Make a dictionary available to encode/decode and return its id"""
+    data = bytes(data)
+    key = dictionary_id(data)
+    _dictionaries[key] = data
+    return key
+
+
+def encode_content(text, dictionary=None):
+    """
+    Return (codec, value) to store for `text`.
+    Small clips and clips that don't shrink by at least 10% are kept as raw text.
+    """
+    raw = text.encode('utf-8')
+    if len(raw) < COMPRESSION_THRESHOLD_BYTES:
+        return CODEC_RAW, text
+
+    if dictionary is not None:
+        compressor = zlib.compressobj(COMPRESSION_LEVEL, zdict=_dictionaries[dictionary])
+        codec = CODEC_ZLIB_DICT_PREFIX + dictionary
+    else:
+        compressor = zlib.compressobj(COMPRESSION_LEVEL)
+        codec = CODEC_ZLIB
+    compressed = compressor.compress(raw) + compressor.flush()
+
+    if len(compressed) > len(raw) * 0.9:
+        return CODEC_RAW, text
+    return codec, compressed
+
+
+def _decompressor(codec):
+    if codec == CODEC_ZLIB:
+        return zlib.decompressobj()
+    if codec.startswith(CODEC_ZLIB_DICT_PREFIX):
+        key = codec[len(CODEC_ZLIB_DICT_PREFIX):]
+        if key not in _dictionaries:
+            raise ValueError(f"Compression dictionary {key} is not loaded")
+        return zlib.decompressobj(zdict=_dictionaries[key])
+    raise ValueError(f"Unknown codec {codec!r}")
+
+
+def decode_content(codec, value):
+    """Inverse of encode_content. `value` may be str, bytes or a QByteArray."""
+    if not codec or codec == CODEC_RAW:
+        return value
+    decompressor = _decompressor(codec)
+    return (decompressor.decompress(bytes(value)) + decompressor.flush()).decode('utf-8')
+
+
+def build_zlib_dictionary(samples, size=ZLIB_DICTIONARY_SIZE):
+    """
+    Build a zlib preset dictionary from sample clips: lines that recur across
+    samples, most frequent last (zlib finds matches closest to the data fastest).
+    """
+    counts = Counter()
+    for sample in samples:
+        counts.update({line.strip() for line in sample.splitlines() if len(line.strip()) >= 8})
+
+    recurring = [line for line, count in counts.most_common() if count > 1]
+    chunks = []
+    total = 0
+    for line in recurring:
+        encoded = line.encode('utf-8') + b"\n"
+        if total + len(encoded) > size:
+            break
+        chunks.append(encoded)
+        total += len(encoded)
+    return b"".join(reversed(chunks))
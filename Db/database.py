@@ -1,11 +1,79 @@
-from PyQt5.QtSql import QSqlDatabase # type: ignore
-
-def get_db_connection():
-    db = QSqlDatabase.database()
-    if not db.isValid():
-        db = QSqlDatabase.addDatabase('QSQLITE')
-        db.setDatabaseName("clipboard_history.db")
-        if not db.open():
-            print("Failed to connect to database.")
-            return None
-    return db
\ No newline at end of file
+from PyQt5.QtSql import QSqlDatabase, QSqlQuery # type: ignore
+import threading
+import logging
+
+from config import DATABASE_PATH
+from Db.sql_queries.sql_command_for_connection import CONNECTION_PRAGMAS
+
+logger = logging.getLogger('clipboard_manager')
+
+#? Name Qt uses for the default connection (QSqlQuery() without a db argument)
+DEFAULT_CONNECTION = "qt_sql_default_connection"
+
+
+def get_db_connection(connection_name=None, database_path=DATABASE_PATH):
+    """
+    Return the open connection registered under `connection_name`
+    (the Qt default connection when None), opening it on first use.
+    `database_path` only matters for the first call with a given name.
+    """
+    if connection_name is None:
+        connection_name = DEFAULT_CONNECTION
+
+    if QSqlDatabase.contains(connection_name):
+        db = QSqlDatabase.database(connection_name)
+        if db.isOpen():
+            return db
+    else:
+        db = QSqlDatabase.addDatabase('QSQLITE', connection_name)
+        db.setDatabaseName(database_path)
+
+    if not db.open():
+        print("Failed to connect to database.")
+        logger.error(f"Failed to open {db.databaseName()}: {db.lastError().text()}")
+        return None
+
+    query = QSqlQuery(db)
+    for pragma in CONNECTION_PRAGMAS:
+        if not query.exec_(pragma):
+            logger.error(f"{pragma} failed: {query.lastError().text()}")
+    return db
+
+
+def thread_connection_name():
+    """
+    Connection name for the calling thread. Qt connections must only be used
+    from the thread that opened them, so worker threads get their own one.
+    """
+    if threading.current_thread() is threading.main_thread():
+        return DEFAULT_CONNECTION
+    return f"clipboard_thread_{threading.get_ident()}"
+
+
+def get_thread_connection():
+    return get_db_connection(thread_connection_name())
+
+
+def close_db_connection(connection_name=None, optimize=False):
+    """Close and unregister a connection, optionally running PRAGMA optimize first"""
+    if connection_name is None:
+        connection_name = DEFAULT_CONNECTION
+    if not QSqlDatabase.contains(connection_name):
+        return
+
+    # Prepared statements keep the connection busy, drop them first
+    from Db.repository import release_repository
+    release_repository(connection_name)
+
+    db = QSqlDatabase.database(connection_name, False)
+    if db.isOpen():
+        if optimize:
+            QSqlQuery(db).exec_("PRAGMA optimize")
+        db.close()
+    # Every QSqlDatabase handle must be released before removeDatabase
+    del db
+    QSqlDatabase.removeDatabase(connection_name)
+
+
+def close_thread_connection():
+    close_db_connection(thread_connection_name())
@@ -0,0 +1,209 @@
+import math
+import os
+import struct
+import threading
+import logging
+
+from config import DEDUPE_BLOOM_PATH, DEDUPE_BLOOM_CAPACITY, DEDUPE_BLOOM_ERROR_RATE
+from Db.sql_queries.sql_command_for_transfer import SQL_MAX_CONTENT_ID
+
+logger = logging.getLogger('clipboard_manager')
+
+#? File header: magic, format version, capacity, bit count, hash count, items added, highest content id covered
+_BLOOM_MAGIC = b"CLIPBLM1"
+_BLOOM_HEADER = struct.Struct("<8sIQQIQQ")
+_BLOOM_FORMAT = 1
+
+#? Stored hashes read per query while building the filter
+_BUILD_PAGE_SIZE = 10000
+
+
+class BloomFilter:
+    """
+    Bloom filter over SHA-256 hex digests (utils.content_hash).
+
+    The digest is already uniformly distributed, so the bit positions are taken
+    from it directly (double hashing on two 64-bit slices) instead of hashing again.
+    `in` never misses an added digest; while at most `capacity` digests were added
+    a hit is wrong with about `error_rate` probability.
+    """
+
+    def __init__(self, capacity=DEDUPE_BLOOM_CAPACITY, error_rate=DEDUPE_BLOOM_ERROR_RATE):
+        self.capacity = capacity
+        self.bit_count = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.bit_count / capacity * math.log(2)))
+        self.bits = bytearray((self.bit_count + 7) // 8)
+        self.count = 0
+
+    def _positions(self, digest):
+        first = int(digest[:16], 16)
+        step = int(digest[16:32], 16) | 1
+        return [(first + i * step) % self.bit_count for i in range(self.hash_count)]
+
+    def add(self, digest):
+        """Set the digest's bits, counted only if it was not (apparently) in the filter already"""
+        bits = self.bits
+        new = False
+        for position in self._positions(digest):
+            mask = 1 << (position & 7)
+            if not bits[position >> 3] & mask:
+                bits[position >> 3] |= mask
+                new = True
+        if new:
+            self.count += 1
+
+    def __contains__(self, digest):
+        bits = self.bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(digest))
+
+    def is_full(self):
+        return self.count > self.capacity
+
+    def save(self, path, max_id):
+        """Write the filter atomically, `max_id` is the highest content id it covers"""
+        temporary = path + ".tmp"
+        with open(temporary, "wb") as out:
+            out.write(_BLOOM_HEADER.pack(
+                _BLOOM_MAGIC, _BLOOM_FORMAT, self.capacity,
+                self.bit_count, self.hash_count, self.count, max_id,
+            ))
+            out.write(self.bits)
+        os.replace(temporary, path)
+
+    @classmethod
+    def load(cls, path, error_rate=DEDUPE_BLOOM_ERROR_RATE):
+        """(filter, max_id) read from `path`, None if it is missing or unreadable"""
+        try:
+            with open(path, "rb") as source:
+                header = source.read(_BLOOM_HEADER.size)
+                bits = source.read()
+        except OSError:
+            return None
+        if len(header) != _BLOOM_HEADER.size:
+            return None
+        magic, version, capacity, bit_count, hash_count, count, max_id = _BLOOM_HEADER.unpack(header)
+        if magic != _BLOOM_MAGIC or version != _BLOOM_FORMAT or not capacity:
+            return None
+        bloom = cls(capacity, error_rate)
+        # Saved with another error rate, or truncated
+        if bit_count != bloom.bit_count or hash_count != bloom.hash_count or len(bits) != len(bloom.bits):
+            return None
+        bloom.bits = bytearray(bits)
+        bloom.count = count
+        return bloom, max_id
+
+
+class DedupeIndex:
+    """
+    Answers "seen before?" for captured clips without scanning lists or, mostly, touching SQLite.
+
+    session: {content_hash: content id or None until saved} for the clips listed
+    in the main window, so a repeat copy is a dict lookup.
+    history: Bloom filter over every content_hash ever stored, persisted to
+    `path` and caught up with newer rows on load. A miss means the text was
+    never stored; a hit is confirmed with one indexed query (backend.content_id).
+
+    Nothing depends on the filter for correctness: before load() finishes, or
+    after pruning deleted texts, it only costs an extra lookup or a skipped shortcut.
+    Used from the GUI, loader and writer threads, so every access takes the lock.
+    """
+
+    def __init__(self, path=DEDUPE_BLOOM_PATH, capacity=DEDUPE_BLOOM_CAPACITY,
+                 error_rate=DEDUPE_BLOOM_ERROR_RATE):
+        self.path = path
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self._lock = threading.Lock()
+        self._session = {}
+        self._history = None
+        self._max_id = 0
+
+    def __len__(self):
+        with self._lock:
+            return len(self._session)
+
+    def in_session(self, content_hash):
+        with self._lock:
+            return content_hash in self._session
+
+    def remember(self, content_hash, content_id=None):
+        """Add a clip shown in the main window"""
+        with self._lock:
+            if self._session.get(content_hash) is None:
+                self._session[content_hash] = content_id
+            if self._history is not None:
+                self._history.add(content_hash)
+
+    def remember_day(self, hashes):
+        """Add {content_hash: content id} loaded for today"""
+        with self._lock:
+            self._session.update(hashes)
+
+    def clear_session(self):
+        with self._lock:
+            self._session.clear()
+
+    def may_be_stored(self, content_hash):
+        """False only when the text was certainly never stored; True until the filter is loaded"""
+        with self._lock:
+            if self._session.get(content_hash) is not None:
+                return True
+            return self._history is None or content_hash in self._history
+
+    def add_stored(self, hashes):
+        """Record hashes the writer has just committed"""
+        with self._lock:
+            if self._history is not None:
+                for content_hash in hashes:
+                    self._history.add(content_hash)
+
+    def load(self, backend):
+        """
+        Read the filter from disk and add texts stored since it was saved, or build it
+        from the contents table when there is no usable file. Runs on a background thread.
+        """
+        newest_id = backend.execute(SQL_MAX_CONTENT_ID)
+        if newest_id is None:
+            return False
+        newest_id = newest_id[0][0]
+
+        loaded = BloomFilter.load(self.path, self.error_rate)
+        history, max_id = loaded if loaded is not None else (None, 0)
+        # A file ahead of the table belongs to another (or a replaced) database
+        if history is not None and (max_id > newest_id or history.is_full()):
+            logger.info("Dedupe filter is stale or full, rebuilding it")
+            history = None
+        if history is None:
+            # Ids are never reused, so the newest id bounds the number of stored texts
+            history, max_id = BloomFilter(max(self.capacity, 2 * newest_id), self.error_rate), 0
+
+        added = 0
+        while True:
+            rows = backend.content_hashes(max_id, _BUILD_PAGE_SIZE)
+            if not rows:
+                break
+            for _, content_hash in rows:
+                history.add(content_hash)
+            added += len(rows)
+            max_id = rows[-1][0]
+
+        with self._lock:
+            # Hashes remembered while loading were added to nothing yet
+            for content_hash in self._session:
+                history.add(content_hash)
+            self._history = history
+            self._max_id = max_id
+        logger.info(f"Dedupe filter ready: {history.count} hashes, {added} read from the database")
+        return True
+
+    def save(self):
+        with self._lock:
+            if self._history is None:
+                return False
+            history, max_id = self._history, self._max_id
+            try:
+                history.save(self.path, max_id)
+            except OSError as e:
+                logger.error(f"Could not save the dedupe filter: {e}")
+                return False
+        return True
@@ -0,0 +1,200 @@
+import argparse
+import json
+import os
+import sys
+from datetime import datetime
+
+from config import DATABASE_PATH, CLIP_PREVIEW_CHARS, SIMHASH_MAX_DISTANCE
+from Db.backends.base import TIMELINE_START
+from Db.backends.sqlite_backend import SqliteBackend
+from Db.migrations import LATEST_SCHEMA_VERSION, run_migrations
+from Db.search import search_history
+from utils.content_kind import KINDS
+from utils.simhash import MAX_INDEXED_DISTANCE
+
+#? Everything imported here stays Qt-free, `python -m Db.history` has to start in a few tens of ms
+
+
+def _clip(content, full):
+    """The text for a reply, cut to CLIP_PREVIEW_CHARS unless `full` was asked for"""
+    if full or content is None or len(content) <= CLIP_PREVIEW_CHARS:
+        return {"content": content}
+    return {"content": content[:CLIP_PREVIEW_CHARS], "length": len(content), "truncated": True}
+
+
+def _checked_kind(kind):
+    if kind is not None and kind not in KINDS:
+        raise ValueError(f"unknown kind {kind!r}, expected one of {', '.join(KINDS)}")
+    return kind
+
+
+class HistoryQueries:
+    """
+    Read-only history queries answered as JSON-ready dicts, shared by the
+    command line below and the daemon's socket API (core.ipc).
+
+    Texts are cut to a preview unless `full` is passed, `content` returns
+    one full text by hash. `kind` (utils.content_kind) keeps only clips of
+    that kind. `extra_stats` adds keys to stats(), e.g. the capture counters
+    of a running pipeline.
+    """
+
+    def __init__(self, backend, extra_stats=None):
+        self.backend = backend
+        self._extra_stats = extra_stats or (lambda: {})
+
+    def recent(self, limit=20, before=None, full=False, kind=None):
+        """
+        Newest clips first, `before` is the [timestamp, id] of the last one already seen.
+        A clip that could not be decoded comes back with a null content, so paging goes on past it.
+        """
+        rows = self.backend.load_timeline_page(
+            int(limit), tuple(before) if before else TIMELINE_START, _checked_kind(kind)
+        )
+        return [
+            {"id": item_id, "timestamp": timestamp, "date": date, **_clip(content, full)}
+            for item_id, timestamp, content, date, _ in rows
+        ]
+
+    def day(self, date, full=False):
+        return [
+            {"mime_type": mime_type, "blob_hash": blob_hash, "content_hash": item_hash, "kind": kind, **_clip(content, full)}
+            for content, mime_type, blob_hash, item_hash, kind in self.backend.load_day_items(date)
+        ]
+
+    def search(self, query, limit=50, full=False, kind=None):
+        return [
+            {"date": date, "mime_type": mime_type, "blob_hash": blob_hash, **_clip(content, full)}
+            for content, date, mime_type, blob_hash
+            in search_history(query, int(limit), repository=self.backend, kind=_checked_kind(kind))
+        ]
+
+    def similar(self, content_hash, max_distance=SIMHASH_MAX_DISTANCE, limit=20, full=False):
+        """Near-duplicates of the text with this hash, closest first, from its utils.simhash fingerprint"""
+        max_distance = int(max_distance)
+        if not 0 <= max_distance <= MAX_INDEXED_DISTANCE:
+            raise ValueError(f"max_distance must be between 0 and {MAX_INDEXED_DISTANCE}")
+        fingerprint = self.backend.content_simhash(content_hash)
+        if fingerprint is None:
+            return []
+        matches = [
+            (item_hash, distance)
+            for item_hash, distance in self.backend.near_duplicates(fingerprint, max_distance)
+            if item_hash != content_hash
+        ][:int(limit)]
+        return [
+            {"content_hash": item_hash, "distance": distance, **_clip(self.backend.load_content(item_hash), full)}
+            for item_hash, distance in matches
+        ]
+
+    def since(self, after_id=0, limit=100, full=False):
+        """
+        Clips saved after the occurrence `after_id`, oldest first, used by clients to follow
+        new clips. A text copied again on a day it was already copied adds nothing.
+        """
+        return [
+            {
+                "id": item_id,
+                "content_hash": item_hash,
+                "timestamp": timestamp,
+                "date": date,
+                "mime_type": mime_type,
+                "blob_hash": blob_hash,
+                "kind": kind,
+                **_clip(content, full),
+            }
+            for item_id, content, item_hash, timestamp, date, mime_type, blob_hash, kind
+            in self.backend.export_page(int(after_id), int(limit))
+        ]
+
+    def content(self, content_hash):
+        return self.backend.load_content(content_hash)
+
+    def stats(self):
+        """`items` count each text once per day it was copied on, not every copy"""
+        now = datetime.now()
+        item_count, total_bytes = self.backend.history_totals()
+        today_count, today_bytes = self.backend.month_summary(now.year, now.month).get(now.day, (0, 0))
+        return {
+            "items": item_count,
+            "bytes": total_bytes,
+            "today_items": today_count,
+            "today_bytes": today_bytes,
+            "schema": self.backend.schema_version(),
+            "kinds": {
+                kind: {"items": count, "chars": length}
+                for kind, (count, length) in self.backend.kind_counts().items()
+            },
+            **self._extra_stats(),
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m Db.history",
+        description="Query clipboard history as JSON, without Qt",
+    )
+    parser.add_argument("--db", default=DATABASE_PATH, help="database file (default: %(default)s)")
+    parser.add_argument("--full", action="store_true", help=f"full texts instead of {CLIP_PREVIEW_CHARS} character previews")
+    commands = parser.add_subparsers(dest="command", required=True)
+    recent_parser = commands.add_parser("recent", help="newest clips first")
+    recent_parser.add_argument("-n", "--limit", type=int, default=20)
+    recent_parser.add_argument("-k", "--kind", choices=KINDS, help="only clips of this kind")
+    day_parser = commands.add_parser("day", help="clips copied on one day, oldest first")
+    day_parser.add_argument("date", nargs="?", help="YYYY-MM-DD (default: today)")
+    search_parser = commands.add_parser("search", help="full-text search, best matches first")
+    search_parser.add_argument("query", nargs="+")
+    search_parser.add_argument("-n", "--limit", type=int, default=50)
+    search_parser.add_argument("-k", "--kind", choices=KINDS, help="only clips of this kind")
+    similar_parser = commands.add_parser("similar", help="near-duplicates of one clip, closest first")
+    similar_parser.add_argument("content_hash")
+    similar_parser.add_argument("-d", "--distance", type=int, default=SIMHASH_MAX_DISTANCE,
+                                choices=range(MAX_INDEXED_DISTANCE + 1), help="most differing fingerprint bits")
+    similar_parser.add_argument("-n", "--limit", type=int, default=20)
+    commands.add_parser("stats", help="history totals")
+    commands.add_parser("upgrade", help="bring a database saved by an older version up to this one's schema")
+    args = parser.parse_args(argv)
+
+    # Connecting would create an empty file
+    if not os.path.exists(args.db):
+        print(f"No clipboard history at {args.db}", file=sys.stderr)
+        return 1
+    # Queries never write, not even the WAL and auto_vacuum pragmas the app sets on its connections
+    backend = SqliteBackend(args.db, read_only=args.command != "upgrade")
+    version = backend.schema_version()
+    if version > LATEST_SCHEMA_VERSION:
+        print(f"The database is at schema v{version}, newer than this version reads "
+              f"(v{LATEST_SCHEMA_VERSION}), update it", file=sys.stderr)
+        return 1
+    if version < LATEST_SCHEMA_VERSION and args.command != "upgrade":
+        print(f"The database is at schema v{version}, this version reads v{LATEST_SCHEMA_VERSION}. "
+              f"Upgrade it with `python -m Db.history --db {args.db} upgrade` "
+              f"(the app does so when it starts)", file=sys.stderr)
+        return 1
+
+    queries = HistoryQueries(backend)
+    if args.command == "upgrade":
+        # Kinds and fingerprints of old texts are left to the app's background backfill
+        if not run_migrations(backend):
+            print("Upgrade failed, the database is left at the last version reached", file=sys.stderr)
+            return 1
+        result = {"schema": backend.schema_version(), "previous_schema": version}
+    elif args.command == "recent":
+        result = queries.recent(args.limit, full=args.full, kind=args.kind)
+    elif args.command == "day":
+        result = queries.day(args.date or datetime.now().strftime("%Y-%m-%d"), full=args.full)
+    elif args.command == "search":
+        result = queries.search(" ".join(args.query), args.limit, full=args.full, kind=args.kind)
+    elif args.command == "similar":
+        result = queries.similar(args.content_hash, args.distance, args.limit, full=args.full)
+    else:
+        result = queries.stats()
+    backend.close()
+
+    json.dump(result, sys.stdout, ensure_ascii=False, indent=2)
+    sys.stdout.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,47 @@
+from PyQt5 import QtCore # type: ignore
+from concurrent.futures import ThreadPoolExecutor
+import logging
+
+from Db.database import thread_connection_name, close_thread_connection
+from Db.repository import get_repository
+
+logger = logging.getLogger('clipboard_manager')
+
+
+class HistoryLoader(QtCore.QObject):
+    """
+    Runs history reads, and the decompression they need, on one background
+    thread with its own connection, then hands the result back on the GUI thread.
+    """
+
+    _finished = QtCore.pyqtSignal(object, object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        # One worker so the Qt connection is always used from the thread that opened it
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="history-loader")
+        self._finished.connect(self._deliver)
+
+    def run(self, job, callback):
+        """Call job(repository) on the loader thread, then callback(result) on the GUI thread"""
+        self._executor.submit(self._run_job, job, callback)
+
+    def _run_job(self, job, callback):
+        repository = get_repository(thread_connection_name())
+        if not repository:
+            logger.error("History loader could not open the database")
+            return
+        try:
+            result = job(repository)
+        except Exception as e:
+            logger.error(f"History load failed: {e}")
+            return
+        # Emitted from the worker, delivered through the GUI thread's event loop
+        self._finished.emit(callback, result)
+
+    def _deliver(self, callback, result):
+        callback(result)
+
+    def shutdown(self):
+        self._executor.submit(close_thread_connection)
+        self._executor.shutdown(wait=True)
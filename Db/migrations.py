@@ -0,0 +1,459 @@
+from Db.codec import decode_content
+from utils.content_hash import content_hash
+import logging
+
+logger = logging.getLogger('clipboard_manager')
+
+
+def _backfill_content_hash(backend):
+    """Fill content_hash for rows written before the column existed"""
+    rows = backend.execute("SELECT id, content FROM clipboard_items WHERE content_hash IS NULL")
+    if rows is None:
+        return False
+
+    ids, hashes = [], []
+    for item_id, content in rows:
+        ids.append(item_id)
+        hashes.append(content_hash(content))
+    if not ids:
+        return True
+
+    return backend.executemany("UPDATE clipboard_items SET content_hash = ? WHERE id = ?", zip(hashes, ids))
+
+
+def _index_compressed_contents(backend):
+    """Add the original text of compressed contents to a freshly built clipboard_fts"""
+    backend.load_dictionaries()
+    rows = backend.execute("SELECT id, codec, content FROM contents WHERE codec != 'raw'")
+    if rows is None:
+        return False
+
+    entries = []
+    for content_id, codec, value in rows:
+        try:
+            entries.append((content_id, decode_content(codec, value)))
+        except Exception as e:
+            logger.error(f"Could not index {codec} content {content_id}: {e}")
+    return backend.executemany("INSERT INTO clipboard_fts (rowid, content) VALUES (?, ?)", entries)
+
+
+#? Ordered schema upgrades. The current version lives in `PRAGMA user_version`,
+#? each entry moves the database from (version - 1) to version.
+#? A step is either SQL text or a callable taking the StorageBackend and returning success.
+#? Never edit a step that has shipped, append a new one instead (a later step may drop and
+#? recreate what an earlier one made, as v7 does with the v5 triggers). A callable only
+#? follows changes of the StorageBackend interface, never in what it does.
+#? __tests__/test_migrations.py pins every shipped step.
+MIGRATIONS = [
+    (1, "create clipboard_items", [
+        """
+        CREATE TABLE IF NOT EXISTS clipboard_items (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            content TEXT NOT NULL,
+            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+            date TEXT NOT NULL
+        )
+        """,
+    ]),
+    (2, "index clipboard_items on (date, timestamp)", [
+        """
+        CREATE INDEX IF NOT EXISTS idx_clipboard_items_date_timestamp
+        ON clipboard_items (date, timestamp)
+        """,
+    ]),
+    (3, "index clipboard_items dedupe columns (date, content)", [
+        """
+        CREATE INDEX IF NOT EXISTS idx_clipboard_items_date_content
+        ON clipboard_items (date, content)
+        """,
+    ]),
+    (4, "content_hash column with unique (content_hash, date) index", [
+        "ALTER TABLE clipboard_items ADD COLUMN content_hash TEXT",
+        _backfill_content_hash,
+        # Older builds could race the COUNT(*) check, keep the first copy only
+        """
+        DELETE FROM clipboard_items
+        WHERE id NOT IN (
+            SELECT MIN(id) FROM clipboard_items GROUP BY content_hash, date
+        )
+        """,
+        """
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_clipboard_items_hash_date
+        ON clipboard_items (content_hash, date)
+        """,
+        # The hash index replaces comparisons against the full content
+        "DROP INDEX IF EXISTS idx_clipboard_items_date_content",
+    ]),
+    (5, "clipboard_fts full-text index kept in sync by triggers", [
+        # Contentless: the text already lives in clipboard_items, FTS only keeps the index.
+        # prefix='2 3' adds prefix indexes so `foo*` queries don't scan the term list
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS clipboard_fts USING fts5(
+            content,
+            content='',
+            tokenize='unicode61 remove_diacritics 2',
+            prefix='2 3'
+        )
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS clipboard_items_fts_insert
+        AFTER INSERT ON clipboard_items BEGIN
+            INSERT INTO clipboard_fts (rowid, content) VALUES (new.id, new.content);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS clipboard_items_fts_delete
+        AFTER DELETE ON clipboard_items BEGIN
+            INSERT INTO clipboard_fts (clipboard_fts, rowid, content)
+            VALUES ('delete', old.id, old.content);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS clipboard_items_fts_update
+        AFTER UPDATE OF content ON clipboard_items BEGIN
+            INSERT INTO clipboard_fts (clipboard_fts, rowid, content)
+            VALUES ('delete', old.id, old.content);
+            INSERT INTO clipboard_fts (rowid, content) VALUES (new.id, new.content);
+        END
+        """,
+        "INSERT INTO clipboard_fts (rowid, content) SELECT id, content FROM clipboard_items",
+    ]),
+    (6, "daily_stats aggregates kept current by triggers", [
+        """
+        CREATE TABLE IF NOT EXISTS daily_stats (
+            date TEXT PRIMARY KEY,
+            item_count INTEGER NOT NULL DEFAULT 0,
+            bytes INTEGER NOT NULL DEFAULT 0,
+            first_ts DATETIME,
+            last_ts DATETIME
+        ) WITHOUT ROWID
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS clipboard_items_daily_stats_insert
+        AFTER INSERT ON clipboard_items BEGIN
+            INSERT INTO daily_stats (date, item_count, bytes, first_ts, last_ts)
+            VALUES (new.date, 1, length(CAST(new.content AS BLOB)), new.timestamp, new.timestamp)
+            ON CONFLICT (date) DO UPDATE SET
+                item_count = item_count + 1,
+                bytes = bytes + excluded.bytes,
+                first_ts = min(first_ts, excluded.first_ts),
+                last_ts = max(last_ts, excluded.last_ts);
+        END
+        """,
+        # first_ts/last_ts are recomputed through idx_clipboard_items_date_timestamp
+        """
+        CREATE TRIGGER IF NOT EXISTS clipboard_items_daily_stats_delete
+        AFTER DELETE ON clipboard_items BEGIN
+            UPDATE daily_stats SET
+                item_count = item_count - 1,
+                bytes = bytes - length(CAST(old.content AS BLOB)),
+                first_ts = (SELECT MIN(timestamp) FROM clipboard_items WHERE date = old.date),
+                last_ts = (SELECT MAX(timestamp) FROM clipboard_items WHERE date = old.date)
+            WHERE date = old.date;
+            DELETE FROM daily_stats WHERE date = old.date AND item_count <= 0;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS clipboard_items_daily_stats_update
+        AFTER UPDATE OF content ON clipboard_items BEGIN
+            UPDATE daily_stats SET
+                bytes = bytes - length(CAST(old.content AS BLOB)) + length(CAST(new.content AS BLOB))
+            WHERE date = new.date;
+        END
+        """,
+        """
+        INSERT OR REPLACE INTO daily_stats (date, item_count, bytes, first_ts, last_ts)
+        SELECT date, COUNT(*), SUM(length(CAST(content AS BLOB))), MIN(timestamp), MAX(timestamp)
+        FROM clipboard_items
+        GROUP BY date
+        """,
+    ]),
+    (7, "codec column for compressed payloads", [
+        # 'raw' rows hold TEXT, anything else holds a BLOB decoded by Db.codec
+        "ALTER TABLE clipboard_items ADD COLUMN codec TEXT NOT NULL DEFAULT 'raw'",
+        """
+        CREATE TABLE IF NOT EXISTS compression_dictionaries (
+            id TEXT PRIMARY KEY,
+            data BLOB NOT NULL,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+        # Triggers can't decompress, so they only index raw rows.
+        # The repository indexes compressed rows itself with the original text.
+        "DROP TRIGGER IF EXISTS clipboard_items_fts_insert",
+        "DROP TRIGGER IF EXISTS clipboard_items_fts_delete",
+        "DROP TRIGGER IF EXISTS clipboard_items_fts_update",
+        """
+        CREATE TRIGGER clipboard_items_fts_insert
+        AFTER INSERT ON clipboard_items WHEN new.codec = 'raw' BEGIN
+            INSERT INTO clipboard_fts (rowid, content) VALUES (new.id, new.content);
+        END
+        """,
+        """
+        CREATE TRIGGER clipboard_items_fts_delete
+        AFTER DELETE ON clipboard_items WHEN old.codec = 'raw' BEGIN
+            INSERT INTO clipboard_fts (clipboard_fts, rowid, content)
+            VALUES ('delete', old.id, old.content);
+        END
+        """,
+        """
+        CREATE TRIGGER clipboard_items_fts_update
+        AFTER UPDATE OF content, codec ON clipboard_items BEGIN
+            INSERT INTO clipboard_fts (clipboard_fts, rowid, content)
+            SELECT 'delete', old.id, old.content WHERE old.codec = 'raw';
+            INSERT INTO clipboard_fts (rowid, content)
+            SELECT new.id, new.content WHERE new.codec = 'raw';
+        END
+        """,
+    ]),
+    (8, "index clipboard_items on (timestamp, id) for the timeline", [
+        """
+        CREATE INDEX IF NOT EXISTS idx_clipboard_items_timestamp_id
+        ON clipboard_items (timestamp, id)
+        """,
+    ]),
+    (9, "split clipboard_items into contents and occurrences", [
+        # Rows written by tools that predate content_hash
+        _backfill_content_hash,
+        # Each distinct text once. content holds TEXT for 'raw', a BLOB for compressed codecs
+        """
+        CREATE TABLE contents (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            content_hash TEXT NOT NULL UNIQUE,
+            content NOT NULL,
+            codec TEXT NOT NULL DEFAULT 'raw'
+        )
+        """,
+        # Every (text, date) it was copied on
+        """
+        CREATE TABLE occurrences (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            content_id INTEGER NOT NULL REFERENCES contents (id),
+            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+            date TEXT NOT NULL
+        )
+        """,
+        """
+        INSERT INTO contents (content_hash, content, codec)
+        SELECT content_hash, content, codec FROM clipboard_items
+        WHERE id IN (SELECT MIN(id) FROM clipboard_items GROUP BY content_hash)
+        ORDER BY id
+        """,
+        # Occurrences keep the clipboard_items ids, so keys handed out before stay valid
+        """
+        INSERT INTO occurrences (id, content_id, timestamp, date)
+        SELECT clipboard_items.id, contents.id, clipboard_items.timestamp, clipboard_items.date
+        FROM clipboard_items
+        JOIN contents ON contents.content_hash = clipboard_items.content_hash
+        ORDER BY clipboard_items.id
+        """,
+        # Takes its indexes and triggers with it
+        "DROP TABLE clipboard_items",
+        # Per-date dedupe: one occurrence per text and day
+        """
+        CREATE UNIQUE INDEX idx_occurrences_content_date
+        ON occurrences (content_id, date)
+        """,
+        """
+        CREATE INDEX idx_occurrences_date_timestamp
+        ON occurrences (date, timestamp)
+        """,
+        """
+        CREATE INDEX idx_occurrences_timestamp_id
+        ON occurrences (timestamp, id)
+        """,
+        # Lets the pruner find compressed contents without scanning the raw ones
+        """
+        CREATE INDEX idx_contents_compressed
+        ON contents (id) WHERE codec != 'raw'
+        """,
+        # The FTS rowid becomes the contents id, rebuild the index from scratch
+        "DROP TABLE clipboard_fts",
+        """
+        CREATE VIRTUAL TABLE clipboard_fts USING fts5(
+            content,
+            content='',
+            tokenize='unicode61 remove_diacritics 2',
+            prefix='2 3'
+        )
+        """,
+        "INSERT INTO clipboard_fts (rowid, content) SELECT id, content FROM contents WHERE codec = 'raw'",
+        _index_compressed_contents,
+        """
+        CREATE TRIGGER contents_fts_insert
+        AFTER INSERT ON contents WHEN new.codec = 'raw' BEGIN
+            INSERT INTO clipboard_fts (rowid, content) VALUES (new.id, new.content);
+        END
+        """,
+        """
+        CREATE TRIGGER contents_fts_delete
+        AFTER DELETE ON contents WHEN old.codec = 'raw' BEGIN
+            INSERT INTO clipboard_fts (clipboard_fts, rowid, content)
+            VALUES ('delete', old.id, old.content);
+        END
+        """,
+        """
+        CREATE TRIGGER contents_fts_update
+        AFTER UPDATE OF content, codec ON contents BEGIN
+            INSERT INTO clipboard_fts (clipboard_fts, rowid, content)
+            SELECT 'delete', old.id, old.content WHERE old.codec = 'raw';
+            INSERT INTO clipboard_fts (rowid, content)
+            SELECT new.id, new.content WHERE new.codec = 'raw';
+        END
+        """,
+        # daily_stats keeps counting every occurrence with the stored size of its content
+        """
+        CREATE TRIGGER occurrences_daily_stats_insert
+        AFTER INSERT ON occurrences BEGIN
+            INSERT INTO daily_stats (date, item_count, bytes, first_ts, last_ts)
+            VALUES (
+                new.date, 1,
+                (SELECT length(CAST(content AS BLOB)) FROM contents WHERE id = new.content_id),
+                new.timestamp, new.timestamp
+            )
+            ON CONFLICT (date) DO UPDATE SET
+                item_count = item_count + 1,
+                bytes = bytes + excluded.bytes,
+                first_ts = min(first_ts, excluded.first_ts),
+                last_ts = max(last_ts, excluded.last_ts);
+        END
+        """,
+        # One trigger so the stats are updated before a raw text left without occurrences is dropped.
+        # Compressed texts are left to the repository, their FTS entry needs the decoded text.
+        """
+        CREATE TRIGGER occurrences_delete
+        AFTER DELETE ON occurrences BEGIN
+            UPDATE daily_stats SET
+                item_count = item_count - 1,
+                bytes = bytes - COALESCE(
+                    (SELECT length(CAST(content AS BLOB)) FROM contents WHERE id = old.content_id), 0
+                ),
+                first_ts = (SELECT MIN(timestamp) FROM occurrences WHERE date = old.date),
+                last_ts = (SELECT MAX(timestamp) FROM occurrences WHERE date = old.date)
+            WHERE date = old.date;
+            DELETE FROM daily_stats WHERE date = old.date AND item_count <= 0;
+            DELETE FROM contents
+            WHERE id = old.content_id AND codec = 'raw'
+            AND NOT EXISTS (SELECT 1 FROM occurrences WHERE content_id = old.content_id);
+        END
+        """,
+        """
+        CREATE TRIGGER contents_daily_stats_update
+        AFTER UPDATE OF content ON contents BEGIN
+            UPDATE daily_stats SET
+                bytes = bytes - length(CAST(old.content AS BLOB)) + length(CAST(new.content AS BLOB))
+            WHERE date IN (SELECT date FROM occurrences WHERE content_id = new.id);
+        END
+        """,
+        "DELETE FROM daily_stats",
+        """
+        INSERT INTO daily_stats (date, item_count, bytes, first_ts, last_ts)
+        SELECT occurrences.date, COUNT(*), SUM(length(CAST(contents.content AS BLOB))),
+               MIN(occurrences.timestamp), MAX(occurrences.timestamp)
+        FROM occurrences
+        JOIN contents ON contents.id = occurrences.content_id
+        GROUP BY occurrences.date
+        """,
+    ]),
+    (10, "reference blob store payloads from contents", [
+        # Images, HTML and file lists live in Db.blob_store, content keeps a searchable description
+        "ALTER TABLE contents ADD COLUMN mime_type TEXT NOT NULL DEFAULT 'text/plain'",
+        "ALTER TABLE contents ADD COLUMN blob_hash TEXT",
+        # Blob garbage collection lists the referenced hashes without scanning the texts
+        """
+        CREATE INDEX idx_contents_blob_hash
+        ON contents (blob_hash) WHERE blob_hash IS NOT NULL
+        """,
+    ]),
+    (11, "classify contents by kind and length", [
+        # utils.content_kind value, worked out once when the text is first saved
+        "ALTER TABLE contents ADD COLUMN kind TEXT NOT NULL DEFAULT 'text'",
+        # In characters, of the original text for compressed contents. Texts saved before this
+        # version keep -1 and kind 'text' until Db.backfill classifies them, decoding every
+        # one of them here would hold up startup
+        "ALTER TABLE contents ADD COLUMN length INTEGER NOT NULL DEFAULT -1",
+        # Kind filters and per-kind totals are answered from here
+        """
+        CREATE INDEX idx_contents_kind_length
+        ON contents (kind, length)
+        """,
+    ]),
+    (12, "simhash fingerprints for near-duplicate lookups", [
+        # utils.simhash of the text, NULL for blob store payloads. Texts saved before this
+        # version are fingerprinted in the background by Db.backfill, it is too slow for startup
+        "ALTER TABLE contents ADD COLUMN simhash INTEGER",
+        """
+        CREATE INDEX idx_contents_unfingerprinted
+        ON contents (id) WHERE simhash IS NULL AND blob_hash IS NULL
+        """,
+        # One index per utils.simhash band, SQL_NEAR_DUPLICATE_CANDIDATES repeats the expressions
+        "CREATE INDEX idx_contents_simhash_band0 ON contents (((simhash >> 0) & 511))",
+        "CREATE INDEX idx_contents_simhash_band1 ON contents (((simhash >> 9) & 511))",
+        "CREATE INDEX idx_contents_simhash_band2 ON contents (((simhash >> 18) & 511))",
+        "CREATE INDEX idx_contents_simhash_band3 ON contents (((simhash >> 27) & 511))",
+        "CREATE INDEX idx_contents_simhash_band4 ON contents (((simhash >> 36) & 511))",
+        "CREATE INDEX idx_contents_simhash_band5 ON contents (((simhash >> 45) & 511))",
+        "CREATE INDEX idx_contents_simhash_band6 ON contents (((simhash >> 54) & 1023))",
+    ]),
+    (13, "index contents left to classify", [
+        # Db.backfill walks these by id, empty once every text saved before v11 has a kind
+        """
+        CREATE INDEX idx_contents_unclassified
+        ON contents (id) WHERE length < 0
+        """,
+    ]),
+    (14, "count every copy of a text per day", [
+        # A repeat on the same day adds one here instead of a row, see SQL_INSERT_OCCURRENCE.
+        # Occurrences saved before this version were copied at least once that day
+        "ALTER TABLE occurrences ADD COLUMN copies INTEGER NOT NULL DEFAULT 1",
+    ]),
+]
+
+LATEST_SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def get_schema_version(backend):
+    """Return the schema version stored in the database file"""
+    return backend.schema_version()
+
+
+def run_migrations(backend):
+    """
+    Bring the database behind `backend` (any Db.backends StorageBackend)
+    up to LATEST_SCHEMA_VERSION.
+    Every step runs in its own transaction together with the version bump,
+    so a failed step leaves the database at the previous version.
+    """
+    current_version = get_schema_version(backend)
+    if current_version > LATEST_SCHEMA_VERSION:
+        logger.error(
+            f"Database schema v{current_version} is newer than this build (v{LATEST_SCHEMA_VERSION})"
+        )
+        return False
+
+    for version, description, statements in MIGRATIONS:
+        if version <= current_version:
+            continue
+
+        logger.info(f"Migrating database to v{version}: {description}")
+        if not backend.begin():
+            return False
+        for statement in statements:
+            if callable(statement):
+                ok = statement(backend)
+            else:
+                ok = backend.execute(statement) is not None
+            if not ok:
+                logger.error(f"Migration v{version} failed")
+                backend.rollback()
+                return False
+
+        # PRAGMA does not accept bound parameters
+        backend.execute(f"PRAGMA user_version = {int(version)}")
+        if not backend.commit():
+            logger.error(f"Migration v{version} failed to commit")
+            backend.rollback()
+            return False
+        current_version = version
+
+    return True
@@ -1,21 +1,12 @@
-from PyQt5.QtSql import QSqlTableModel, QSqlDatabase, QSqlQuery # type: ignore
+from PyQt5.QtSql import QSqlTableModel # type: ignore
+from Db.repository import get_repository
+from Db.migrations import run_migrations
 
 def init_db():
-    db = QSqlDatabase.addDatabase('QSQLITE')
-    db.setDatabaseName("clipboard_history.db")
-    
-    if not db.open():
+    repository = get_repository()
+    if not repository:
         print("Could not open database")
         return False
 
-    query = QSqlQuery()
-    query.exec_("""
-        CREATE TABLE IF NOT EXISTS clipboard_items (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            content TEXT NOT NULL,
-            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
-            date TEXT NOT NULL
-        )
-    """)
-
-    return True
\ No newline at end of file
+    #? Creates the schema on a fresh file and upgrades older files in place
+    return run_migrations(repository)
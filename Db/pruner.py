@@ -0,0 +1,220 @@
+from datetime import date, timedelta
+import argparse
+import os
+import sys
+import threading
+import time
+import logging
+
+from config import (
+    DATABASE_PATH,
+    RETENTION_MAX_AGE_DAYS,
+    RETENTION_MAX_ROWS,
+    RETENTION_MAX_BYTES,
+    PRUNE_BATCH_SIZE,
+    PRUNE_INTERVAL_MIN,
+    VACUUM_PAGES_PER_RUN,
+)
+
+from Db.backends.sqlite_backend import SqliteBackend
+
+logger = logging.getLogger('clipboard_manager')
+
+#? Let startup finish before the first pruning run
+PRUNE_INITIAL_DELAY_S = 60
+#? Pause between delete batches so the writer can take the lock
+PRUNE_BATCH_PAUSE_S = 0.05
+
+AUTO_VACUUM_INCREMENTAL = 2
+
+
+class HistoryPruner(threading.Thread):
+    """
+    Enforces the retention limits from config.py on a background timer.
+
+    Oldest clips are deleted first, in transactions of at most `batch_size`
+    rows, then freed pages are handed back with PRAGMA incremental_vacuum so
+    the file actually shrinks (files created before auto_vacuum was enabled
+    only once converted with `python -m Db.pruner`), and blob store files no row references anymore
+    are deleted.
+
+    Runs on its own QtSql connection unless `backend` is given, as for ClipboardWriter.
+    """
+
+    def __init__(self, max_age_days=RETENTION_MAX_AGE_DAYS,
+                 max_rows=RETENTION_MAX_ROWS,
+                 max_bytes=RETENTION_MAX_BYTES,
+                 batch_size=PRUNE_BATCH_SIZE,
+                 interval_min=PRUNE_INTERVAL_MIN,
+                 initial_delay_s=PRUNE_INITIAL_DELAY_S,
+                 blob_store=None, backend=None):
+        super().__init__(name="clipboard-pruner", daemon=True)
+        self.max_age_days = max_age_days
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes
+        self.batch_size = batch_size
+        self.interval = interval_min * 60
+        self.initial_delay = initial_delay_s
+        self.blob_store = blob_store
+        self.backend = backend
+        self._stop_event = threading.Event()
+        self.items_pruned = 0
+
+    def stop(self):
+        self._stop_event.set()
+        if self.is_alive():
+            self.join()
+
+    def run(self):
+        if self._stop_event.wait(self.initial_delay):
+            return
+
+        if self.backend is not None:
+            repository = self.backend
+        else:
+            # Imported here so a pruner given a stdlib backend never loads QtSql
+            from Db.database import thread_connection_name
+            from Db.repository import get_repository
+            repository = get_repository(thread_connection_name())
+        if not repository:
+            logger.error("Pruner could not open the database")
+            return
+
+        while not self._stop_event.is_set():
+            self.prune(repository)
+            if self._stop_event.wait(self.interval):
+                break
+
+        del repository
+        if self.backend is not None:
+            self.backend.close()
+        else:
+            from Db.database import close_thread_connection
+            close_thread_connection()
+
+    def prune(self, repository):
+        """One pruning pass over all limits, returns the number of clips deleted"""
+        started = time.perf_counter()
+        deleted = 0
+
+        if self.max_age_days is not None:
+            cutoff = (date.today() - timedelta(days=self.max_age_days)).strftime("%Y-%m-%d")
+            deleted += self._delete_while(repository, lambda: self.batch_size, before=cutoff)
+
+        if self.max_rows is not None:
+            def rows_over():
+                item_count, _ = repository.history_totals()
+                return min(self.batch_size, item_count - self.max_rows)
+            deleted += self._delete_while(repository, rows_over)
+
+        if self.max_bytes is not None:
+            def bytes_over():
+                _, total_bytes = repository.history_totals()
+                return self.batch_size if total_bytes > self.max_bytes else 0
+            deleted += self._delete_while(repository, bytes_over)
+
+        self._incremental_vacuum(repository)
+        # An empty set would mean "delete every blob", so a failed query skips collection
+        referenced = repository.referenced_blobs() if deleted and self.blob_store is not None else None
+        if referenced is not None:
+            removed = self.blob_store.collect_garbage(referenced)
+            if removed:
+                logger.info(f"Deleted {removed} unreferenced blobs")
+        self.items_pruned += deleted
+        if deleted:
+            logger.info(f"Pruned {deleted} clips in {(time.perf_counter() - started) * 1000:.0f} ms")
+        return deleted
+
+    def _delete_while(self, repository, batch_limit, before="9999-12-31"):
+        """Delete oldest clips in batches of batch_limit() rows until it returns 0 or nothing is left"""
+        deleted = 0
+        while not self._stop_event.is_set():
+            limit = batch_limit()
+            if limit <= 0:
+                break
+            items = repository.oldest_items(limit, before=before)
+            if not items:
+                break
+
+            if not repository.begin():
+                break
+            if not repository.delete_items(items) or not repository.commit():
+                logger.error("Pruning batch failed")
+                repository.rollback()
+                break
+            deleted += len(items)
+            self._stop_event.wait(PRUNE_BATCH_PAUSE_S)
+        return deleted
+
+    def _incremental_vacuum(self, repository):
+        # Without incremental auto_vacuum the pragma frees nothing, see convert_to_incremental_vacuum()
+        rows = repository.execute("PRAGMA auto_vacuum")
+        if not rows or int(rows[0][0]) != AUTO_VACUUM_INCREMENTAL:
+            return
+        rows = repository.execute("PRAGMA freelist_count")
+        free_pages = min(int(rows[0][0]), VACUUM_PAGES_PER_RUN) if rows else 0
+        if not free_pages:
+            return
+
+        # QtSql steps a statement without result columns only once, and every step
+        # of incremental_vacuum frees a single page, so run it one page at a time
+        # (the same with either driver) in one transaction
+        if not repository.begin():
+            return
+        for _ in range(free_pages):
+            if repository.execute("PRAGMA incremental_vacuum(1)") is None:
+                repository.rollback()
+                return
+        if not repository.commit():
+            repository.rollback()
+            return
+        # In WAL mode the file is only truncated once the shrunken pages are checkpointed
+        repository.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        logger.info(f"Released {free_pages} free pages")
+
+
+def convert_to_incremental_vacuum(backend):
+    """
+    Switch a file created before auto_vacuum was enabled to incremental mode.
+    Takes one full VACUUM, which rewrites the whole file and holds the write
+    lock throughout, so it only runs when asked for, with the app closed.
+    """
+    rows = backend.execute("PRAGMA auto_vacuum")
+    if not rows:
+        return False
+    if int(rows[0][0]) == AUTO_VACUUM_INCREMENTAL:
+        logger.info("Database already uses auto_vacuum=INCREMENTAL")
+        return True
+
+    logger.info("Converting database to auto_vacuum=INCREMENTAL (full VACUUM)")
+    started = time.perf_counter()
+    backend.execute("PRAGMA auto_vacuum = INCREMENTAL")
+    if backend.execute("VACUUM") is None:
+        return False  # already logged
+    logger.info(f"VACUUM finished in {(time.perf_counter() - started) * 1000:.0f} ms")
+    return True
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m Db.pruner",
+        description="Convert an existing database so pruned space is returned to the OS (one full VACUUM, close the app first)",
+    )
+    parser.add_argument("--db", default=DATABASE_PATH, help="database file (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.db):
+        print(f"No clipboard history at {args.db}", file=sys.stderr)
+        return 1
+    backend = SqliteBackend(args.db)
+    converted = convert_to_incremental_vacuum(backend)
+    backend.close()
+    if not converted:
+        print("Conversion failed, is the app still running?", file=sys.stderr)
+        return 1
+    print(f"{args.db} now returns pruned space to the OS", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
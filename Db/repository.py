@@ -0,0 +1,543 @@
+from PyQt5.QtSql import QSqlQuery # type: ignore
+from PyQt5.QtCore import QByteArray # type: ignore
+import time
+import logging
+
+from Db.database import get_db_connection, DEFAULT_CONNECTION
+from Db.backends.base import StorageBackend, TIMELINE_START
+from Db.codec import register_dictionary
+from Db.sql_queries.sql_command_for_data_insertion import (
+    SQL_INSERT_CONTENT,
+    SQL_INSERT_OCCURRENCE,
+    SQL_INSERT_OCCURRENCE_ONCE,
+    SQL_INDEX_COMPRESSED_CONTENT,
+    SQL_INSERT_BLOB_CONTENT,
+)
+from Db.sql_queries.sql_command_for_compression import (
+    SQL_LOAD_COMPRESSION_DICTIONARIES,
+    SQL_SAVE_COMPRESSION_DICTIONARY,
+    SQL_SAMPLE_CONTENTS,
+)
+from Db.sql_queries.sql_command_for_load_histories import (
+    SQL_QUERY_FOR_LOAD_HISTORIES,
+    SQL_LOAD_CONTENT,
+    SQL_COPY_COUNT,
+)
+from Db.sql_queries.sql_command_for_load_alltime_histories import SQL_LOAD_TIMELINE_PAGE, SQL_LOAD_TIMELINE_PAGE_BY_KIND
+from Db.sql_queries.sql_command_for_month_navigation import SQL_MONTH_SUMMARY
+from Db.sql_queries.sql_command_for_search import SQL_SEARCH_HISTORY, SQL_SEARCH_HISTORY_BY_KIND
+from Db.sql_queries.sql_command_for_transfer import SQL_EXPORT_ITEMS
+from Db.sql_queries.sql_command_for_dedupe import SQL_CONTENT_HASHES, SQL_DAY_CONTENT_HASHES, SQL_STORED_KIND
+from Db.sql_queries.sql_command_for_content_kinds import (
+    SQL_KIND_COUNTS,
+    SQL_UNCLASSIFIED_CONTENTS,
+    SQL_SET_KIND,
+)
+from Db.sql_queries.sql_command_for_near_duplicates import (
+    SQL_NEAR_DUPLICATE_CANDIDATES,
+    SQL_CONTENT_SIMHASH,
+    SQL_UNFINGERPRINTED_CONTENTS,
+    SQL_SET_SIMHASH,
+)
+from Db.sql_queries.sql_command_for_retention import (
+    SQL_HISTORY_TOTALS,
+    SQL_OLDEST_ITEMS,
+    SQL_DELETE_ITEM,
+    SQL_ORPHANED_COMPRESSED_CONTENTS,
+    SQL_UNINDEX_COMPRESSED_CONTENT,
+    SQL_DELETE_CONTENT,
+    SQL_REFERENCED_BLOBS,
+)
+
+logger = logging.getLogger('clipboard_manager')
+
+
+class ClipboardRepository(StorageBackend):
+    """
+    Every query the app runs against clipboard_history.db, the QtSql StorageBackend.
+
+    Statements are prepared once per connection and re-executed with new
+    bound values, so SQLite parses and plans each of them only once.
+    Per-statement call counts and timings are kept for profiling.
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self._statements = {}
+        self._stats = {}
+
+    def _statement(self, sql):
+        query = self._statements.get(sql)
+        if query is None:
+            query = QSqlQuery(self.db)
+            if not query.prepare(sql):
+                logger.error(f"Failed to prepare statement: {query.lastError().text()}")
+                return None
+            self._statements[sql] = query
+        return query
+
+    @staticmethod
+    def _bindable(value):
+        # Plain bytes would be bound as an (empty) string, BLOBs need a QByteArray
+        return QByteArray(value) if isinstance(value, bytes) else value
+
+    def _exec(self, name, sql, values=None, batch=False):
+        """Bind `values` to the cached statement for `sql` and run it, None on failure"""
+        query = self._statement(sql)
+        if query is None:
+            return None
+        for placeholder, value in (values or {}).items():
+            query.bindValue(placeholder, self._bindable(value))
+
+        started = time.perf_counter()
+        ok = query.execBatch() if batch else query.exec_()
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        calls, total_ms = self._stats.get(name, (0, 0.0))
+        self._stats[name] = (calls + 1, total_ms + elapsed_ms)
+        if not ok:
+            logger.error(f"{name} failed: {query.lastError().text()}")
+            return None
+        return query
+
+    def _fetch_all(self, query, columns=1):
+        rows = []
+        while query.next():
+            if columns == 1:
+                rows.append(query.value(0))
+            else:
+                rows.append(tuple(query.value(i) for i in range(columns)))
+        # Release the read cursor so the statement can be re-executed and WAL can checkpoint
+        query.finish()
+        return rows
+
+    def statement_stats(self):
+        """{statement name: (calls, total milliseconds)} since this repository was created"""
+        return dict(self._stats)
+
+    def close(self):
+        for query in self._statements.values():
+            query.finish()
+        self._statements.clear()
+
+    def begin(self):
+        if not self.db.transaction():
+            logger.error(f"Could not start a transaction: {self.db.lastError().text()}")
+            return False
+        return True
+
+    def commit(self):
+        if not self.db.commit():
+            logger.error(f"Commit failed: {self.db.lastError().text()}")
+            return False
+        return True
+
+    def rollback(self):
+        self.db.rollback()
+
+    def execute(self, sql, params=None):
+        """Run a one-off statement with `?` parameters, returns its rows or None on failure"""
+        query = QSqlQuery(self.db)
+        if params:
+            query.prepare(sql)
+            for value in params:
+                query.addBindValue(self._bindable(value))
+            ok = query.exec_()
+        else:
+            ok = query.exec_(sql)
+        if not ok:
+            logger.error(f"Statement failed: {query.lastError().text()}")
+            return None
+
+        columns = query.record().count()
+        rows = []
+        while query.next():
+            rows.append(tuple(query.value(i) for i in range(columns)))
+        query.finish()
+        return rows
+
+    def executemany(self, sql, params_seq):
+        """execBatch with one `?` parameter list per column"""
+        rows = list(params_seq)
+        if not rows:
+            return True
+        query = QSqlQuery(self.db)
+        query.prepare(sql)
+        for column in zip(*rows):
+            query.addBindValue(list(column))
+        if not query.execBatch():
+            logger.error(f"Batch statement failed: {query.lastError().text()}")
+            return False
+        return True
+
+    def insert_items(self, contents, codecs, hashes, kinds, simhashes, timestamps, dates, count_repeats=True):
+        """
+        Insert many raw clips with two execBatch calls: texts not stored yet, then one
+        occurrence per clip and day. A repeat on the same day counts one more copy,
+        or is skipped without `count_repeats`.
+        """
+        query = self._exec("insert_contents", SQL_INSERT_CONTENT, {
+            ":content_hash": hashes,
+            ":content": contents,
+            ":codec": codecs,
+            ":kind": kinds,
+            ":length": [len(content) for content in contents],
+            ":simhash": simhashes,
+        }, batch=True)
+        return query is not None and self.insert_occurrences(hashes, timestamps, dates, count_repeats)
+
+    def insert_occurrences(self, hashes, timestamps, dates, count_repeats=True):
+        """Occurrences of texts already stored, one execBatch. Repeats per (content_hash, date) as for insert_items."""
+        sql = SQL_INSERT_OCCURRENCE if count_repeats else SQL_INSERT_OCCURRENCE_ONCE
+        query = self._exec("insert_occurrences", sql, {
+            ":timestamp": timestamps,
+            ":date": dates,
+            ":content_hash": hashes,
+        }, batch=True)
+        return query is not None
+
+    def insert_compressed_item(self, value, codec, content_hash, kind, simhash, timestamp, date, text,
+                               count_repeats=True):
+        """Insert one compressed clip, a text stored for the first time is added to the full-text index"""
+        query = self._exec("insert_compressed_content", SQL_INSERT_CONTENT, {
+            ":content_hash": content_hash,
+            ":content": value,
+            ":codec": codec,
+            ":kind": kind,
+            ":length": len(text),
+            ":simhash": simhash,
+        })
+        if query is None:
+            return False
+        # Copied before, the text and its index entry already exist
+        if query.numRowsAffected() > 0 and self._exec("index_compressed_content", SQL_INDEX_COMPRESSED_CONTENT, {
+            ":id": query.lastInsertId(),
+            ":content": text,
+        }) is None:
+            return False
+
+        return self._insert_occurrence(content_hash, timestamp, date, count_repeats)
+
+    def insert_blob_item(self, text, mime_type, blob_hash, content_hash, kind, timestamp, date, count_repeats=True):
+        """Insert one clip kept in the blob store, `text` is its description"""
+        query = self._exec("insert_blob_content", SQL_INSERT_BLOB_CONTENT, {
+            ":content_hash": content_hash,
+            ":content": text,
+            ":mime_type": mime_type,
+            ":blob_hash": blob_hash,
+            ":kind": kind,
+            ":length": len(text),
+        })
+        if query is None:
+            return False
+        return self._insert_occurrence(content_hash, timestamp, date, count_repeats)
+
+    def _insert_occurrence(self, content_hash, timestamp, date, count_repeats):
+        sql = SQL_INSERT_OCCURRENCE if count_repeats else SQL_INSERT_OCCURRENCE_ONCE
+        query = self._exec("insert_occurrence", sql, {
+            ":timestamp": timestamp,
+            ":date": date,
+            ":content_hash": content_hash,
+        })
+        return query is not None
+
+    def load_day_items(self, date):
+        """[(text, mime_type, blob_hash, content_hash, kind), ...] saved on `date` (YYYY-MM-DD), oldest first"""
+        query = self._exec("load_day", SQL_QUERY_FOR_LOAD_HISTORIES, {":date": date})
+        if query is None:
+            return []
+        items = [
+            # A NULL blob_hash or kind comes back from QtSql as an empty string
+            (self._decode(codec, value), mime_type, blob_hash or None, item_hash, kind or None)
+            for value, codec, mime_type, blob_hash, item_hash, kind in self._fetch_all(query, columns=6)
+        ]
+        return [item for item in items if item[0] is not None]
+
+    def load_content(self, content_hash):
+        """The stored text with this hash, None if there is none"""
+        query = self._exec("load_content", SQL_LOAD_CONTENT, {":content_hash": content_hash})
+        if query is None:
+            return None
+        rows = self._fetch_all(query, columns=2)
+        return self._decode(rows[0][1], rows[0][0]) if rows else None
+
+    def load_timeline_page(self, limit, before=TIMELINE_START, kind=None):
+        """
+        [(id, timestamp, content, date, simhash), ...] for the `limit` newest clips older than
+        the (timestamp, id) key `before`. Pass the last row's (timestamp, id) to get the next page.
+        `kind` keeps only clips of that contents.kind. A clip that could not be decoded
+        has None for content, it still marks where the next page starts.
+        """
+        before_timestamp, before_id = before
+        values = {
+            ":before_timestamp": before_timestamp,
+            ":before_id": before_id,
+            ":limit": limit,
+        }
+        if kind is None:
+            query = self._exec("load_timeline_page", SQL_LOAD_TIMELINE_PAGE, values)
+        else:
+            query = self._exec("load_timeline_page_by_kind", SQL_LOAD_TIMELINE_PAGE_BY_KIND, {**values, ":kind": kind})
+        if query is None:
+            return []
+        return [
+            (item_id, timestamp, self._decode(codec, value), date, self._simhash(simhash))
+            for item_id, timestamp, value, codec, date, simhash in self._fetch_all(query, columns=6)
+        ]
+
+    def export_page(self, after_id, limit):
+        """
+        [(id, content, content_hash, timestamp, date, mime_type, blob_hash, kind), ...]
+        for the `limit` clips after id `after_id`
+        """
+        query = self._exec("export_page", SQL_EXPORT_ITEMS, {
+            ":after_id": after_id,
+            ":limit": limit,
+        })
+        if query is None:
+            return []
+        return [
+            (item_id, self._decode(codec, value), item_hash, timestamp, date, mime_type, blob_hash or None, kind)
+            for item_id, value, codec, item_hash, timestamp, date, mime_type, blob_hash, kind
+            in self._fetch_all(query, columns=9)
+        ]
+
+    def month_summary(self, year, month):
+        """{day: (item_count, bytes)} for the days of year/month that have clips"""
+        next_year, next_month = (year + 1, 1) if month == 12 else (year, month + 1)
+        query = self._exec("month_summary", SQL_MONTH_SUMMARY, {
+            ":month_start": f"{year}-{month:02d}-01",
+            ":month_end": f"{next_year}-{next_month:02d}-01",
+        })
+        if query is None:
+            return {}
+        return {
+            day: (item_count, total_bytes)
+            for day, item_count, total_bytes in self._fetch_all(query, columns=3)
+            if day and item_count
+        }
+
+    def search(self, match_expression, limit, kind=None):
+        """[(content, date, mime_type, blob_hash), ...] for an FTS5 MATCH expression, best first, only of `kind` if given"""
+        values = {":query": match_expression, ":limit": limit}
+        if kind is None:
+            query = self._exec("search", SQL_SEARCH_HISTORY, values)
+        else:
+            query = self._exec("search_by_kind", SQL_SEARCH_HISTORY_BY_KIND, {**values, ":kind": kind})
+        if query is None:
+            return []
+        rows = [
+            (self._decode(codec, value), date, mime_type, blob_hash or None)
+            for value, codec, date, mime_type, blob_hash in self._fetch_all(query, columns=5)
+        ]
+        return [row for row in rows if row[0] is not None]
+
+    def kind_counts(self):
+        """{kind: (distinct clips, characters)} over the whole history"""
+        query = self._exec("kind_counts", SQL_KIND_COUNTS)
+        if query is None:
+            return {}
+        return {kind: (count, length) for kind, count, length in self._fetch_all(query, columns=3)}
+
+    def unclassified_contents(self, after_id, limit):
+        """[(id, text, mime_type), ...] for the next `limit` stored texts by id that have no kind yet"""
+        query = self._exec("unclassified_contents", SQL_UNCLASSIFIED_CONTENTS, {
+            ":after_id": after_id,
+            ":limit": limit,
+        })
+        if query is None:
+            return []
+        return [
+            (content_id, self._decode(codec, value), mime_type)
+            for content_id, value, codec, mime_type in self._fetch_all(query, columns=4)
+        ]
+
+    def set_kinds(self, kinds):
+        """Store [(id, kind, length), ...] with one execBatch, returns success"""
+        if not kinds:
+            return True
+        content_ids, kind_values, lengths = zip(*kinds)
+        query = self._exec("set_kinds", SQL_SET_KIND, {
+            ":id": list(content_ids),
+            ":kind": list(kind_values),
+            ":length": list(lengths),
+        }, batch=True)
+        return query is not None
+
+    def near_duplicate_candidates(self, bands):
+        """[(content_hash, simhash), ...] of the texts sharing a band value with utils.simhash.band_values()"""
+        query = self._exec("near_duplicate_candidates", SQL_NEAR_DUPLICATE_CANDIDATES, {
+            f":band{index}": value for index, value in enumerate(bands)
+        })
+        return [] if query is None else self._fetch_all(query, columns=2)
+
+    def content_simhash(self, content_hash):
+        """Fingerprint of the stored text with this hash, None if it has none"""
+        query = self._exec("content_simhash", SQL_CONTENT_SIMHASH, {":content_hash": content_hash})
+        if query is None:
+            return None
+        rows = self._fetch_all(query)
+        return self._simhash(rows[0]) if rows else None
+
+    def unfingerprinted_contents(self, after_id, limit):
+        """[(id, text), ...] for the next `limit` stored texts by id that have no fingerprint yet"""
+        query = self._exec("unfingerprinted_contents", SQL_UNFINGERPRINTED_CONTENTS, {
+            ":after_id": after_id,
+            ":limit": limit,
+        })
+        if query is None:
+            return []
+        return [
+            (content_id, self._decode(codec, value))
+            for content_id, value, codec in self._fetch_all(query, columns=3)
+        ]
+
+    def set_simhashes(self, fingerprints):
+        """Store [(id, simhash), ...] with one execBatch, returns success"""
+        if not fingerprints:
+            return True
+        content_ids, simhashes = zip(*fingerprints)
+        query = self._exec("set_simhashes", SQL_SET_SIMHASH, {
+            ":id": list(content_ids),
+            ":simhash": list(simhashes),
+        }, batch=True)
+        return query is not None
+
+    @staticmethod
+    def _simhash(value):
+        # A NULL fingerprint comes back from QtSql as an empty string
+        return value if isinstance(value, int) else None
+
+    def referenced_blobs(self):
+        """Set of blob_hash values still referenced by contents, None on failure"""
+        query = self._exec("referenced_blobs", SQL_REFERENCED_BLOBS)
+        return None if query is None else set(self._fetch_all(query))
+
+    def load_dictionaries(self):
+        """Register every stored compression dictionary, returns their ids oldest first"""
+        query = self._exec("load_dictionaries", SQL_LOAD_COMPRESSION_DICTIONARIES)
+        if query is None:
+            return []
+        return [register_dictionary(data) for _, data in self._fetch_all(query, columns=2)]
+
+    def save_dictionary(self, data):
+        key = register_dictionary(data)
+        query = self._exec("save_dictionary", SQL_SAVE_COMPRESSION_DICTIONARY, {
+            ":id": key,
+            ":data": data,
+        })
+        return key if query is not None else None
+
+    def sample_contents(self, limit):
+        """Most recent uncompressed clips, used to train a compression dictionary"""
+        query = self._exec("sample_contents", SQL_SAMPLE_CONTENTS, {":limit": limit})
+        if query is None:
+            return []
+        return self._fetch_all(query)
+
+    def stored_kind(self, content_hash):
+        """Kind (utils.content_kind) of the stored text with this hash, None if it was never stored"""
+        query = self._exec("stored_kind", SQL_STORED_KIND, {":content_hash": content_hash})
+        if query is None:
+            return None
+        rows = self._fetch_all(query)
+        return rows[0] if rows else None
+
+    def content_hashes(self, after_id, limit):
+        """[(id, content_hash), ...] for the next `limit` stored texts by id"""
+        query = self._exec("content_hashes", SQL_CONTENT_HASHES, {
+            ":after_id": after_id,
+            ":limit": limit,
+        })
+        return [] if query is None else self._fetch_all(query, columns=2)
+
+    def day_hashes(self, date):
+        """{content_hash: content id} for the texts copied on `date`"""
+        query = self._exec("day_hashes", SQL_DAY_CONTENT_HASHES, {":date": date})
+        return {} if query is None else dict(self._fetch_all(query, columns=2))
+
+    def history_totals(self):
+        """(item_count, bytes) over the whole history"""
+        query = self._exec("history_totals", SQL_HISTORY_TOTALS)
+        if query is None:
+            return 0, 0
+        rows = self._fetch_all(query, columns=2)
+        return rows[0] if rows else (0, 0)
+
+    def copy_count(self, content_hash):
+        """How many times the text with this hash was copied, over all days"""
+        query = self._exec("copy_count", SQL_COPY_COUNT, {":content_hash": content_hash})
+        if query is None:
+            return 0
+        rows = self._fetch_all(query)
+        return rows[0] if rows else 0
+
+    def oldest_items(self, limit, before="9999-12-31"):
+        """Ids of the oldest occurrences dated before `before`"""
+        query = self._exec("oldest_items", SQL_OLDEST_ITEMS, {
+            ":before": before,
+            ":limit": limit,
+        })
+        if query is None:
+            return []
+        return self._fetch_all(query)
+
+    def delete_items(self, items):
+        """
+        Delete occurrences returned by oldest_items. The caller owns the transaction.
+        Raw texts without occurrences left are dropped by a trigger, compressed ones
+        are removed from the full-text index with their decoded text here.
+        """
+        query = self._exec("delete_items", SQL_DELETE_ITEM, {":id": list(items)}, batch=True)
+        if query is None:
+            return False
+
+        query = self._exec("orphaned_compressed_contents", SQL_ORPHANED_COMPRESSED_CONTENTS)
+        if query is None:
+            return False
+        orphans = self._fetch_all(query, columns=3)
+        for content_id, codec, value in orphans:
+            text = self._decode(codec, value)
+            if text is not None and self._exec("unindex_compressed_content", SQL_UNINDEX_COMPRESSED_CONTENT, {
+                ":id": content_id,
+                ":content": text,
+            }) is None:
+                return False
+        if orphans:
+            query = self._exec("delete_contents", SQL_DELETE_CONTENT, {
+                ":id": [content_id for content_id, _, _ in orphans],
+            }, batch=True)
+            return query is not None
+        return True
+
+
+_repositories = {}
+
+
+def get_repository(connection_name=None):
+    """Repository bound to an open connection (the default one when None), cached per connection"""
+    if connection_name is None:
+        connection_name = DEFAULT_CONNECTION
+
+    repository = _repositories.get(connection_name)
+    if repository is not None and repository.db.isOpen():
+        return repository
+
+    db = get_db_connection(connection_name)
+    if not db:
+        return None
+    repository = ClipboardRepository(db)
+    _repositories[connection_name] = repository
+    return repository
+
+
+def release_repository(connection_name=None):
+    """Drop the cached statements for a connection that is about to be closed"""
+    if connection_name is None:
+        connection_name = DEFAULT_CONNECTION
+    repository = _repositories.pop(connection_name, None)
+    if repository is not None:
+        stats = repository.statement_stats()
+        if stats:
+            logger.debug(f"Statement stats for {connection_name}: {stats}")
+        repository.close()
@@ -0,0 +1,107 @@
+import html
+import re
+import logging
+
+logger = logging.getLogger('clipboard_manager')
+
+SEARCH_RESULT_LIMIT = 50
+
+# "quoted phrase" or a bare word (which may end with * for a prefix query)
+_QUERY_PART_RE = re.compile(r'"([^"]*)"|(\S+)')
+# Same notion of a token as FTS5's unicode61 tokenizer: letters and digits only
+_TOKEN_RE = re.compile(r'[^\W_]+')
+
+HIGHLIGHT_OPEN = '<span style="color: #34D399; font-weight: bold;">'
+HIGHLIGHT_CLOSE = '</span>'
+
+
+def parse_search_query(text):
+    """
+    Turn what the user typed into an FTS5 MATCH expression.
+
+    Supports "exact phrases" and `prefix*` words, every part must match.
+    The last bare word is treated as a prefix so results update while typing.
+    Returns (match_expression, terms) where terms is a list of (token, is_prefix)
+    used for highlighting; match_expression is None when nothing searchable was typed.
+    """
+    parts = []
+    terms = []
+    matches = _QUERY_PART_RE.findall(text)
+    for index, (phrase, word) in enumerate(matches):
+        if phrase:
+            tokens = _TOKEN_RE.findall(phrase)
+            prefix = False
+        else:
+            tokens = _TOKEN_RE.findall(word)
+            prefix = word.endswith('*') or index == len(matches) - 1
+        if not tokens:
+            continue
+
+        # Tokens are alphanumeric only, so quoting them can never break the syntax
+        expression = '"' + ' '.join(tokens) + '"'
+        if prefix:
+            expression += '*'
+        parts.append(expression)
+        terms.extend((token, False) for token in tokens[:-1])
+        terms.append((tokens[-1], prefix))
+
+    if not parts:
+        return None, []
+    return ' '.join(parts), terms
+
+
+def search_history(text, limit=SEARCH_RESULT_LIMIT, repository=None, kind=None):
+    """
+    Return [(content, date, mime_type, blob_hash), ...] for the best matches of `text`,
+    only clips of `kind` if given. blob_hash is None unless the clip is kept in the blob store.
+    """
+    match_expression, _ = parse_search_query(text)
+    if match_expression is None:
+        return []
+
+    if repository is None:
+        # Imported here so the parsing helpers and stdlib backends work without Qt
+        from Db.repository import get_repository
+        repository = get_repository()
+    if not repository:
+        logger.error("Failed to connect to database")
+        return []
+    return repository.search(match_expression, limit, kind)
+
+
+def highlight_snippet(content, terms, before=40, after=160):
+    """
+    HTML snippet of `content` around the first match, with every matched
+    term wrapped in HIGHLIGHT_OPEN/HIGHLIGHT_CLOSE. The FTS table is
+    contentless, so this is done here instead of with highlight().
+    """
+    if not terms:
+        return html.escape(content[:before + after])
+
+    pattern = re.compile(
+        '|'.join(
+            r'(?<![^\W_])' + re.escape(token) + (r'[^\W_]*' if prefix else r'(?![^\W_])')
+            for token, prefix in sorted(terms, key=lambda term: -len(term[0]))
+        ),
+        re.IGNORECASE,
+    )
+
+    first = pattern.search(content)
+    start = max(0, first.start() - before) if first else 0
+    end = min(len(content), start + before + after)
+    window = ' '.join(content[start:end].split())
+
+    pieces = []
+    position = 0
+    for match in pattern.finditer(window):
+        pieces.append(html.escape(window[position:match.start()]))
+        pieces.append(HIGHLIGHT_OPEN + html.escape(match.group(0)) + HIGHLIGHT_CLOSE)
+        position = match.end()
+    pieces.append(html.escape(window[position:]))
+
+    snippet = ''.join(pieces)
+    if start > 0:
+        snippet = '…' + snippet
+    if end < len(content):
+        snippet += '…'
+    return snippet
@@ -0,0 +1,17 @@
+SQL_LOAD_COMPRESSION_DICTIONARIES = """
+            SELECT id, data FROM compression_dictionaries
+            ORDER BY created_at ASC
+"""
+
+SQL_SAVE_COMPRESSION_DICTIONARY = """
+            INSERT OR IGNORE INTO compression_dictionaries (id, data)
+            VALUES (:id, :data)
+"""
+
+#? Recent uncompressed clips used to train a dictionary
+SQL_SAMPLE_CONTENTS = """
+            SELECT content FROM contents
+            WHERE codec = 'raw'
+            ORDER BY id DESC
+            LIMIT :limit
+"""
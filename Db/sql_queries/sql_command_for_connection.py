@@ -0,0 +1,20 @@
+from config import SQLITE_BUSY_TIMEOUT_MS, SQLITE_MMAP_SIZE, SQLITE_CACHE_SIZE_KB
+
+#? The part of CONNECTION_PRAGMAS a read-only connection takes, none of these write to the file
+READ_ONLY_PRAGMAS = [
+    f"PRAGMA busy_timeout = {SQLITE_BUSY_TIMEOUT_MS}",
+    f"PRAGMA mmap_size = {SQLITE_MMAP_SIZE}",
+    # negative value means KiB instead of pages
+    f"PRAGMA cache_size = -{SQLITE_CACHE_SIZE_KB}",
+]
+
+#? Applied once when a connection is opened, shared by every storage backend.
+#? WAL lets readers keep going while the writer commits.
+CONNECTION_PRAGMAS = [
+    # Takes effect on new files, `python -m Db.pruner` converts existing ones with a full VACUUM.
+    # Must come before journal_mode: switching to WAL writes the header of a new file, fixing auto_vacuum
+    "PRAGMA auto_vacuum = INCREMENTAL",
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    *READ_ONLY_PRAGMAS,
+]
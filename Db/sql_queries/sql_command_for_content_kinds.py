@@ -0,0 +1,17 @@
+#? Distinct clips and their characters per kind, read from idx_contents_kind_length alone.
+#? Texts not classified yet (length -1) count as clips of kind 'text' without characters
+SQL_KIND_COUNTS = """
+            SELECT kind, COUNT(*), COALESCE(SUM(MAX(length, 0)), 0) FROM contents GROUP BY kind
+"""
+
+#? Texts saved before kinds existed, read on idx_contents_unclassified
+SQL_UNCLASSIFIED_CONTENTS = """
+            SELECT id, content, codec, mime_type FROM contents
+            WHERE length < 0 AND id > :after_id
+            ORDER BY id
+            LIMIT :limit
+"""
+
+SQL_SET_KIND = """
+            UPDATE contents SET kind = :kind, length = :length WHERE id = :id
+"""
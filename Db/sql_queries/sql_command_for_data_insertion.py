@@ -1,4 +1,33 @@
-SQL_COMMAND_FOR_DATA_INSERTION = """
-            INSERT INTO clipboard_items (content, date)
-            VALUES (:content, :date)
+#? Each distinct text is stored once in contents, keyed by its hash.
+#? kind comes from utils.content_kind, length is the text's length in characters,
+#? simhash the utils.simhash fingerprint
+SQL_INSERT_CONTENT = """
+            INSERT INTO contents (content_hash, content, codec, kind, length, simhash)
+            VALUES (:content_hash, :content, :codec, :kind, :length, :simhash)
+            ON CONFLICT (content_hash) DO NOTHING
+"""
+
+#? One occurrence per (content, date), a repeat on the same day counts one more copy on it
+SQL_INSERT_OCCURRENCE = """
+            INSERT INTO occurrences (content_id, timestamp, date)
+            SELECT id, :timestamp, :date FROM contents WHERE content_hash = :content_hash
+            ON CONFLICT (content_id, date) DO UPDATE SET copies = copies + 1
+"""
+
+#? Bulk import: an occurrence already stored is skipped, so importing a file twice counts nothing twice
+SQL_INSERT_OCCURRENCE_ONCE = """
+            INSERT OR IGNORE INTO occurrences (content_id, timestamp, date)
+            SELECT id, :timestamp, :date FROM contents WHERE content_hash = :content_hash
+"""
+
+#? Compressed contents are not indexed by the FTS trigger, the repository adds the original text
+SQL_INDEX_COMPRESSED_CONTENT = """
+            INSERT INTO clipboard_fts (rowid, content) VALUES (:id, :content)
+"""
+
+#? A payload kept in the blob store, content is its description (indexed by the FTS trigger)
+SQL_INSERT_BLOB_CONTENT = """
+            INSERT INTO contents (content_hash, content, codec, mime_type, blob_hash, kind, length)
+            VALUES (:content_hash, :content, 'raw', :mime_type, :blob_hash, :kind, :length)
+            ON CONFLICT (content_hash) DO NOTHING
 """
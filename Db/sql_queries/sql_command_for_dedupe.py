@@ -0,0 +1,20 @@
+#? Stored hashes in id order, read a page at a time to build the Bloom filter
+SQL_CONTENT_HASHES = """
+            SELECT id, content_hash FROM contents
+            WHERE id > :after_id
+            ORDER BY id ASC
+            LIMIT :limit
+"""
+
+#? Hashes of the texts copied on one day, seeds the in-memory index on startup
+SQL_DAY_CONTENT_HASHES = """
+            SELECT contents.content_hash, contents.id
+            FROM occurrences
+            JOIN contents ON contents.id = occurrences.content_id
+            WHERE occurrences.date = :date
+"""
+
+#? Confirms a Bloom filter hit, on the unique content_hash index, with the kind the text was stored as
+SQL_STORED_KIND = """
+            SELECT kind FROM contents WHERE content_hash = :content_hash
+"""
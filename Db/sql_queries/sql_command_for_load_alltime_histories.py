@@ -1,4 +1,26 @@
-SQL_LOAD_ALLTIME_HISTORY = """
-SELECT content, date FROM clipboard_items
-ORDER BY timestamp DESC
-"""
\ No newline at end of file
+#? One page of the all-time timeline, newest first.
+#? Keyset pagination: the page starts right after the last (timestamp, id) already shown,
+#? so idx_occurrences_timestamp_id is entered at that key instead of skipping an OFFSET.
+#? The first page binds a key greater than any row.
+SQL_LOAD_TIMELINE_PAGE = """
+            SELECT occurrences.id, occurrences.timestamp, contents.content, contents.codec, occurrences.date,
+                   contents.simhash
+            FROM occurrences
+            JOIN contents ON contents.id = occurrences.content_id
+            WHERE (occurrences.timestamp, occurrences.id) < (:before_timestamp, :before_id)
+            ORDER BY occurrences.timestamp DESC, occurrences.id DESC
+            LIMIT :limit
+"""
+
+#? The same page restricted to one contents.kind. With few clips of that kind the planner can
+#? start from idx_contents_kind_length instead of walking the whole timeline.
+SQL_LOAD_TIMELINE_PAGE_BY_KIND = """
+            SELECT occurrences.id, occurrences.timestamp, contents.content, contents.codec, occurrences.date,
+                   contents.simhash
+            FROM occurrences
+            JOIN contents ON contents.id = occurrences.content_id
+            WHERE contents.kind = :kind
+            AND (occurrences.timestamp, occurrences.id) < (:before_timestamp, :before_id)
+            ORDER BY occurrences.timestamp DESC, occurrences.id DESC
+            LIMIT :limit
+"""
@@ -1,9 +1,20 @@
-def SQL_QUERY_FOR_LOAD_HISTORIES(today_date):
-    """
-    SQL query to load histories from the database.
-    """
-    return f"""
-            SELECT content FROM clipboard_items
-            WHERE date = '{today_date}'
-            ORDER BY timestamp ASC
-    """
+#? All clips saved on one day, oldest first
+SQL_QUERY_FOR_LOAD_HISTORIES = """
+            SELECT contents.content, contents.codec, contents.mime_type, contents.blob_hash,
+                   contents.content_hash, contents.kind
+            FROM occurrences
+            JOIN contents ON contents.id = occurrences.content_id
+            WHERE occurrences.date = :date
+            ORDER BY occurrences.timestamp ASC
+"""
+
+#? How many times a text was copied, summed over its days on idx_occurrences_content_date
+SQL_COPY_COUNT = """
+            SELECT COALESCE(SUM(copies), 0) FROM occurrences
+            WHERE content_id = (SELECT id FROM contents WHERE content_hash = :content_hash)
+"""
+
+#? One stored text, e.g. the full clip behind a large-clip preview
+SQL_LOAD_CONTENT = """
+            SELECT content, codec FROM contents WHERE content_hash = :content_hash
+"""
@@ -0,0 +1,7 @@
+#? Per-day totals for one month, read from the trigger-maintained daily_stats table.
+#? The date range is a primary key range scan, at most 31 rows.
+SQL_MONTH_SUMMARY = """
+            SELECT CAST(substr(date, 9, 2) AS INTEGER) AS day, item_count, bytes
+            FROM daily_stats
+            WHERE date >= :month_start AND date < :month_end
+"""
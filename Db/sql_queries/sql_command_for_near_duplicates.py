@@ -0,0 +1,30 @@
+#? Contents sharing at least one utils.simhash band with :band0..:band6. Each term matches one
+#? idx_contents_simhash_band* expression exactly, so SQLite answers the OR with one index lookup
+#? per band; the caller keeps the candidates within its Hamming distance.
+SQL_NEAR_DUPLICATE_CANDIDATES = """
+            SELECT content_hash, simhash FROM contents
+            WHERE ((simhash >> 0) & 511) = :band0
+            OR ((simhash >> 9) & 511) = :band1
+            OR ((simhash >> 18) & 511) = :band2
+            OR ((simhash >> 27) & 511) = :band3
+            OR ((simhash >> 36) & 511) = :band4
+            OR ((simhash >> 45) & 511) = :band5
+            OR ((simhash >> 54) & 1023) = :band6
+"""
+
+#? Fingerprint of one stored text
+SQL_CONTENT_SIMHASH = """
+            SELECT simhash FROM contents WHERE content_hash = :content_hash
+"""
+
+#? Texts saved before fingerprints existed, read on idx_contents_unfingerprinted
+SQL_UNFINGERPRINTED_CONTENTS = """
+            SELECT id, content, codec FROM contents
+            WHERE simhash IS NULL AND blob_hash IS NULL AND id > :after_id
+            ORDER BY id
+            LIMIT :limit
+"""
+
+SQL_SET_SIMHASH = """
+            UPDATE contents SET simhash = :simhash WHERE id = :id
+"""
@@ -0,0 +1,40 @@
+#? Totals kept by the daily_stats triggers, no table scan needed
+SQL_HISTORY_TOTALS = """
+            SELECT COALESCE(SUM(item_count), 0), COALESCE(SUM(bytes), 0)
+            FROM daily_stats
+"""
+
+#? Oldest occurrences first, through idx_occurrences_date_timestamp
+SQL_OLDEST_ITEMS = """
+            SELECT id FROM occurrences
+            WHERE date < :before
+            ORDER BY date ASC, timestamp ASC
+            LIMIT :limit
+"""
+
+#? Deleting the last occurrence of a raw text also deletes the text (occurrences_delete trigger)
+SQL_DELETE_ITEM = """
+            DELETE FROM occurrences WHERE id = :id
+"""
+
+#? Compressed texts left without occurrences, found through idx_contents_compressed.
+#? They must be removed from the full-text index with their original text, which a trigger can't decode.
+SQL_ORPHANED_COMPRESSED_CONTENTS = """
+            SELECT id, codec, content FROM contents
+            WHERE codec != 'raw'
+            AND NOT EXISTS (SELECT 1 FROM occurrences WHERE content_id = contents.id)
+"""
+
+SQL_UNINDEX_COMPRESSED_CONTENT = """
+            INSERT INTO clipboard_fts (clipboard_fts, rowid, content)
+            VALUES ('delete', :id, :content)
+"""
+
+SQL_DELETE_CONTENT = """
+            DELETE FROM contents WHERE id = :id
+"""
+
+#? Blob store files still in use, read on idx_contents_blob_hash before garbage collection
+SQL_REFERENCED_BLOBS = """
+            SELECT DISTINCT blob_hash FROM contents WHERE blob_hash IS NOT NULL
+"""
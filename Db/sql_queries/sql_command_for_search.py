@@ -0,0 +1,24 @@
+#? Ranked full-text search, best matches first (bm25 is lower for better matches).
+#? The FTS rowid is the contents id, each match is shown with the last date it was copied.
+SQL_SEARCH_HISTORY = """
+            SELECT contents.content, contents.codec,
+                   (SELECT MAX(date) FROM occurrences WHERE content_id = contents.id),
+                   contents.mime_type, contents.blob_hash
+            FROM clipboard_fts
+            JOIN contents ON contents.id = clipboard_fts.rowid
+            WHERE clipboard_fts MATCH :query
+            ORDER BY clipboard_fts.rank
+            LIMIT :limit
+"""
+
+#? Ranked search among the contents of one kind
+SQL_SEARCH_HISTORY_BY_KIND = """
+            SELECT contents.content, contents.codec,
+                   (SELECT MAX(date) FROM occurrences WHERE content_id = contents.id),
+                   contents.mime_type, contents.blob_hash
+            FROM clipboard_fts
+            JOIN contents ON contents.id = clipboard_fts.rowid
+            WHERE clipboard_fts MATCH :query AND contents.kind = :kind
+            ORDER BY clipboard_fts.rank
+            LIMIT :limit
+"""
@@ -0,0 +1,50 @@
+#? Export pages, keyset on the occurrence id so each page is an index range and no read cursor stays open
+SQL_EXPORT_ITEMS = """
+            SELECT occurrences.id, contents.content, contents.codec, contents.content_hash,
+                   occurrences.timestamp, occurrences.date, contents.mime_type, contents.blob_hash,
+                   contents.kind
+            FROM occurrences
+            JOIN contents ON contents.id = occurrences.content_id
+            WHERE occurrences.id > :after_id
+            ORDER BY occurrences.id ASC
+            LIMIT :limit
+"""
+
+SQL_MAX_CONTENT_ID = """
+            SELECT COALESCE(MAX(id), 0) FROM contents
+"""
+
+SQL_MAX_OCCURRENCE_ID = """
+            SELECT COALESCE(MAX(id), 0) FROM occurrences
+"""
+
+SQL_COUNT_OCCURRENCES_AFTER = """
+            SELECT COUNT(*) FROM occurrences WHERE id > ?
+"""
+
+#? Current definition of a trigger, so bulk import can drop and restore it as-is
+SQL_TRIGGER_DEFINITION = """
+            SELECT sql FROM sqlite_master WHERE type = 'trigger' AND name = ?
+"""
+
+#? Set-based replacements for the per-row insert triggers, over the rows a bulk import added
+SQL_INDEX_IMPORTED_CONTENT = """
+            INSERT INTO clipboard_fts (rowid, content)
+            SELECT id, content FROM contents
+            WHERE id > ? AND codec = 'raw'
+"""
+
+SQL_ADD_IMPORTED_DAILY_STATS = """
+            INSERT INTO daily_stats (date, item_count, bytes, first_ts, last_ts)
+            SELECT occurrences.date, COUNT(*), SUM(length(CAST(contents.content AS BLOB))),
+                   MIN(occurrences.timestamp), MAX(occurrences.timestamp)
+            FROM occurrences
+            JOIN contents ON contents.id = occurrences.content_id
+            WHERE occurrences.id > ?
+            GROUP BY occurrences.date
+            ON CONFLICT (date) DO UPDATE SET
+                item_count = item_count + excluded.item_count,
+                bytes = bytes + excluded.bytes,
+                first_ts = min(first_ts, excluded.first_ts),
+                last_ts = max(last_ts, excluded.last_ts)
+"""
@@ -0,0 +1,245 @@
+import argparse
+import json
+import sys
+import time
+import logging
+
+from config import DATABASE_PATH, EXPORT_PAGE_SIZE, IMPORT_BATCH_SIZE, IMPORT_CACHE_SIZE_KB
+from Db.backends.sqlite_backend import SqliteBackend
+from Db.codec import CODEC_RAW, encode_content
+from Db.migrations import run_migrations
+from Db.sql_queries.sql_command_for_transfer import (
+    SQL_MAX_CONTENT_ID,
+    SQL_MAX_OCCURRENCE_ID,
+    SQL_COUNT_OCCURRENCES_AFTER,
+    SQL_TRIGGER_DEFINITION,
+    SQL_INDEX_IMPORTED_CONTENT,
+    SQL_ADD_IMPORTED_DAILY_STATS,
+)
+from utils.content_hash import content_hash, blob_content_hash
+from utils.content_kind import classify
+
+logger = logging.getLogger('clipboard_manager')
+
+#? Per-row insert triggers that bulk import replaces with one set-based statement each
+BULK_INSERT_TRIGGERS = ("contents_fts_insert", "occurrences_daily_stats_insert")
+
+
+def export_history(backend, out, page_size=EXPORT_PAGE_SIZE, progress=None):
+    """
+    Write every clip to `out` as NDJSON, oldest first, one object per line:
+    {"content": ..., "content_hash": ..., "timestamp": ..., "date": ...}.
+    Clips kept in the blob store add "mime_type" and "blob_hash"; the blob files
+    themselves are not exported.
+    Rows are read a page at a time, so memory use does not depend on history size.
+    Returns (rows written, seconds).
+    """
+    started = time.perf_counter()
+    written = 0
+    after_id = 0
+    while True:
+        page = backend.export_page(after_id, page_size)
+        if not page:
+            break
+        for item_id, content, item_hash, timestamp, date, mime_type, blob_hash, _ in page:
+            if content is None:
+                continue  # could not be decoded, already logged
+            record = {
+                "content": content,
+                "content_hash": item_hash,
+                "timestamp": timestamp,
+                "date": date,
+            }
+            if blob_hash:
+                record["mime_type"] = mime_type
+                record["blob_hash"] = blob_hash
+            out.write(json.dumps(record, ensure_ascii=False))
+            out.write("\n")
+            written += 1
+        after_id = page[-1][0]
+        if progress:
+            progress(written, time.perf_counter() - started)
+    return written, time.perf_counter() - started
+
+
+def _parse_line(line):
+    """(content, timestamp, date, blob) for one NDJSON line, None if it isn't a clip"""
+    try:
+        record = json.loads(line)
+    except ValueError:
+        return None
+    if not isinstance(record, dict) or not isinstance(record.get("content"), str):
+        return None
+    timestamp = record.get("timestamp")
+    date = record.get("date") or (timestamp[:10] if timestamp else None)
+    if not date:
+        return None
+    blob = None
+    if isinstance(record.get("blob_hash"), str) and isinstance(record.get("mime_type"), str):
+        blob = (record["mime_type"], record["blob_hash"])
+    return record["content"], timestamp or f"{date} 00:00:00", date, blob
+
+
+def _import_batch(backend, batch):
+    """
+    Insert one batch in one transaction, returns the number of new rows or None on failure.
+    The FTS and daily_stats insert triggers are dropped for the batch and their work is
+    done once over all new rows, then they are restored in the same transaction,
+    so other connections never see the schema without them.
+    Imported texts are left without a utils.simhash fingerprint, Db.backfill adds those
+    in the background instead of slowing the import down.
+    """
+    contents, codecs, hashes, kinds, timestamps, dates = [], [], [], [], [], []
+    compressed = []
+    blobs = []
+    for text, timestamp, date, blob in batch:
+        if blob is not None:
+            mime_type, blob_hash = blob
+            blobs.append((
+                text, mime_type, blob_hash, blob_content_hash(mime_type, blob_hash),
+                classify(text, mime_type), timestamp, date,
+            ))
+            continue
+        codec, value = encode_content(text)
+        if codec != CODEC_RAW:
+            compressed.append((value, codec, content_hash(text), classify(text), None, timestamp, date, text))
+            continue
+        contents.append(value)
+        codecs.append(codec)
+        hashes.append(content_hash(text))
+        kinds.append(classify(text))
+        timestamps.append(timestamp)
+        dates.append(date)
+
+    if not backend.begin():
+        return None
+    ok = True
+    triggers = []
+    for name in BULK_INSERT_TRIGGERS:
+        rows = backend.execute(SQL_TRIGGER_DEFINITION, [name])
+        if rows:
+            triggers.append(rows[0][0])
+            ok = ok and backend.execute(f"DROP TRIGGER {name}") is not None
+
+    max_content_id = backend.execute(SQL_MAX_CONTENT_ID)[0][0]
+    max_occurrence_id = backend.execute(SQL_MAX_OCCURRENCE_ID)[0][0]
+    # Known texts are not stored again, repeats per (content_hash, date) are skipped rather than
+    # counted as copies, so importing a file twice adds nothing the second time
+    ok = ok and (not contents or backend.insert_items(
+        contents, codecs, hashes, kinds, [None] * len(contents), timestamps, dates, count_repeats=False
+    ))
+    for item in compressed:
+        ok = ok and backend.insert_compressed_item(*item, count_repeats=False)
+    for item in blobs:
+        ok = ok and backend.insert_blob_item(*item, count_repeats=False)
+    ok = (
+        ok
+        and backend.execute(SQL_INDEX_IMPORTED_CONTENT, [max_content_id]) is not None
+        and backend.execute(SQL_ADD_IMPORTED_DAILY_STATS, [max_occurrence_id]) is not None
+    )
+    for definition in triggers:
+        ok = ok and backend.execute(definition) is not None
+    inserted = backend.execute(SQL_COUNT_OCCURRENCES_AFTER, [max_occurrence_id]) if ok else None
+
+    if not ok or inserted is None or not backend.commit():
+        backend.rollback()
+        return None
+    return inserted[0][0]
+
+
+def import_history(backend, lines, batch_size=IMPORT_BATCH_SIZE, progress=None):
+    """
+    Read NDJSON clips (as written by export_history) from the iterable `lines`
+    and insert them in transactions of `batch_size` rows.
+    Returns (rows read, rows inserted, lines skipped, seconds); stops at the first failed batch.
+    """
+    started = time.perf_counter()
+    read = inserted = skipped = 0
+    batch = []
+
+    def flush():
+        nonlocal inserted
+        count = _import_batch(backend, batch)
+        batch.clear()
+        if count is None:
+            return False
+        inserted += count
+        if progress:
+            progress(read, inserted, time.perf_counter() - started)
+        return True
+
+    for line in lines:
+        if not line.strip():
+            continue
+        clip = _parse_line(line)
+        if clip is None:
+            skipped += 1
+            continue
+        batch.append(clip)
+        read += 1
+        if len(batch) >= batch_size and not flush():
+            logger.error(f"Import stopped after {inserted} rows, batch failed")
+            return read, inserted, skipped, time.perf_counter() - started
+    if batch and not flush():
+        logger.error(f"Import stopped after {inserted} rows, batch failed")
+    return read, inserted, skipped, time.perf_counter() - started
+
+
+def _rate(rows, seconds):
+    return f"{rows / seconds:,.0f} rows/s" if seconds > 0 else "-"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m Db.transfer",
+        description="Export clipboard history to NDJSON or import it back",
+    )
+    parser.add_argument("--db", default=DATABASE_PATH, help="database file (default: %(default)s)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    export_parser = commands.add_parser("export", help="write every clip as NDJSON")
+    export_parser.add_argument("path", nargs="?", default="-", help="output file, - for stdout")
+    import_parser = commands.add_parser("import", help="add clips from NDJSON, skipping duplicates")
+    import_parser.add_argument("path", nargs="?", default="-", help="input file, - for stdin")
+    import_parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    backend = SqliteBackend(args.db)
+    if not run_migrations(backend):
+        print("Could not open or upgrade the database", file=sys.stderr)
+        return 1
+
+    if args.command == "export":
+        out = sys.stdout if args.path == "-" else open(args.path, "w", encoding="utf-8", newline="\n")
+        try:
+            written, seconds = export_history(backend, out)
+        finally:
+            if out is not sys.stdout:
+                out.close()
+        print(f"Exported {written:,} clips in {seconds:.2f} s ({_rate(written, seconds)})", file=sys.stderr)
+    else:
+        source = sys.stdin if args.path == "-" else open(args.path, encoding="utf-8")
+        # Keeps more of the unique hash index in memory, new hashes land on random pages
+        backend.execute(f"PRAGMA cache_size = -{IMPORT_CACHE_SIZE_KB}")
+
+        def progress(read, inserted, seconds):
+            print(f"  {read:,} read, {inserted:,} new ({_rate(read, seconds)})", file=sys.stderr)
+
+        try:
+            read, inserted, skipped, seconds = import_history(
+                backend, source, batch_size=args.batch_size, progress=progress
+            )
+        finally:
+            if source is not sys.stdin:
+                source.close()
+        print(
+            f"Imported {inserted:,} new clips from {read:,} rows "
+            f"({read - inserted:,} duplicates, {skipped:,} invalid lines) "
+            f"in {seconds:.2f} s ({_rate(read, seconds)})",
+            file=sys.stderr,
+        )
+    backend.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,312 @@
+from collections import OrderedDict
+from datetime import datetime, timezone
+import threading
+import queue
+import time
+import logging
+
+from config import (
+    WRITER_QUEUE_SIZE,
+    WRITER_BATCH_SIZE,
+    WRITER_FLUSH_INTERVAL_MS,
+    WRITER_OVERFLOW_SIZE,
+    WRITER_STOP_TIMEOUT_S,
+    WRITER_FLUSH_RETRIES,
+    WRITER_RETRY_DELAY_MS,
+    COMPRESSION_USE_DICTIONARY,
+)
+from Db.codec import CODEC_RAW, encode_content, build_zlib_dictionary
+from utils.content_hash import content_hash
+from utils.content_kind import classify
+from utils.simhash import simhash
+
+logger = logging.getLogger('clipboard_manager')
+
+_STOP = object()
+
+
+class ClipboardWriter(threading.Thread):
+    """
+    Write-behind writer for captured clipboard items.
+
+    The GUI thread only enqueues (text, timestamp, date); this thread hashes,
+    classifies (utils.content_kind) and, above the size threshold, compresses
+    texts not stored before, then commits
+    everything that arrived within one flush interval
+    (or up to `batch_size` items) in a single transaction on its own
+    connection. submit() never blocks: once the bounded queue is full, clips
+    wait in an overflow that collapses identical ones and drops the oldest
+    past WRITER_OVERFLOW_SIZE, so a stalled disk cannot grow memory without
+    limit nor freeze the window. A batch that cannot be committed (e.g. the
+    database stayed locked past busy_timeout) is retried with backoff, then
+    put back in the overflow rather than dropped.
+
+    That connection is a QtSql one unless `backend` is given, e.g. a
+    SqliteBackend for the headless daemon, which never loads QtSql.
+
+    `on_saved([(text, kind), ...])` is called on this thread after each commit,
+    with the kind every clip of the batch is stored as.
+    """
+
+    def __init__(self, batch_size=WRITER_BATCH_SIZE,
+                 flush_interval_ms=WRITER_FLUSH_INTERVAL_MS,
+                 queue_size=WRITER_QUEUE_SIZE, dedupe=None, backend=None, on_saved=None):
+        super().__init__(name="clipboard-writer", daemon=True)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000
+        self._queue = queue.Queue(maxsize=queue_size)
+        #? (text, date, blob) -> queued item, for clips submitted while the queue was full
+        self._overflow = OrderedDict()
+        self._overflow_lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._stats_lock = threading.Lock()
+        self._items_flushed = 0
+        self._items_dropped = 0
+        self._flushes = 0
+        self._last_flush_ms = 0.0
+        self._max_flush_ms = 0.0
+        self._dictionary = None
+        #? Db.dedupe.DedupeIndex, lets texts copied before skip compression and indexing
+        self.dedupe = dedupe
+        self.backend = backend
+        self.on_saved = on_saved
+
+    def submit(self, text, date=None, item_hash=None, blob=None):
+        """
+        Queue a clip for saving, `item_hash` is its content_hash if the caller has it.
+        `blob` is (mime_type, blob_hash) for a payload already in the blob store,
+        `text` then being its description. Returns False if it had to be dropped.
+        """
+        now = datetime.now()
+        if date is None:
+            date = now.strftime("%Y-%m-%d")
+        # Same format as CURRENT_TIMESTAMP, taken at capture time rather than at flush
+        timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+        item = (text, timestamp, date, item_hash, blob)
+        try:
+            self._queue.put_nowait(item)
+            return True
+        except queue.Full:
+            pass
+        # Only while the database is stalled: a repeat of a clip already waiting here is folded
+        # into it, so the overflow stays bounded at the cost of that copy not being counted
+        dropped = None
+        with self._overflow_lock:
+            self._overflow.setdefault((text, date, blob), item)
+            if len(self._overflow) > WRITER_OVERFLOW_SIZE:
+                _, dropped = self._overflow.popitem(last=False)
+        if dropped is None:
+            return True
+        with self._stats_lock:
+            self._items_dropped += 1
+        logger.error(f"Writer queue full, dropped clip: {dropped[0][:30]}...")
+        return dropped is not item
+
+    def stop(self, timeout=WRITER_STOP_TIMEOUT_S):
+        """Flush everything still queued, waiting at most `timeout` seconds for the thread to finish"""
+        if not self.is_alive():
+            return
+        self._stopping.set()
+        try:
+            self._queue.put_nowait(_STOP)
+        except queue.Full:
+            pass  # the thread is busy with the queue and sees _stopping once it is drained
+        self.join(timeout)
+        if self.is_alive():
+            logger.error(f"Writer still flushing after {timeout:.0f} s, giving up on: {self.stats()}")
+
+    def stats(self):
+        """`items_flushed` counts the clips of committed batches, new texts and copies of stored ones alike"""
+        with self._stats_lock:
+            return {
+                "queue_depth": self._queue.qsize() + len(self._overflow),
+                "items_flushed": self._items_flushed,
+                "items_dropped": self._items_dropped,
+                "flushes": self._flushes,
+                "last_flush_ms": self._last_flush_ms,
+                "max_flush_ms": self._max_flush_ms,
+            }
+
+    def run(self):
+        if self.backend is not None:
+            repository = self.backend
+        else:
+            # Imported here so a writer given a stdlib backend never loads QtSql
+            from Db.database import thread_connection_name
+            from Db.repository import get_repository
+            repository = get_repository(thread_connection_name())
+        if not repository:
+            logger.error("Writer could not open the database, clips will not be saved")
+            return
+        if COMPRESSION_USE_DICTIONARY:
+            self._dictionary = self._load_or_train_dictionary(repository)
+
+        while True:
+            batch = self._next_batch()
+            if batch:
+                self._flush_or_requeue(repository, batch)
+            elif self._stopping.is_set():
+                break
+
+        del repository
+        if self.backend is not None:
+            self.backend.close()
+        else:
+            from Db.database import close_thread_connection
+            close_thread_connection()
+        logger.info(f"Writer stopped: {self.stats()}")
+
+    def _next_batch(self):
+        """Whatever arrives within one flush interval of the first item, up to batch_size; [] when idle"""
+        batch = []
+        if self._stopping.is_set():
+            timeout = 0
+        elif self._overflow:
+            timeout = self.flush_interval
+        else:
+            timeout = None  # idle, submit() or stop() puts something in the queue
+        try:
+            item = self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return self._take_overflow(self.batch_size)
+        if item is not _STOP:
+            batch.append(item)
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            # Stopping: take what is queued, don't wait for more
+            remaining = 0 if self._stopping.is_set() else deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=max(remaining, 0))
+            except queue.Empty:
+                break
+            if item is not _STOP:
+                batch.append(item)
+        batch.extend(self._take_overflow(self.batch_size - len(batch)))
+        return batch
+
+    def _flush_or_requeue(self, repository, batch):
+        delay = WRITER_RETRY_DELAY_MS / 1000
+        for attempt in range(WRITER_FLUSH_RETRIES + 1):
+            if self._flush(repository, batch):
+                return
+            if attempt < WRITER_FLUSH_RETRIES:
+                time.sleep(delay * 2 ** attempt)
+        if self._stopping.is_set():
+            # Nothing left to retry with, stop() must not wait forever on a database that stays locked
+            with self._stats_lock:
+                self._items_dropped += len(batch)
+            logger.error(f"Dropped {len(batch)} clips that could not be saved before stopping")
+            return
+        logger.error(f"Requeued {len(batch)} clips, retrying with the next batch")
+        self._requeue(batch)
+
+    def _requeue(self, batch):
+        """Put a failed batch back at the front of the overflow, in order"""
+        dropped = 0
+        with self._overflow_lock:
+            for item in reversed(batch):
+                text, _, date, _, blob = item
+                key = (text, date, blob)
+                self._overflow[key] = item
+                self._overflow.move_to_end(key, last=False)
+            while len(self._overflow) > WRITER_OVERFLOW_SIZE:
+                self._overflow.popitem(last=False)
+                dropped += 1
+        if dropped:
+            with self._stats_lock:
+                self._items_dropped += dropped
+            logger.error(f"Writer overflow full, dropped {dropped} clips")
+
+    def _take_overflow(self, limit):
+        with self._overflow_lock:
+            items = []
+            while self._overflow and len(items) < limit:
+                items.append(self._overflow.popitem(last=False)[1])
+            return items
+
+    def _load_or_train_dictionary(self, repository):
+        """Newest stored compression dictionary, training one from recent clips if none exists"""
+        dictionaries = repository.load_dictionaries()
+        if dictionaries:
+            return dictionaries[-1]
+        data = build_zlib_dictionary(repository.sample_contents(500))
+        if not data:
+            return None
+        logger.info(f"Trained a {len(data)} byte compression dictionary")
+        return repository.save_dictionary(data)
+
+    def _flush(self, repository, batch):
+        """Commit `batch` in one transaction, returns False (rolled back) if it failed"""
+        started = time.perf_counter()
+        contents, codecs, hashes, kinds, simhashes, timestamps, dates = [], [], [], [], [], [], []
+        compressed = []
+        blobs = []
+        repeats = ([], [], [])
+        saved_kinds = []
+        for text, timestamp, date, item_hash, blob in batch:
+            item_hash = item_hash or content_hash(text)
+            # A Bloom filter miss skips the lookup, most new clips never query here
+            kind = None
+            if self.dedupe is not None and self.dedupe.may_be_stored(item_hash):
+                kind = repository.stored_kind(item_hash)
+            if kind is not None:
+                # Copied before: only the occurrence is new, nothing to classify, fingerprint, compress or index
+                repeats[0].append(item_hash)
+                repeats[1].append(timestamp)
+                repeats[2].append(date)
+                saved_kinds.append((text, kind))
+                continue
+            if blob is not None:
+                mime_type, blob_hash = blob
+                kind = classify(text, mime_type)
+                blobs.append((text, mime_type, blob_hash, item_hash, kind, timestamp, date))
+                saved_kinds.append((text, kind))
+                continue
+            kind, fingerprint = classify(text), simhash(text)
+            saved_kinds.append((text, kind))
+            codec, value = encode_content(text, self._dictionary)
+            if codec != CODEC_RAW:
+                compressed.append((value, codec, item_hash, kind, fingerprint, timestamp, date, text))
+                continue
+            contents.append(value)
+            codecs.append(codec)
+            hashes.append(item_hash)
+            kinds.append(kind)
+            simhashes.append(fingerprint)
+            timestamps.append(timestamp)
+            dates.append(date)
+
+        if not repository.begin():
+            return False
+        saved = not contents or repository.insert_items(
+            contents, codecs, hashes, kinds, simhashes, timestamps, dates
+        )
+        saved = saved and (not repeats[0] or repository.insert_occurrences(*repeats))
+        for item in compressed:
+            saved = saved and repository.insert_compressed_item(*item)
+        for item in blobs:
+            saved = saved and repository.insert_blob_item(*item)
+        if not saved:
+            logger.error(f"Error saving {len(batch)} clips")
+            repository.rollback()
+            return False
+        if not repository.commit():
+            logger.error(f"Error committing {len(batch)} clips")
+            repository.rollback()
+            return False
+        if self.dedupe is not None:
+            self.dedupe.add_stored(hashes + [item[2] for item in compressed] + [item[3] for item in blobs])
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with self._stats_lock:
+            self._items_flushed += len(batch)
+            self._flushes += 1
+            self._last_flush_ms = elapsed_ms
+            self._max_flush_ms = max(self._max_flush_ms, elapsed_ms)
+        logger.debug(
+            f"Flushed {len(batch)} clips in {elapsed_ms:.1f} ms "
+            f"(queue depth {self._queue.qsize()})"
+        )
+        if self.on_saved is not None:
+            self.on_saved(saved_kinds)
+        return True
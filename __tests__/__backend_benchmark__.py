@@ -0,0 +1,122 @@
+import os
+import sys
+import time
+import shutil
+import random
+import string
+import tempfile
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.content_hash import content_hash
+from Db.codec import CODEC_RAW
+from utils.content_kind import KIND_TEXT
+from utils.simhash import simhash
+from Db.migrations import run_migrations
+from Db.backends.sqlite_backend import SqliteBackend
+
+BACKENDS = ["qt", "sqlite"]
+
+
+def open_backend(kind, database_path):
+    """Qt is only imported when the Qt backend is benchmarked"""
+    if kind == "sqlite":
+        return SqliteBackend(database_path)
+
+    from PyQt5.QtCore import QCoreApplication # type: ignore
+    from Db.database import get_db_connection
+    from Db.repository import ClipboardRepository
+    if QCoreApplication.instance() is None:
+        open_backend.app = QCoreApplication(sys.argv)
+    return ClipboardRepository(get_db_connection("backend_benchmark", database_path))
+
+
+def close_backend(kind, backend):
+    backend.close()
+    if kind == "qt":
+        from Db.database import close_db_connection
+        backend.db = None
+        close_db_connection("backend_benchmark")
+
+
+def generate_rows(count, days=30):
+    """(contents, codecs, hashes, kinds, simhashes, timestamps, dates) for `count` random raw clips"""
+    today = datetime.now()
+    contents, codecs, hashes, kinds, simhashes, timestamps, dates = [], [], [], [], [], [], []
+    for _ in range(count):
+        content = ' '.join(
+            ''.join(random.choices(string.ascii_lowercase, k=random.randint(3, 10)))
+            for _ in range(random.randint(2, 30))
+        )
+        moment = today - timedelta(days=random.randint(0, days - 1), seconds=random.randint(0, 86399))
+        contents.append(content)
+        codecs.append(CODEC_RAW)
+        hashes.append(content_hash(content))
+        kinds.append(KIND_TEXT)
+        simhashes.append(simhash(content))
+        timestamps.append(moment.strftime("%Y-%m-%d %H:%M:%S"))
+        dates.append(moment.strftime("%Y-%m-%d"))
+    return contents, codecs, hashes, kinds, simhashes, timestamps, dates
+
+
+def timed(results, label, function, *args):
+    started = time.perf_counter()
+    result = function(*args)
+    results[label] = (time.perf_counter() - started) * 1000
+    return result
+
+
+def benchmark(kind, database_path, rows, batch_size=500):
+    backend = open_backend(kind, database_path)
+    results = {}
+    timed(results, "migrate", run_migrations, backend)
+
+    def insert_all():
+        for start in range(0, len(rows[0]), batch_size):
+            with backend.transaction():
+                backend.insert_items(*(column[start:start + batch_size] for column in rows))
+    timed(results, "insert", insert_all)
+
+    today = datetime.now()
+    def load_days():
+        for days_ago in range(30):
+            backend.load_day((today - timedelta(days=days_ago)).strftime("%Y-%m-%d"))
+    timed(results, "load_day x30", load_days)
+
+    def month_summaries():
+        for _ in range(100):
+            backend.month_summary(today.year, today.month)
+    timed(results, "month_summary x100", month_summaries)
+
+    def delete_oldest():
+        while True:
+            items = backend.oldest_items(batch_size)
+            if not items:
+                break
+            with backend.transaction():
+                backend.delete_items(items)
+    timed(results, "delete all", delete_oldest)
+
+    close_backend(kind, backend)
+    return results
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    kinds = sys.argv[2:] or BACKENDS
+
+    print(f"Benchmarking {', '.join(kinds)} with {count} clips on fresh databases...")
+    rows = generate_rows(count)
+    workdir = tempfile.mkdtemp(prefix="clipboard_benchmark_")
+    try:
+        all_results = {
+            kind: benchmark(kind, os.path.join(workdir, f"{kind}.db"), rows)
+            for kind in kinds
+        }
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    labels = list(next(iter(all_results.values())))
+    print(f"{'':<20}" + ''.join(f"{kind:>12}" for kind in kinds))
+    for label in labels:
+        print(f"{label:<20}" + ''.join(f"{all_results[kind][label]:>10.1f}ms" for kind in kinds))
@@ -0,0 +1,70 @@
+import os
+import sys
+import time
+from statistics import median
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from PyQt5 import QtWidgets # type: ignore
+from utils.clip_list import ClipEntry, ClipListModel, ClipListView
+from utils.clippad_text_resize import elided_lines, _layouts
+
+
+def pump(app, seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        app.processEvents()
+
+
+def elide_ms(text, font, width, repeat=20):
+    times = []
+    for _ in range(repeat):
+        _layouts.clear()
+        started = time.perf_counter()
+        elided_lines(text, font, width, 3)
+        times.append((time.perf_counter() - started) * 1000)
+    started = time.perf_counter()
+    elided_lines(text, font, width, 3)
+    return median(times), (time.perf_counter() - started) * 1000
+
+
+def drag_ms(app, view, widths):
+    """One resize per pixel, each painted before the next as a window drag would be"""
+    steps = []
+    for width in widths:
+        started = time.perf_counter()
+        view.resize(width, view.height())
+        view.viewport().repaint()
+        app.processEvents()
+        steps.append((time.perf_counter() - started) * 1000)
+    return steps
+
+
+if __name__ == "__main__":
+    # Headless machines: QT_QPA_PLATFORM=offscreen python __tests__/__elide_benchmark__.py
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    app = QtWidgets.QApplication(sys.argv)
+    texts = [("word " * (20 * (i % 10 + 1))).strip() + f" {i}" for i in range(count)]
+    texts[0] = "x" * (1024 * 1024)
+    texts[1] = "lorem ipsum " * 100000
+
+    model = ClipListModel()
+    model.append([ClipEntry(text) for text in texts])
+    view = ClipListView()
+    view.setModel(model)
+    view.resize(480, 600)
+    started = time.perf_counter()
+    view.show()
+    pump(app, 0.2)
+    print(f"{count} clips listed in {(time.perf_counter() - started) * 1000:.0f} ms (incl. 200 ms of events)")
+
+    font = view.itemDelegate().font
+    for name, text in (("1 MB, no spaces", texts[0]), ("1.2 MB of words", texts[1]), ("short clip", texts[5])):
+        cold, warm = elide_ms(text, font, 440)
+        print(f"elide {name:<16} {cold:>7.2f} ms laid out, {warm:>6.3f} ms cached")
+
+    # Every width is new the first time, the way back finds them all in the cache
+    steps = drag_ms(app, view, range(480, 380, -1))
+    print(f"drag of {len(steps)} px: median {median(steps):.2f} ms per px, max {max(steps):.2f} ms")
+    steps = drag_ms(app, view, range(381, 481))
+    print(f"drag back over cached widths: median {median(steps):.2f} ms per px, max {max(steps):.2f} ms")
+    print(f"{len(_layouts)} layouts cached")
@@ -0,0 +1,58 @@
+import os
+import sys
+import time
+import random
+import string
+import tracemalloc
+from statistics import median
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import FILTER_MAX_RESULTS
+from utils.trigram_index import TrigramIndex
+
+#? One frame at 60 Hz, the as-you-type filter has to answer within it
+FRAME_MS = 16
+
+
+def generate_texts(count):
+    """Random clips of 5 to 200 words, a third of them common ones so queries hit many clips"""
+    words = [''.join(random.choices(string.ascii_lowercase, k=random.randint(2, 9))) for _ in range(5000)]
+    common = ["the", "and", "error", "http", "import", "return", "value", "user", "data", "file"]
+    return [
+        ' '.join(
+            random.choice(common) if random.random() < 0.3 else random.choice(words)
+            for _ in range(random.choice([5, 10, 20, 40, 80, 200]))
+        )
+        for _ in range(count)
+    ]
+
+
+def query_ms(index, query, repeat=20):
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        index.search(query, FILTER_MAX_RESULTS)
+        times.append((time.perf_counter() - started) * 1000)
+    return median(times), max(times)
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    texts = generate_texts(count)
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    index = TrigramIndex()
+    index.update(texts)
+    build_ms = (time.perf_counter() - started) * 1000
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"Indexed {len(index)} of {count} clips in {build_ms:.0f} ms (traced), {memory / 2**20:.1f} MB")
+
+    queries = ["er", "error", "the data", "retrun valeu", "import user file http the and", "zzzzqqq",
+               texts[-1][:30], texts[len(texts) // 2][10:60]]
+    print(f"{'query':<34}{'median':>10}{'max':>10}")
+    for query in queries:
+        typical, worst = query_ms(index, query)
+        flag = "" if worst <= FRAME_MS else "  over one frame"
+        print(f"{query[:32]!r:<34}{typical:>8.2f}ms{worst:>8.2f}ms{flag}")
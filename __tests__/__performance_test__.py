@@ -3,16 +3,14 @@ import sys
 import random
 import string
 from datetime import datetime, timedelta
-from PyQt5.QtSql import QSqlDatabase, QSqlQuery
+from PyQt5.QtSql import QSqlQuery
 
-# Database connection setup
-def get_db_connection():
-    db = QSqlDatabase.addDatabase("QSQLITE")
-    db.setDatabaseName("clipboard_history.db")
-    if not db.open():
-        print(f"Failed to connect to database: {db.lastError().text()}")
-        return None
-    return db
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.content_hash import content_hash
+from utils.content_kind import classify
+from utils.simhash import simhash
+from Db.database import get_db_connection, close_db_connection
+from Db.sql_queries.sql_command_for_data_insertion import SQL_INSERT_CONTENT, SQL_INSERT_OCCURRENCE
 
 def generate_random_text(min_length=10, max_length=200):
     """Generate random text content with varying length"""
@@ -45,12 +43,11 @@ def add_test_data(today_entries=100, previous_entries=200):
     # Get current date
     today = datetime.now().strftime("%Y-%m-%d")
     
-    # Prepare query
+    # Prepare queries: the text is stored once, every copy adds an occurrence
     query = QSqlQuery()
-    query.prepare("""
-        INSERT INTO clipboard_items (content, date, timestamp) 
-        VALUES (:content, :date, :timestamp)
-    """)
+    query.prepare(SQL_INSERT_CONTENT)
+    occurrence_query = QSqlQuery()
+    occurrence_query.prepare(SQL_INSERT_OCCURRENCE)
     
     # Add today's entries
     print(f"Adding {today_entries} entries for today ({today})...")
@@ -59,11 +56,17 @@ def add_test_data(today_entries=100, previous_entries=200):
         timestamp = datetime.now() - timedelta(minutes=random.randint(1, 1440))  # Random time within last 24h
         
         query.bindValue(":content", content)
-        query.bindValue(":date", today)
-        query.bindValue(":timestamp", timestamp.strftime("%Y-%m-%d %H:%M:%S"))
+        query.bindValue(":content_hash", content_hash(content))
+        query.bindValue(":codec", "raw")
+        query.bindValue(":kind", classify(content))
+        query.bindValue(":length", len(content))
+        query.bindValue(":simhash", simhash(content))
+        occurrence_query.bindValue(":content_hash", content_hash(content))
+        occurrence_query.bindValue(":date", today)
+        occurrence_query.bindValue(":timestamp", timestamp.strftime("%Y-%m-%d %H:%M:%S"))
         
-        if not query.exec_():
-            print(f"Error adding entry: {query.lastError().text()}")
+        if not query.exec_() or not occurrence_query.exec_():
+            print(f"Error adding entry: {query.lastError().text()} {occurrence_query.lastError().text()}")
         
         if i % 20 == 0:
             sys.stdout.write(f"\rProgress: {i}/{today_entries}")
@@ -85,11 +88,17 @@ def add_test_data(today_entries=100, previous_entries=200):
         )
         
         query.bindValue(":content", content)
-        query.bindValue(":date", date_str)
-        query.bindValue(":timestamp", timestamp.strftime("%Y-%m-%d %H:%M:%S"))
+        query.bindValue(":content_hash", content_hash(content))
+        query.bindValue(":codec", "raw")
+        query.bindValue(":kind", classify(content))
+        query.bindValue(":length", len(content))
+        query.bindValue(":simhash", simhash(content))
+        occurrence_query.bindValue(":content_hash", content_hash(content))
+        occurrence_query.bindValue(":date", date_str)
+        occurrence_query.bindValue(":timestamp", timestamp.strftime("%Y-%m-%d %H:%M:%S"))
         
-        if not query.exec_():
-            print(f"Error adding entry: {query.lastError().text()}")
+        if not query.exec_() or not occurrence_query.exec_():
+            print(f"Error adding entry: {query.lastError().text()} {occurrence_query.lastError().text()}")
         
         if i % 20 == 0:
             sys.stdout.write(f"\rProgress: {i}/{previous_entries}")
@@ -98,8 +107,9 @@ def add_test_data(today_entries=100, previous_entries=200):
     print("\nPrevious days' entries added successfully!")
     print(f"Total entries added: {today_entries + previous_entries}")
     
-    # Close connection
-    db.close()
+    # Close connection (queries must be released before the connection is removed)
+    del query, occurrence_query, db
+    close_db_connection(optimize=True)
     return True
 
 if __name__ == "__main__":
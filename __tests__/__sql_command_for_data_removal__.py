@@ -1,43 +1,42 @@
-from PyQt5.QtSql import QSqlDatabase, QSqlQuery  # type: ignore
+from PyQt5.QtSql import QSqlQuery  # type: ignore
 from datetime import datetime
 from pytz import timezone
 import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import DATABASE_PATH
+from Db.database import get_db_connection, close_db_connection
 
 os.makedirs("logs", exist_ok=True)
 
 def get_test_db_connection():
     # Use a unique connection name to avoid conflicts
     connection_name = "cleanup_connection"
-    
-    # Remove existing connection if it exists
-    if QSqlDatabase.contains(connection_name):
-        QSqlDatabase.removeDatabase(connection_name)
-    
-    db = QSqlDatabase.addDatabase('QSQLITE', connection_name)
-    
+
     # Use absolute path or check if the database exists
-    db_path = os.path.abspath("clipboard_history.db")  # Changed from "../clipboard_history.db"
-    
+    db_path = os.path.abspath(DATABASE_PATH)  # Changed from "../clipboard_history.db"
+
     # Check if database file exists
     if not os.path.exists(db_path):
         print(f"❌ Database file not found at: {db_path}")
         return None
-    
-    db.setDatabaseName(db_path)
-    
-    if not db.open():
-        print("❌ Failed to connect to database:", db.lastError().text())
+
+    # Opened through the shared manager so it gets the same WAL/pragma setup as the app
+    db = get_db_connection(connection_name)
+    if db is None:
+        print("❌ Failed to connect to database")
         return None
-    
+
     print(f"✅ Connected to database: {db_path}")
     return db
 
 def check_table_exists(db):
-    """Check if clipboard_items table exists"""
+    """Check if occurrences table exists"""
     query = QSqlQuery(db)
     success = query.exec_("""
         SELECT name FROM sqlite_master 
-        WHERE type='table' AND name='clipboard_items'
+        WHERE type='table' AND name='occurrences'
     """)
     
     if success and query.next():
@@ -52,7 +51,7 @@ def clear_today_from_db():
     try:
         # Check if table exists
         if not check_table_exists(db):
-            print("❌ Table 'clipboard_items' does not exist in the database")
+            print("❌ Table 'occurrences' does not exist in the database")
             log_operation("DELETE", "FAILURE - TABLE NOT FOUND")
             return False
         
@@ -68,7 +67,7 @@ def clear_today_from_db():
         # Check current entries for today
         check_query = QSqlQuery(db)
         check_success = check_query.exec_("""
-            SELECT COUNT(*) FROM clipboard_items 
+            SELECT COUNT(*) FROM occurrences 
             WHERE date = DATE('now', 'localtime')
         """)
         
@@ -80,9 +79,9 @@ def clear_today_from_db():
                 log_operation("DELETE", "SUCCESS - NO ENTRIES")
                 return True
         
-        # Perform the deletion
+        # Perform the deletion (texts not copied on any other day go with it, see occurrences_delete)
         success = query.exec_("""
-            DELETE FROM clipboard_items
+            DELETE FROM occurrences
             WHERE date = DATE('now', 'localtime')
         """)
         
@@ -99,9 +98,8 @@ def clear_today_from_db():
     
     finally:
         # Always close the database connection
-        if db.isOpen():
-            db.close()
-        QSqlDatabase.removeDatabase("cleanup_connection")
+        del db
+        close_db_connection("cleanup_connection")
 
 def log_operation(operation, status):
     """Log operation with proper formatting"""
@@ -139,8 +137,8 @@ def show_database_info():
             print(f"         • {col_name} ({col_type})")
     
     # Close the database connection properly
-    db.close()
-    QSqlDatabase.removeDatabase("cleanup_connection")
+    del db
+    close_db_connection("cleanup_connection")
 
 if __name__ == "__main__":
     print("🧹 Clipboard History Cleanup Tool")
@@ -158,6 +156,6 @@ if __name__ == "__main__":
         print("\n❌ Cleanup failed!")
         print("\n🔍 Troubleshooting tips:")
         print("   1. Check if clipboard_history.db exists in the current directory")
-        print("   2. Verify the database contains the 'clipboard_items' table")
+        print("   2. Verify the database contains the 'occurrences' table")
         print("   3. Make sure the database file is not corrupted")
         print("   4. Check if another process is using the database")
\ No newline at end of file
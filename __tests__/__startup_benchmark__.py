@@ -0,0 +1,35 @@
+import os
+import sys
+import json
+import subprocess
+from statistics import median
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def profile_once():
+    """Startup milestones (ms) of one `main.py --startup-profile` run, None if it failed"""
+    result = subprocess.run(
+        [sys.executable, os.path.join(ROOT, "main.py"), "--startup-profile"],
+        cwd=ROOT, capture_output=True, text=True, timeout=60,
+    )
+    # The app prints debug lines too, the profile is the JSON line
+    for line in reversed(result.stdout.splitlines()):
+        if line.startswith("{"):
+            return json.loads(line)
+    print(result.stderr[-2000:], file=sys.stderr)
+    return None
+
+
+if __name__ == "__main__":
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    # Headless machines: QT_QPA_PLATFORM=offscreen python __tests__/__startup_benchmark__.py
+    print(f"Profiling {runs} startups on {os.environ.get('QT_QPA_PLATFORM', 'the default platform')}...")
+    profiles = [profile for profile in (profile_once() for _ in range(runs)) if profile]
+    if not profiles:
+        sys.exit("No run finished")
+
+    print(f"{'milestone':<16}{'median':>10}{'min':>10}{'max':>10}")
+    for mark in profiles[0]:
+        values = [profile[mark] for profile in profiles if mark in profile]
+        print(f"{mark:<16}{median(values):>8.1f}ms{min(values):>8.1f}ms{max(values):>8.1f}ms")
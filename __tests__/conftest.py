@@ -0,0 +1,32 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Db.backends.sqlite_backend import SqliteBackend
+from Db.migrations import run_migrations
+
+
+@pytest.fixture(autouse=True)
+def scratch_dir(tmp_path, monkeypatch):
+    """Run every test in its own directory, so files made relative to the working directory never land in the repo"""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture(scope="session")
+def qapp():
+    """The one QApplication of the test run, on the offscreen platform unless QT_QPA_PLATFORM says otherwise"""
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt5.QtWidgets import QApplication # type: ignore
+    return QApplication.instance() or QApplication(sys.argv[:1])
+
+
+@pytest.fixture
+def backend(tmp_path):
+    """A SqliteBackend on a fresh database migrated to the latest schema"""
+    backend = SqliteBackend(str(tmp_path / "history.db"))
+    assert run_migrations(backend)
+    yield backend
+    backend.close()
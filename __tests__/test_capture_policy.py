@@ -0,0 +1,124 @@
+import pytest
+from PyQt5 import QtCore # type: ignore
+from PyQt5.QtGui import QClipboard # type: ignore
+
+from Db.blob_store import MIME_URI_LIST
+from core.capture_policy import (
+    ClipboardCapture, CapturePolicy, default_policies,
+    SOURCE_CLIPBOARD, SOURCE_SELECTION,
+    DROP_COALESCED, DROP_TOO_SHORT, DROP_TOO_LONG, DROP_UNCHANGED, DROP_RATE_LIMITED,
+)
+
+
+class FakeClipboard(QtCore.QObject):
+    """The part of QClipboard ClipboardCapture uses, without a windowing system"""
+
+    dataChanged = QtCore.pyqtSignal()
+    selectionChanged = QtCore.pyqtSignal()
+
+    def __init__(self):
+        super().__init__()
+        self._data = {}
+
+    def mimeData(self, mode):
+        return self._data.get(mode)
+
+    def set_text(self, text, mode=QClipboard.Clipboard):
+        data = QtCore.QMimeData()
+        data.setText(text)
+        self.set_mime_data(data, mode)
+
+    def set_mime_data(self, data, mode=QClipboard.Clipboard):
+        self._data[mode] = data
+        (self.dataChanged if mode == QClipboard.Clipboard else self.selectionChanged).emit()
+
+
+@pytest.fixture(scope="module")
+def app(qapp):
+    return qapp
+
+
+def capture_with(policies=None):
+    clipboard = FakeClipboard()
+    capture = ClipboardCapture(clipboard, policies=policies)
+    captured = []
+    capture.captured.connect(lambda text, source: captured.append((text, source)))
+    capture.captured_payload.connect(lambda payload, source: captured.append((payload, source)))
+    return clipboard, capture, captured
+
+
+def settle(app, capture):
+    """Run the event loop until no debounce timer is left"""
+    while any(state.timer.isActive() for state in capture._sources.values()):
+        app.processEvents()
+
+
+def test_every_fast_copy_is_kept_by_default(app):
+    clipboard, capture, captured = capture_with()
+    for i in range(300):
+        clipboard.set_text(f"copy {i}")
+        settle(app, capture)
+    assert [text for text, _ in captured] == [f"copy {i}" for i in range(300)]
+    assert capture.stats()[SOURCE_CLIPBOARD]["dropped"] == {}
+
+
+def test_a_burst_is_read_once(app):
+    clipboard, capture, captured = capture_with()
+    for i in range(5):
+        clipboard.set_text(f"draft {i}")
+    settle(app, capture)
+    assert captured == [("draft 4", SOURCE_CLIPBOARD)]
+    assert capture.stats()[SOURCE_CLIPBOARD]["dropped"] == {DROP_COALESCED: 4}
+
+
+def test_selection_is_rate_limited(app):
+    limit = default_policies()[SOURCE_SELECTION].max_per_minute
+    clipboard, capture, captured = capture_with()
+    for i in range(limit + 5):
+        clipboard.set_text(f"selected {i}", QClipboard.Selection)
+        capture._read(SOURCE_SELECTION)
+    capture._sources[SOURCE_SELECTION].timer.stop()
+    assert len(captured) == limit
+    assert capture.stats()[SOURCE_SELECTION]["dropped"][DROP_RATE_LIMITED] == 5
+
+
+def test_length_and_repeat_limits(app):
+    policies = default_policies()
+    policies[SOURCE_CLIPBOARD] = CapturePolicy(0, min_length=3, max_length=10)
+    clipboard, capture, captured = capture_with(policies)
+    for text in ("ab", "   ab   ", "kept", "kept", "far too long to keep", "kept again"):
+        clipboard.set_text(text)
+        settle(app, capture)
+    assert [text for text, _ in captured] == ["kept", "kept again"]
+    assert capture.stats()[SOURCE_CLIPBOARD]["dropped"] == {
+        DROP_TOO_SHORT: 2, DROP_UNCHANGED: 1, DROP_TOO_LONG: 1,
+    }
+
+
+def test_copying_the_same_text_again_is_kept(app):
+    clipboard, capture, captured = capture_with()
+    for _ in range(3):
+        clipboard.set_text("same text")
+        settle(app, capture)
+    assert captured == [("same text", SOURCE_CLIPBOARD)] * 3
+    assert DROP_UNCHANGED not in capture.stats()[SOURCE_CLIPBOARD]["dropped"]
+
+
+def test_copies_with_text_are_kept_as_text(app):
+    clipboard, capture, captured = capture_with()
+    page = QtCore.QMimeData()
+    page.setHtml("<b>bold</b> move &amp; shake")
+    page.setText("bold move & shake")
+    link = QtCore.QMimeData()
+    link.setUrls([QtCore.QUrl("https://example.com/a")])
+    link.setText("https://example.com/a")
+    files = QtCore.QMimeData()
+    files.setUrls([QtCore.QUrl.fromLocalFile("/tmp/a.txt"), QtCore.QUrl.fromLocalFile("/tmp/b.txt")])
+    for data in (page, link, files):
+        clipboard.set_mime_data(data)
+        settle(app, capture)
+
+    assert captured[:2] == [("bold move & shake", SOURCE_CLIPBOARD), ("https://example.com/a", SOURCE_CLIPBOARD)]
+    payload, _ = captured[2]
+    assert payload.mime_type == MIME_URI_LIST
+    assert payload.text == "file:///tmp/a.txt\nfile:///tmp/b.txt"
@@ -0,0 +1,141 @@
+from PyQt5 import QtCore, QtGui # type: ignore
+from PyQt5.QtWidgets import QApplication # type: ignore
+
+from utils.clip_list import (
+    ClipEntry, ClipListModel, EntryRole,
+    ENTRY_TEXT, ENTRY_IMAGE, ENTRY_FILES, ENTRY_HEADING, ENTRY_GROUP,
+)
+from utils.clippad_text_resize import elided_lines
+from utils.search_result_label import SearchResultLabel
+from Db.blob_store import BlobStore
+
+
+def texts(model):
+    return [entry.text for entry in model.entries()]
+
+
+class Signals:
+    """Records what a ClipListModel told its views"""
+
+    def __init__(self, model):
+        self.inserted = []
+        self.removed = []
+        self.changed = []
+        self.resets = 0
+        model.rowsInserted.connect(lambda _, first, last: self.inserted.append((first, last)))
+        model.rowsRemoved.connect(lambda _, first, last: self.removed.append((first, last)))
+        model.dataChanged.connect(lambda top, bottom: self.changed.append((top.row(), bottom.row())))
+        model.modelReset.connect(self.count_reset)
+
+    def count_reset(self):
+        self.resets += 1
+
+
+def test_insert_and_append_keep_order():
+    model = ClipListModel()
+    signals = Signals(model)
+    model.append([ClipEntry("b"), ClipEntry("c")])
+    model.insert(0, [ClipEntry("a")])
+    model.append([])
+    model.append([ClipEntry("d")])
+
+    assert texts(model) == ["a", "b", "c", "d"]
+    assert model.rowCount() == 4
+    assert signals.inserted == [(0, 1), (0, 0), (3, 3)]
+
+
+def test_data_roles():
+    model = ClipListModel()
+    text, image = ClipEntry("some text"), ClipEntry("PNG 10x10", ENTRY_IMAGE, blob_hash="abc")
+    model.append([text, image])
+
+    assert model.data(model.index(0), EntryRole) is text
+    assert model.data(model.index(0)) == "some text"
+    assert model.data(model.index(0), 3) is None  # Qt.ToolTipRole, text rows have none
+    assert model.data(model.index(1), 3) == "PNG 10x10"
+    assert model.rowCount(model.index(0)) == 0
+
+
+def test_reset_and_clear():
+    model = ClipListModel()
+    signals = Signals(model)
+    model.append([ClipEntry("old")])
+    model.reset([ClipEntry("x"), ClipEntry("y")])
+    assert texts(model) == ["x", "y"]
+    model.clear()
+    assert model.rowCount() == 0
+    assert signals.resets == 2
+
+
+def test_entry_changed_only_for_listed_entries():
+    model = ClipListModel()
+    signals = Signals(model)
+    entries = [ClipEntry("a"), ClipEntry("b")]
+    model.append(entries)
+    model.entry_changed(entries[1])
+    model.entry_changed(ClipEntry("b"))  # equal text, not listed
+    assert signals.changed == [(1, 1)]
+
+
+def test_heading_and_group_rows():
+    model = ClipListModel()
+    signals = Signals(model)
+    members = [ClipEntry("log line 2"), ClipEntry("log line 3")]
+    group = ClipEntry("▸ 2 similar clips", ENTRY_GROUP, members=members)
+    model.append([
+        ClipEntry("2026-10-18", ENTRY_HEADING),
+        ClipEntry("log line 1"),
+        group,
+        ClipEntry("2026-10-17", ENTRY_HEADING),
+        ClipEntry("older"),
+    ])
+    assert [entry.kind for entry in model.entries()][:3] == [ENTRY_HEADING, ENTRY_TEXT, ENTRY_GROUP]
+
+    model.expand(group)
+    assert texts(model) == ["2026-10-18", "log line 1", "log line 2", "log line 3", "2026-10-17", "older"]
+    assert model.entries()[2] is members[0]
+    assert group.members is None
+    assert signals.removed == [(2, 2)]
+    assert signals.inserted[-1] == (2, 3)
+
+    # Expanding again, or a group that is not listed, changes nothing
+    model.expand(group)
+    model.expand(ClipEntry("▸ 1 similar clip", ENTRY_GROUP, members=[ClipEntry("x")]))
+    assert model.rowCount() == 6
+
+
+def test_elided_lines_are_cached_per_text(qapp):
+    font = QtGui.QFont()
+    text = "word " * 500
+    lines = elided_lines(text, font, 200, 3)
+    assert len(lines) == 3 and lines[-1].endswith("\u2026")
+    assert elided_lines(text, font, 200, 3) is lines
+    # An equal text in another object is laid out again, to the same lines
+    other = "".join(["word "] * 500)
+    assert elided_lines(other, font, 200, 3) is not lines
+    assert elided_lines(other, font, 200, 3) == lines
+    assert len(elided_lines(text, font, 400, 3)) == 3
+
+
+def test_search_results_copy_blob_store_clips_as_their_payload(qapp, tmp_path):
+    blob_store = BlobStore(str(tmp_path / "blobs"))
+    image = QtGui.QImage(4, 3, QtGui.QImage.Format_RGB32)
+    image.fill(QtGui.QColor("red"))
+    buffer = QtCore.QBuffer()
+    buffer.open(QtCore.QIODevice.WriteOnly)
+    image.save(buffer, "PNG")
+    blob_hash = blob_store.put(bytes(buffer.data()))
+    clipboard = QApplication.clipboard()
+
+    assert SearchResultLabel("Image 4x3", "2024-05-01", "", kind=ENTRY_IMAGE,
+                             blob_hash=blob_hash, blob_store=blob_store).copy_clip()
+    assert clipboard.image().size() == QtCore.QSize(4, 3)
+
+    files = "file:///tmp/a.txt\nfile:///tmp/b.txt"
+    assert SearchResultLabel(files, "2024-05-01", "", kind=ENTRY_FILES).copy_clip()
+    assert [url.toString() for url in clipboard.mimeData().urls()] == files.splitlines()
+
+    assert not SearchResultLabel("Image 1x1", "2024-05-01", "", kind=ENTRY_IMAGE,
+                                 blob_hash="00" * 32, blob_store=blob_store).copy_clip()
+    assert SearchResultLabel("plain text", "2024-05-01", "").copy_clip()
+    assert clipboard.text() == "plain text"
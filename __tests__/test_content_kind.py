@@ -0,0 +1,51 @@
+from Db.backfill import ContentBackfill
+from Db.blob_store import MIME_URI_LIST
+from Db.writer import ClipboardWriter
+from utils.content_hash import content_hash
+from utils.content_kind import classify, KIND_TEXT, KIND_URL, KIND_CODE, KIND_JSON, KIND_FILES
+
+CLIPS = {
+    "https://example.com/some/page?id=4": KIND_URL,
+    '{"name": "clip", "tags": [1, 2, 3]}': KIND_JSON,
+    "def add(a, b):\n    return a + b\n\nprint(add(1, 2))": KIND_CODE,
+    "Meet at the station at nine, bring the tickets": KIND_TEXT,
+}
+
+
+def test_classify():
+    for text, kind in CLIPS.items():
+        assert classify(text) == kind, text
+
+
+def test_backfill_classifies_texts_saved_before_kinds(backend):
+    writer = ClipboardWriter(backend=backend)
+    for text in CLIPS:
+        writer.submit(text)
+    writer.start()
+    writer.stop()
+    # As left by migration v11 for texts saved before it
+    backend.execute("UPDATE contents SET kind = 'text', length = -1")
+    assert backend.kind_counts() == {KIND_TEXT: (len(CLIPS), 0)}
+
+    backfill = ContentBackfill(batch_size=3, backend=backend)
+    assert backfill.classify_kinds(backend) == len(CLIPS)
+    for text, kind in CLIPS.items():
+        rows = backend.execute("SELECT kind, length FROM contents WHERE content_hash = ?", (content_hash(text),))
+        assert rows == [(kind, len(text))]
+    assert backfill.classify_kinds(backend) == 0
+
+
+def test_day_items_carry_the_stored_kind(backend):
+    files = "file:///home/user/report.pdf\nfile:///home/user/notes.txt"
+    writer = ClipboardWriter(backend=backend)
+    writer.submit(files, "2024-05-01", blob=(MIME_URI_LIST, "ab" * 32))
+    writer.submit("https://example.com", "2024-05-01")
+    writer.start()
+    writer.stop()
+
+    # The text alone would classify as links, the kind stored at save time says files
+    assert classify(files) == KIND_URL
+    assert {text: kind for text, *_, kind in backend.load_day_items("2024-05-01")} == {
+        files: KIND_FILES,
+        "https://example.com": KIND_URL,
+    }
@@ -0,0 +1,24 @@
+import socket
+
+from core.daemon_client import DaemonClient, daemon_supported, find_daemon
+
+
+def test_no_daemon_answers_on_a_missing_socket(tmp_path):
+    assert DaemonClient(str(tmp_path / "none.sock")).ping() is None
+    assert find_daemon(str(tmp_path / "none.sock")) is None
+
+
+def test_window_captures_itself_without_unix_sockets(qapp, monkeypatch):
+    # CPython on Windows has no AF_UNIX
+    monkeypatch.delattr(socket, "AF_UNIX")
+    assert not daemon_supported()
+    assert DaemonClient().ping() is None
+
+    from core.clipboard_manager_tool import ClipboardManager
+    window = ClipboardManager(daemon=find_daemon())
+    try:
+        assert window.daemon is None
+        assert window.pipeline is not None
+    finally:
+        window.on_about_to_quit()
+        window.deleteLater()
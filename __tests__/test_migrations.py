@@ -0,0 +1,141 @@
+import hashlib
+import json
+import os
+import sqlite3
+from datetime import date
+
+from Db.backends.sqlite_backend import SqliteBackend
+from Db.backfill import ContentBackfill
+from Db.blob_store import MIME_TEXT
+from Db.history import main as history_cli
+from Db.migrations import MIGRATIONS, LATEST_SCHEMA_VERSION, run_migrations
+from utils.content_hash import content_hash
+from utils.content_kind import KIND_URL
+
+#? Digest of every shipped step. A mismatch means a step was edited, append a new one instead
+SHIPPED_STEPS = {
+    1: "fc1159ef933fe318",
+    2: "69e94a1728f08d30",
+    3: "7db00c878898ce62",
+    4: "238bcf1520935858",
+    5: "1e60f7bc4e11ac02",
+    6: "5eef8dac2eeb7f96",
+    7: "6bc836714ee73e88",
+    8: "9b6431ea0ad16b1b",
+    9: "f940451c1f95082d",
+    10: "a9676897ee36a039",
+    11: "40be14a0d38b1caa",
+    12: "2e66709c8ce5ef31",
+    13: "1632e087067f7306",
+    14: "27f1fdf2d8211bc7",
+}
+
+TODAY = date.today().strftime("%Y-%m-%d")
+#? (content, date) rows as the first version saved them, before content hashes and dedupe
+V1_ROWS = [
+    ("first clip", "2024-05-01"),
+    ("https://example.com/docs", "2024-05-01"),
+    ("first clip", "2024-05-01"),  # an older build could race its duplicate check
+    ("first clip", "2024-05-02"),
+    ("searchable haystack words", TODAY),
+]
+
+
+def step_digest(description, statements):
+    digest = hashlib.sha256(description.encode())
+    for statement in statements:
+        text = statement.__name__ if callable(statement) else " ".join(statement.split())
+        digest.update(text.encode() + b"\0")
+    return digest.hexdigest()[:16]
+
+
+def v1_database(path):
+    """A file left by the first version: schema v1 and its rows"""
+    backend = SqliteBackend(path)
+    _, _, statements = MIGRATIONS[0]
+    for statement in statements:
+        backend.execute(statement)
+    for content, day in V1_ROWS:
+        backend.execute("INSERT INTO clipboard_items (content, date) VALUES (?, ?)", (content, day))
+    backend.execute("PRAGMA user_version = 1")
+    return backend
+
+
+def test_shipped_steps_are_unchanged():
+    assert [version for version, _, _ in MIGRATIONS] == list(range(1, LATEST_SCHEMA_VERSION + 1))
+    for version, description, statements in MIGRATIONS:
+        if version in SHIPPED_STEPS:
+            assert step_digest(description, statements) == SHIPPED_STEPS[version], f"v{version} was edited"
+
+
+def test_upgrade_from_v1_keeps_every_clip(tmp_path):
+    backend = v1_database(str(tmp_path / "history.db"))
+    assert run_migrations(backend)
+    assert backend.schema_version() == LATEST_SCHEMA_VERSION
+
+    # One row per distinct text, one occurrence per text and day
+    assert backend.history_totals()[0] == 4
+    assert sorted(row[0] for row in backend.execute("SELECT content FROM contents")) == [
+        "first clip", "https://example.com/docs", "searchable haystack words",
+    ]
+    # Copies from before v14 count once per day they were copied on
+    assert backend.copy_count(content_hash("first clip")) == 2
+    assert [content for content, *_ in backend.load_day_items("2024-05-01")] == [
+        "first clip", "https://example.com/docs",
+    ]
+    # Calendar counts and full-text search come along
+    assert backend.month_summary(2024, 5)[1][0] == 2
+    assert backend.search('"haystack"', 10) == [("searchable haystack words", TODAY, MIME_TEXT, None)]
+
+    # Kinds and fingerprints are left to the background backfill
+    assert backend.execute("SELECT COUNT(*) FROM contents WHERE length < 0 OR simhash IS NULL") == [(3,)]
+    backfill = ContentBackfill(backend=backend)
+    assert backfill.classify_kinds(backend) == 3
+    assert backfill.fingerprint(backend) == 3
+    assert backend.execute(
+        "SELECT kind FROM contents WHERE content_hash = ?", (content_hash("https://example.com/docs"),)
+    ) == [(KIND_URL,)]
+
+    # Already current: nothing runs twice
+    assert run_migrations(backend)
+    assert backend.history_totals()[0] == 4
+    backend.close()
+
+
+def test_newer_schema_is_refused(backend):
+    backend.execute(f"PRAGMA user_version = {LATEST_SCHEMA_VERSION + 1}")
+    assert not run_migrations(backend)
+
+
+def test_history_cli_reads_an_older_file_untouched(tmp_path, capsys):
+    path = str(tmp_path / "history.db")
+    v1_database(path).close()
+    # Like the database the first version shipped, which never switched to WAL
+    connection = sqlite3.connect(path)
+    connection.execute("PRAGMA journal_mode = DELETE")
+    connection.close()
+    with open(path, "rb") as f:
+        before = f.read()
+
+    assert history_cli(["--db", path, "recent"]) == 1
+    assert "upgrade" in capsys.readouterr().err
+    # No header rewrite, no WAL conversion
+    with open(path, "rb") as f:
+        assert f.read() == before
+    assert not os.path.exists(path + "-wal")
+
+    assert history_cli(["--db", path, "upgrade"]) == 0
+    assert json.loads(capsys.readouterr().out) == {"schema": LATEST_SCHEMA_VERSION, "previous_schema": 1}
+    assert history_cli(["--db", path, "search", "haystack"]) == 0
+    assert [clip["content"] for clip in json.loads(capsys.readouterr().out)] == ["searchable haystack words"]
+
+
+def test_history_cli_refuses_a_newer_schema(tmp_path, capsys):
+    path = str(tmp_path / "history.db")
+    connection = sqlite3.connect(path)
+    connection.execute(f"PRAGMA user_version = {LATEST_SCHEMA_VERSION + 1}")
+    connection.close()
+
+    assert history_cli(["--db", path, "stats"]) == 1
+    assert "newer" in capsys.readouterr().err
+    assert history_cli(["--db", path, "upgrade"]) == 1
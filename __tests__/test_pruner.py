@@ -0,0 +1,82 @@
+import os
+import sqlite3
+from datetime import date, timedelta
+
+from Db.backends.sqlite_backend import SqliteBackend
+from Db.migrations import run_migrations
+from Db.pruner import HistoryPruner, AUTO_VACUUM_INCREMENTAL, convert_to_incremental_vacuum
+from Db.writer import ClipboardWriter
+
+
+def days_ago(days):
+    return (date.today() - timedelta(days=days)).strftime("%Y-%m-%d")
+
+
+def save(backend, clips):
+    """Commit (text, date) pairs through the writer, as captured clips are"""
+    writer = ClipboardWriter(backend=backend)
+    for text, day in clips:
+        writer.submit(text, day)
+    writer.start()
+    writer.stop()
+
+
+def stored_texts(backend):
+    return {row[0] for row in backend.execute("SELECT content FROM contents")}
+
+
+def pruner(**limits):
+    limits = {"max_age_days": None, "max_rows": None, "max_bytes": None, "batch_size": 3, **limits}
+    return HistoryPruner(**limits)
+
+
+def test_nothing_is_pruned_by_default(backend):
+    save(backend, [("ancient", days_ago(5000)), ("today", days_ago(0))])
+    assert HistoryPruner().prune(backend) == 0
+    assert stored_texts(backend) == {"ancient", "today"}
+
+
+def test_clips_older_than_max_age_are_pruned(backend):
+    save(backend, [(f"old {i}", days_ago(40 + i)) for i in range(7)] + [("recent", days_ago(10))])
+    assert pruner(max_age_days=30).prune(backend) == 7
+    assert stored_texts(backend) == {"recent"}
+
+
+def test_oldest_clips_go_first_past_max_rows(backend):
+    save(backend, [(f"clip {i}", days_ago(10 - i)) for i in range(10)])
+    assert pruner(max_rows=4).prune(backend) == 6
+    assert stored_texts(backend) == {f"clip {i}" for i in range(6, 10)}
+    assert backend.history_totals()[0] == 4
+
+
+def test_new_files_return_pruned_space(backend, tmp_path):
+    assert int(backend.execute("PRAGMA auto_vacuum")[0][0]) == AUTO_VACUUM_INCREMENTAL
+    # Random text, so compression does not make the clips small
+    save(backend, [(os.urandom(4000).hex(), days_ago(100)) for _ in range(50)] + [("new", days_ago(0))])
+    backend.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    size_before = os.path.getsize(tmp_path / "history.db")
+
+    assert pruner(max_age_days=30, batch_size=50).prune(backend) == 50
+    assert int(backend.execute("PRAGMA freelist_count")[0][0]) == 0
+    assert os.path.getsize(tmp_path / "history.db") < size_before
+    assert stored_texts(backend) == {"new"}
+
+
+def test_pruning_never_converts_the_file(tmp_path):
+    path = str(tmp_path / "old.db")
+    # A file from before auto_vacuum was enabled: the mode is fixed once a table exists
+    old = sqlite3.connect(path)
+    old.execute("CREATE TABLE created_before (id INTEGER)")
+    old.commit()
+    old.close()
+    backend = SqliteBackend(path)
+    assert run_migrations(backend)
+    save(backend, [("old", days_ago(100)), ("new", days_ago(0))])
+
+    assert pruner(max_age_days=30).prune(backend) == 1
+    assert int(backend.execute("PRAGMA auto_vacuum")[0][0]) != AUTO_VACUUM_INCREMENTAL
+
+    assert convert_to_incremental_vacuum(backend)
+    assert int(backend.execute("PRAGMA auto_vacuum")[0][0]) == AUTO_VACUUM_INCREMENTAL
+    assert stored_texts(backend) == {"new"}
+    backend.close()
@@ -0,0 +1,55 @@
+from config import SIMHASH_MAX_DISTANCE
+from Db.backfill import ContentBackfill
+from Db.blob_store import MIME_PNG
+from Db.writer import ClipboardWriter
+from utils.content_hash import content_hash, blob_content_hash
+from utils.simhash import simhash, hamming
+
+LOG_LINE = (
+    "2026-03-14 10:22:31 ERROR worker-3 request 48213 to /api/orders failed after 3 retries: "
+    "connection reset by peer while reading the response body from the upstream payment service"
+)
+SIMILAR_LOG_LINE = LOG_LINE.replace("worker-3", "worker-7").replace("48213", "90117")
+OTHER_TEXT = (
+    "Shopping list for the weekend: apples, pears, two loaves of bread, coffee beans, "
+    "oat milk, a bag of rice and something for the barbecue on Sunday afternoon"
+)
+
+
+def save(backend, texts):
+    writer = ClipboardWriter(backend=backend)
+    for text in texts:
+        writer.submit(text)
+    writer.start()
+    writer.stop()
+
+
+def test_near_duplicates_are_close_and_unrelated_texts_are_not():
+    assert hamming(simhash(LOG_LINE), simhash(SIMILAR_LOG_LINE)) <= SIMHASH_MAX_DISTANCE
+    assert hamming(simhash(LOG_LINE), simhash(OTHER_TEXT)) > SIMHASH_MAX_DISTANCE
+
+
+def test_near_duplicates_are_found_through_the_band_indexes(backend):
+    save(backend, [LOG_LINE, SIMILAR_LOG_LINE, OTHER_TEXT])
+    matches = dict(backend.near_duplicates(simhash(LOG_LINE)))
+    assert content_hash(SIMILAR_LOG_LINE) in matches
+    assert content_hash(OTHER_TEXT) not in matches
+    assert matches[content_hash(LOG_LINE)] == 0
+
+
+def test_backfill_fingerprints_older_texts_but_not_blobs(backend):
+    save(backend, [LOG_LINE, SIMILAR_LOG_LINE, OTHER_TEXT])
+    blob_hash = "ab" * 32
+    writer = ClipboardWriter(backend=backend)
+    writer.submit("Image 10x10", item_hash=blob_content_hash(MIME_PNG, blob_hash), blob=(MIME_PNG, blob_hash))
+    writer.start()
+    writer.stop()
+    # As left by a version before fingerprints
+    backend.execute("UPDATE contents SET simhash = NULL")
+
+    backfill = ContentBackfill(batch_size=2, backend=backend)
+    assert backfill.fingerprint(backend) == 3
+    assert backend.content_simhash(content_hash(LOG_LINE)) == simhash(LOG_LINE)
+    assert backend.execute("SELECT simhash FROM contents WHERE blob_hash IS NOT NULL") == [(None,)]
+    # Nothing left, a second pass is free
+    assert backfill.fingerprint(backend) == 0
@@ -0,0 +1,57 @@
+from PyQt5 import QtWidgets # type: ignore
+
+from Db.backends.base import TIMELINE_START
+from Db.writer import ClipboardWriter
+from core.navigation.timeline import HistoryTimeline
+from utils.clip_list import ENTRY_HEADING
+
+CLIPS = [f"timeline clip {i}" for i in range(5)]
+
+
+class SyncLoader:
+    """HistoryLoader.run() answered right away on the calling thread"""
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    def run(self, query, callback):
+        callback(query(self.backend))
+
+
+class Window:
+    """The part of ClipboardManager a HistoryTimeline uses"""
+
+    def __init__(self, backend):
+        self.content_widget = QtWidgets.QWidget()
+        self.content_layout = QtWidgets.QVBoxLayout(self.content_widget)
+        self.loader = SyncLoader(backend)
+
+
+def save_with_newest_undecodable(backend, undecodable):
+    writer = ClipboardWriter(backend=backend)
+    for text in CLIPS:
+        writer.submit(text, "2024-05-01")
+    writer.start()
+    writer.stop()
+    # As after the compression dictionary they were written with went missing
+    for text in CLIPS[-undecodable:]:
+        backend.execute("UPDATE contents SET codec = 'zlib-dict:missing' WHERE content = ?", (text,))
+
+
+def test_pages_keep_the_key_of_undecodable_clips(backend):
+    save_with_newest_undecodable(backend, 3)
+    page = backend.load_timeline_page(3)
+    assert [content for _, _, content, _, _ in page] == [None, None, None]
+
+    item_id, timestamp = page[-1][0], page[-1][1]
+    older = backend.load_timeline_page(3, (timestamp, item_id))
+    assert [content for _, _, content, _, _ in older] == CLIPS[1::-1]
+
+
+def test_timeline_goes_on_past_a_page_it_cannot_decode(qapp, backend):
+    save_with_newest_undecodable(backend, 3)
+    timeline = HistoryTimeline(Window(backend), page_size=3, collapse_similar=False)
+    timeline.create()
+
+    assert [entry.text for entry in timeline.model.entries() if entry.kind != ENTRY_HEADING] == CLIPS[1::-1]
+    assert timeline._next_key != TIMELINE_START
@@ -0,0 +1,136 @@
+from config import FILTER_INDEX_SAMPLE_CHARS
+from Db.blob_store import MIME_URI_LIST
+from Db.dedupe import DedupeIndex
+from Db.history import HistoryQueries
+from Db.writer import ClipboardWriter
+from utils.content_kind import KIND_FILES, KIND_URL, KIND_TEXT
+from utils.trigram_index import TrigramIndex
+
+
+def test_ranks_whole_matches_first_then_newest():
+    index = TrigramIndex()
+    index.update([
+        "deploy the staging server",
+        "unrelated grocery list",
+        "staging area cleanup",
+        "deploy to production",
+    ])
+    assert index.search("staging server", 10) == ["deploy the staging server"]
+    # Both contain "deploy", the newer one wins the tie
+    assert index.search("deploy", 10) == ["deploy to production", "deploy the staging server"]
+
+
+def test_typos_still_match():
+    index = TrigramIndex()
+    index.update(["kubernetes deployment yaml", "postgres connection string"])
+    assert index.search("kubernets deploymnt", 5) == ["kubernetes deployment yaml"]
+    assert index.search("zzzz qqqq", 5) == []
+
+
+def test_case_and_whitespace_are_ignored():
+    index = TrigramIndex()
+    index.add("Hello   World\nagain")
+    assert index.search("HELLO world", 5) == ["Hello   World\nagain"]
+
+
+def test_short_queries_are_substring_matches():
+    index = TrigramIndex()
+    index.update(["ab cd", "xy", "abc"])
+    assert index.search("ab", 5) == ["abc", "ab cd"]
+    assert index.search("  ", 5) == []
+
+
+def test_limit_and_where():
+    index = TrigramIndex()
+    index.update(f"log line number {i}" for i in range(20))
+    assert len(index.search("log line", 5)) == 5
+    assert index.search("log line", 5, where=lambda text: text.endswith("7")) == ["log line number 17", "log line number 7"]
+
+
+def test_kind_is_the_one_stored_with_the_clip(backend):
+    files = "file:///home/user/reports/summary.pdf"
+    writer = ClipboardWriter(backend=backend)
+    writer.submit(files, "2024-05-01", blob=(MIME_URI_LIST, "ab" * 32))
+    writer.submit("https://example.com/reports/summary", "2024-05-01")
+    writer.start()
+    writer.stop()
+    index = TrigramIndex()
+    for text, _, _, _, kind in backend.load_day_items("2024-05-01"):
+        index.add(text, kind)
+
+    # Its text alone looks like a link, the file list only matches as files
+    assert index.search("reports summary", 5, kind=KIND_FILES) == [files]
+    assert files not in index.search("reports summary", 5, kind=KIND_URL)
+    assert index.search("summary.pdf", 5, kind=KIND_TEXT) == []
+    assert index.search("fi", 5, kind=KIND_FILES) == [files]
+    assert (files, KIND_FILES) in index.entries()
+
+
+def test_listed_clips_get_the_kind_they_were_stored_as(backend):
+    files = "file:///home/user/reports/summary.pdf"
+    saved = []
+    writer = ClipboardWriter(backend=backend, dedupe=DedupeIndex(), on_saved=saved.extend)
+    writer.submit(files, "2024-05-01", blob=(MIME_URI_LIST, "ab" * 32))
+    writer.submit("https://example.com/reports/summary", "2024-05-01")
+    writer.start()
+    writer.stop()
+    # A text saved before is not classified again, its stored kind is looked up
+    writer = ClipboardWriter(backend=backend, dedupe=DedupeIndex(), on_saved=saved.extend)
+    writer.dedupe.load(backend)
+    writer.submit(files, "2024-05-02")
+    writer.start()
+    writer.stop()
+
+    assert saved == [
+        (files, KIND_FILES), ("https://example.com/reports/summary", KIND_URL), (files, KIND_FILES),
+    ]
+    # The daemon hands its clips to the window with the same kinds
+    assert [clip["kind"] for clip in HistoryQueries(backend).since()] == [KIND_URL, KIND_FILES, KIND_FILES]
+
+
+def test_kind_is_filtered_before_candidates_are_cut():
+    index = TrigramIndex()
+    index.add("error code 500 at https://example.com/status", KIND_URL)
+    for i in range(200):
+        index.add(f"error code {i} in the build log", KIND_TEXT)
+
+    assert index.search("error code", 10, kind=KIND_URL) == ["error code 500 at https://example.com/status"]
+    assert index.search("error code", 10, where=lambda text: "500" in text) == [
+        "error code 500 at https://example.com/status",
+    ]
+
+
+def test_add_keeps_a_text_once():
+    index = TrigramIndex()
+    index.update(["same text", "other text", "same text"])
+    assert len(index) == 2
+    assert index.texts() == ["same text", "other text"]
+    assert "same text" in index
+
+
+def test_only_the_sample_is_indexed():
+    index = TrigramIndex()
+    index.add("a" * FILTER_INDEX_SAMPLE_CHARS + " needle")
+    assert index.search("needle", 5) == []
+
+
+def test_oldest_texts_are_dropped_past_the_budget():
+    index = TrigramIndex(budget_chars=50)
+    texts = [f"clip number {i:02d}" for i in range(12)]  # 14 characters each
+    index.update(texts)
+
+    assert index.texts() == texts[-3:]
+    assert index.search("clip number", 20) == texts[:-4:-1]
+    assert texts[0] not in index and texts[0] not in index.search("number 00", 5)
+    # Evicted ids were cut off the posting lists
+    assert all(doc_id >= index._first_id for postings in index._postings.values() for doc_id in postings)
+
+
+def test_clear():
+    index = TrigramIndex()
+    index.update(["first clip", "second clip"])
+    index.clear()
+    assert len(index) == 0
+    assert index.search("clip", 5) == []
+    index.add("third clip")
+    assert index.search("clip", 5) == ["third clip"]
@@ -0,0 +1,140 @@
+import time
+
+import Db.writer
+from Db.backends.sqlite_backend import SqliteBackend
+from Db.dedupe import DedupeIndex
+from Db.migrations import run_migrations
+from Db.writer import ClipboardWriter
+from utils.content_hash import content_hash
+
+
+def stored_count(backend):
+    return backend.execute("SELECT COUNT(*) FROM contents")[0][0]
+
+
+def test_clips_are_committed_in_batches(backend):
+    writer = ClipboardWriter(batch_size=500, flush_interval_ms=200, backend=backend)
+    writer.start()
+    for i in range(1200):
+        assert writer.submit(f"clip {i}")
+    writer.stop()
+
+    stats = writer.stats()
+    assert stats["items_flushed"] == 1200
+    assert stats["items_dropped"] == 0
+    assert 3 <= stats["flushes"] < 1200
+    assert stored_count(backend) == 1200
+
+
+def test_submit_never_blocks_on_a_full_queue(backend):
+    writer = ClipboardWriter(queue_size=2, backend=backend)
+    started = time.perf_counter()
+    # Not started yet, nothing drains the queue
+    for i in range(50):
+        assert writer.submit(f"clip {i % 10}")
+    assert time.perf_counter() - started < 0.5
+    # Two in the queue, the rest collapsed to the 10 distinct texts
+    assert writer.stats()["queue_depth"] == 2 + 10
+
+    writer.start()
+    writer.stop()
+    assert stored_count(backend) == 10
+    assert writer.stats()["queue_depth"] == 0
+
+
+def test_overflow_drops_the_oldest_past_its_size(backend, monkeypatch):
+    monkeypatch.setattr(Db.writer, "WRITER_OVERFLOW_SIZE", 3)
+    writer = ClipboardWriter(queue_size=1, backend=backend)
+    for i in range(6):
+        writer.submit(f"clip {i}")
+    assert writer.stats()["items_dropped"] == 2
+
+    writer.start()
+    writer.stop()
+    texts = {row[0] for row in backend.execute("SELECT content FROM contents")}
+    assert texts == {"clip 0", "clip 3", "clip 4", "clip 5"}
+
+
+def test_stop_waits_a_bounded_time():
+    writer = ClipboardWriter()
+    started = time.perf_counter()
+    writer.stop(timeout=0.1)  # never started
+    assert time.perf_counter() - started < 0.1
+
+
+class FlakyBackend(SqliteBackend):
+    """Fails the first `failures` commits, as a database locked past busy_timeout would"""
+
+    failures = 0
+
+    def commit(self):
+        if self.failures:
+            self.failures -= 1
+            return False
+        return super().commit()
+
+
+def flaky_writer(tmp_path, monkeypatch, failures):
+    monkeypatch.setattr(Db.writer, "WRITER_RETRY_DELAY_MS", 1)
+    backend = FlakyBackend(str(tmp_path / "history.db"))
+    assert run_migrations(backend)
+    backend.failures = failures
+    return ClipboardWriter(flush_interval_ms=20, backend=backend), backend
+
+
+def test_failed_batch_is_retried(tmp_path, monkeypatch):
+    writer, backend = flaky_writer(tmp_path, monkeypatch, failures=2)
+    writer.start()
+    for i in range(5):
+        writer.submit(f"clip {i}")
+    writer.stop()
+    assert writer.stats()["items_flushed"] == 5
+    assert writer.stats()["items_dropped"] == 0
+    assert stored_count(SqliteBackend(str(tmp_path / "history.db"))) == 5
+
+
+def test_batch_failing_every_retry_is_requeued(tmp_path, monkeypatch):
+    writer, backend = flaky_writer(tmp_path, monkeypatch, failures=Db.writer.WRITER_FLUSH_RETRIES + 1)
+    writer.start()
+    for i in range(5):
+        writer.submit(f"clip {i}")
+    deadline = time.monotonic() + 5
+    while writer.stats()["items_flushed"] < 5 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    writer.stop()
+    assert writer.stats()["items_flushed"] == 5
+    assert writer.stats()["items_dropped"] == 0
+    assert stored_count(SqliteBackend(str(tmp_path / "history.db"))) == 5
+
+
+def test_stop_gives_up_on_a_database_that_stays_locked(tmp_path, monkeypatch):
+    writer, backend = flaky_writer(tmp_path, monkeypatch, failures=10 ** 9)
+    for i in range(5):
+        writer.submit(f"clip {i}")
+    writer.start()
+    writer.stop(timeout=5)
+    assert not writer.is_alive()
+    assert writer.stats()["items_dropped"] == 5
+
+
+def test_every_copy_is_counted_on_one_row_per_day(backend):
+    writer = ClipboardWriter(backend=backend, dedupe=DedupeIndex())
+    for day in ("2026-01-01", "2026-01-01", "2026-01-01", "2026-01-02"):
+        writer.submit("copied again", day)
+    writer.start()
+    writer.stop()
+    # Repeats of a text already stored take the occurrence-only path
+    writer = ClipboardWriter(backend=backend, dedupe=DedupeIndex())
+    writer.dedupe.load(backend)
+    writer.submit("copied again", "2026-01-02")
+    writer.start()
+    writer.stop()
+
+    assert backend.copy_count(content_hash("copied again")) == 5
+    assert backend.copy_count(content_hash("never copied")) == 0
+    assert backend.execute("SELECT COUNT(*) FROM contents") == [(1,)]
+    assert backend.execute("SELECT date, copies FROM occurrences ORDER BY date") == [
+        ("2026-01-01", 3), ("2026-01-02", 2),
+    ]
+    # The calendar still lists the text once a day
+    assert backend.month_summary(2026, 1)[1][0] == 1
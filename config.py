@@ -0,0 +1,128 @@
+#? Application wide settings
+
+#? SQLite file holding the clipboard history (relative to the working directory)
+DATABASE_PATH = "clipboard_history.db"
+
+#? Pragmas applied once to every connection opened by Db.database
+SQLITE_BUSY_TIMEOUT_MS = 5000
+SQLITE_MMAP_SIZE = 256 * 1024 * 1024
+SQLITE_CACHE_SIZE_KB = 16 * 1024
+
+#? Write-behind writer (Db.writer): captured clips are committed in batches
+WRITER_QUEUE_SIZE = 10000
+WRITER_BATCH_SIZE = 500
+WRITER_FLUSH_INTERVAL_MS = 250
+#? Clips that find the queue full wait here instead, identical ones collapsed; past this many distinct
+#? ones the oldest are dropped. Submitting never blocks the GUI thread
+WRITER_OVERFLOW_SIZE = 10000
+#? How long stop() waits for the queue to be flushed before giving up on it
+WRITER_STOP_TIMEOUT_S = 10.0
+#? A batch that fails (e.g. the database stayed locked past busy_timeout) is retried this many times,
+#? waiting twice as long each time, then goes back to the overflow to be retried with the next batch
+WRITER_FLUSH_RETRIES = 3
+WRITER_RETRY_DELAY_MS = 250
+
+#? Transparent compression (Db.codec): clips at least this many UTF-8 bytes are stored zlib-compressed
+COMPRESSION_THRESHOLD_BYTES = 16 * 1024
+COMPRESSION_LEVEL = 6
+#? Prime zlib with a dictionary trained from earlier clips (stored in the DB, so old rows stay readable)
+COMPRESSION_USE_DICTIONARY = False
+
+#? Retention (Db.pruner): None disables a limit, all are off so nothing is deleted unless asked for.
+#? Oldest clips are pruned first.
+RETENTION_MAX_AGE_DAYS = None
+RETENTION_MAX_ROWS = None
+RETENTION_MAX_BYTES = None
+#? Pruning runs in small transactions so the write lock is never held for long
+PRUNE_BATCH_SIZE = 500
+PRUNE_INTERVAL_MIN = 30
+#? Free pages returned to the OS per pruning run (PRAGMA incremental_vacuum)
+VACUUM_PAGES_PER_RUN = 2000
+#? Clips saved by older versions get their missing columns (Db.backfill) this many per transaction
+BACKFILL_BATCH_SIZE = 500
+
+#? All-time timeline: rows fetched per page, how close (px) to the bottom of the
+#? timeline list the next page is requested, and the height of that list under the calendar
+TIMELINE_PAGE_SIZE = 50
+TIMELINE_PREFETCH_PX = 300
+TIMELINE_VIEW_HEIGHT = 400
+
+#? NDJSON export/import (Db.transfer): rows per export page and per import transaction
+EXPORT_PAGE_SIZE = 1000
+IMPORT_BATCH_SIZE = 50000
+IMPORT_CACHE_SIZE_KB = 256 * 1024
+
+#? Dedupe index (Db.dedupe): Bloom filter over every stored content_hash, kept beside the database.
+#? Sized for this many texts at this false-positive rate, rebuilt larger once history outgrows it
+DEDUPE_BLOOM_PATH = "clipboard_history.bloom"
+DEDUPE_BLOOM_CAPACITY = 1_000_000
+DEDUPE_BLOOM_ERROR_RATE = 0.01
+
+#? Capture policy (core.capture_policy), per source: CLIPBOARD is Ctrl+C, SELECTION is the
+#? X11/Wayland PRIMARY selection. Only the last event of a burst inside the debounce window
+#? is read. Lengths are in characters and rates in clips per minute; None disables a limit.
+#? Ctrl+C is deliberate, so every copy is kept however fast they come: 0 reads it on the next
+#? pass of the event loop (still one read for the several dataChanged one copy can emit)
+CAPTURE_CLIPBOARD_DEBOUNCE_MS = 0
+CAPTURE_CLIPBOARD_MIN_LENGTH = 1
+#? No drop limit, larger copies take the large-clip path below and are truncated past its ceiling
+CAPTURE_CLIPBOARD_MAX_LENGTH = None
+CAPTURE_CLIPBOARD_MAX_PER_MINUTE = None
+#? Copying the same text again is a copy too, it is saved as one more copy of the listed clip
+CAPTURE_CLIPBOARD_SKIP_UNCHANGED = False
+#? Selection changes on every mouse move while dragging, so it waits longer and accepts less
+CAPTURE_SELECTION_DEBOUNCE_MS = 600
+CAPTURE_SELECTION_MIN_LENGTH = 2
+CAPTURE_SELECTION_MAX_LENGTH = 1024 * 1024
+CAPTURE_SELECTION_MAX_PER_MINUTE = 30
+#? Ignore the PRIMARY selection entirely, only explicit copies are kept
+CAPTURE_IGNORE_SELECTION = False
+
+#? Rich clipboard payloads (Db.blob_store): images and lists of local files are kept as files named
+#? by their SHA-256 under BLOB_STORE_PATH, history rows only reference them. Larger payloads are dropped.
+#? A copy that has plain text is kept as that text. Remove a format to keep only the text of such copies,
+#? add "text/html" to also keep web content copied without any text (listed by its text)
+CAPTURE_RICH_MIME_TYPES = ("image/png", "text/uri-list")
+BLOB_STORE_PATH = "clipboard_blobs"
+BLOB_MAX_BYTES = 64 * 1024 * 1024
+#? Image thumbnails (core.media), made on a worker pool and cached next to the blobs
+THUMBNAIL_SIZE_PX = 160
+THUMBNAIL_WORKERS = 2
+
+#? Large clips (core.ingest), in characters: above LARGE_CLIP_CHARS a copy is hashed, previewed
+#? and queued for saving on a worker instead of the GUI thread. Above CLIP_CEILING_CHARS only a
+#? truncated preview and the original size are kept.
+LARGE_CLIP_CHARS = 256 * 1024
+CLIP_CEILING_CHARS = 16 * 1024 * 1024
+CLIP_PREVIEW_CHARS = 2000
+HASH_CHUNK_CHARS = 1024 * 1024
+#? Content kinds (utils.content_kind) are judged from this many leading characters
+CLASSIFY_SAMPLE_CHARS = 4096
+
+#? Near-duplicates (utils.simhash): clips whose fingerprints differ in at most SIMHASH_MAX_DISTANCE
+#? bits (6 at most, the indexed bands find nothing further) are collapsed in the History timeline.
+#? Fingerprints cover the first SIMHASH_SAMPLE_CHARS characters
+SIMHASH_MAX_DISTANCE = 6
+SIMHASH_SAMPLE_CHARS = 4096
+TIMELINE_COLLAPSE_NEAR_DUPLICATES = True
+
+#? As-you-type filter (utils.trigram_index) over the clips listed in the window, answered from
+#? memory while the full-text search waits for a typing pause. The index holds at most
+#? FILTER_INDEX_BUDGET_CHARS characters (about 6 bytes each with its postings, so ~24 MB),
+#? dropping the oldest clips beyond that; each clip is indexed on its first FILTER_INDEX_SAMPLE_CHARS.
+#? A clip matches with at least FILTER_MIN_SIMILARITY of the typed trigrams
+FILTER_INDEX_BUDGET_CHARS = 4 * 1024 * 1024
+FILTER_INDEX_SAMPLE_CHARS = 512
+FILTER_MIN_SIMILARITY = 0.5
+FILTER_MAX_RESULTS = 30
+
+#? Elided clip text (utils.clippad_text_resize): the lines a clip shows at a given width are laid out
+#? once and kept for the ELIDE_CACHE_ENTRIES most recently shown (clip, width, font, lines)
+ELIDE_CACHE_ENTRIES = 4096
+
+#? Headless daemon (python main.py --daemon): captures without a window and answers queries on a
+#? Unix socket beside the database. A window started while it runs only lists and polls for new clips.
+DAEMON_SOCKET_PATH = "clipboard-manager.sock"
+DAEMON_POLL_MS = 1000
+#? Seconds a client waits for the daemon before treating it as gone
+DAEMON_TIMEOUT_S = 2.0
@@ -0,0 +1,220 @@
+from PyQt5 import QtCore # type: ignore
+from PyQt5.QtGui import QClipboard # type: ignore
+from collections import Counter, deque
+import time
+import logging
+
+from config import (
+    CAPTURE_CLIPBOARD_DEBOUNCE_MS,
+    CAPTURE_CLIPBOARD_MIN_LENGTH,
+    CAPTURE_CLIPBOARD_MAX_LENGTH,
+    CAPTURE_CLIPBOARD_MAX_PER_MINUTE,
+    CAPTURE_CLIPBOARD_SKIP_UNCHANGED,
+    CAPTURE_SELECTION_DEBOUNCE_MS,
+    CAPTURE_SELECTION_MIN_LENGTH,
+    CAPTURE_SELECTION_MAX_LENGTH,
+    CAPTURE_SELECTION_MAX_PER_MINUTE,
+    CAPTURE_IGNORE_SELECTION,
+    CAPTURE_RICH_MIME_TYPES,
+    BLOB_MAX_BYTES,
+)
+from core.media import read_rich_payload
+from core.ingest import is_large
+
+logger = logging.getLogger('clipboard_manager')
+
+#? Source names used in the captured signal and in stats()
+SOURCE_CLIPBOARD = "clipboard"
+SOURCE_SELECTION = "selection"
+
+#? Why an event did not become a clip, keys of stats()[source]["dropped"]
+DROP_DISABLED = "disabled"
+DROP_COALESCED = "coalesced"
+DROP_NOT_TEXT = "not_text"
+DROP_TOO_SHORT = "too_short"
+DROP_TOO_LONG = "too_long"
+DROP_UNCHANGED = "unchanged"
+DROP_RATE_LIMITED = "rate_limited"
+
+
+class CapturePolicy:
+    """
+    Limits for one clipboard source, None disables a limit.
+    `rich_mime_types` are the non-text formats (core.media) captured as blobs, up to `max_bytes`.
+    `skip_unchanged` drops a text equal to the last one captured from the source.
+    """
+
+    def __init__(self, debounce_ms, min_length=1, max_length=None, max_per_minute=None, enabled=True,
+                 rich_mime_types=(), max_bytes=None, skip_unchanged=True):
+        self.debounce_ms = debounce_ms
+        self.min_length = min_length
+        self.max_length = max_length
+        self.max_per_minute = max_per_minute
+        self.enabled = enabled
+        self.rich_mime_types = rich_mime_types
+        self.max_bytes = max_bytes
+        self.skip_unchanged = skip_unchanged
+
+
+def default_policies():
+    """{source: CapturePolicy} from config.py"""
+    return {
+        SOURCE_CLIPBOARD: CapturePolicy(
+            CAPTURE_CLIPBOARD_DEBOUNCE_MS,
+            CAPTURE_CLIPBOARD_MIN_LENGTH,
+            CAPTURE_CLIPBOARD_MAX_LENGTH,
+            CAPTURE_CLIPBOARD_MAX_PER_MINUTE,
+            rich_mime_types=CAPTURE_RICH_MIME_TYPES,
+            max_bytes=BLOB_MAX_BYTES,
+            skip_unchanged=CAPTURE_CLIPBOARD_SKIP_UNCHANGED,
+        ),
+        SOURCE_SELECTION: CapturePolicy(
+            CAPTURE_SELECTION_DEBOUNCE_MS,
+            CAPTURE_SELECTION_MIN_LENGTH,
+            CAPTURE_SELECTION_MAX_LENGTH,
+            CAPTURE_SELECTION_MAX_PER_MINUTE,
+            enabled=not CAPTURE_IGNORE_SELECTION,
+        ),
+    }
+
+
+class _SourceState:
+    def __init__(self, mode, policy, timer):
+        self.mode = mode
+        self.policy = policy
+        self.timer = timer
+        self.last_text = None
+        self.accepted_at = deque()
+        self.events = 0
+        self.captured = 0
+        self.dropped = Counter()
+
+
+class ClipboardCapture(QtCore.QObject):
+    """
+    Sits between the QClipboard signals and the save path.
+
+    A signal only (re)starts the source's single-shot debounce timer, so a burst
+    of events (a drag selection, or the several dataChanged one copy can emit)
+    costs a counter increment each and the clipboard is read once, when the
+    burst is over. That read is then checked against the source's CapturePolicy:
+    length limits, unchanged since the last clip (if the policy skips those), and
+    a per-minute rate limit.
+    Accepted text is emitted as captured(text, source), or unstripped as
+    captured_large(text, source) above LARGE_CLIP_CHARS (core.ingest); file
+    lists, and images without text (when the policy allows them), as
+    captured_payload(RichPayload, source). Every other event is counted under
+    the reason it was dropped.
+    """
+
+    captured = QtCore.pyqtSignal(str, str)
+    #? object, so the text is passed by reference instead of converted to a QString and back
+    captured_large = QtCore.pyqtSignal(object, str)
+    captured_payload = QtCore.pyqtSignal(object, str)
+
+    def __init__(self, clipboard, parent=None, policies=None):
+        super().__init__(parent)
+        self.clipboard = clipboard
+        self._sources = {}
+        policies = policies or default_policies()
+        for source, mode, signal in (
+            (SOURCE_CLIPBOARD, QClipboard.Clipboard, clipboard.dataChanged),
+            (SOURCE_SELECTION, QClipboard.Selection, clipboard.selectionChanged),
+        ):
+            timer = QtCore.QTimer(self)
+            timer.setSingleShot(True)
+            timer.timeout.connect(lambda source=source: self._read(source))
+            self._sources[source] = _SourceState(mode, policies[source], timer)
+            signal.connect(lambda source=source: self._on_event(source))
+
+    def _on_event(self, source):
+        state = self._sources[source]
+        state.events += 1
+        if not state.policy.enabled:
+            state.dropped[DROP_DISABLED] += 1
+            return
+        if state.timer.isActive():
+            # Superseded by this event before it was read
+            state.dropped[DROP_COALESCED] += 1
+        state.timer.start(state.policy.debounce_ms)
+
+    def _read(self, source):
+        state = self._sources[source]
+        policy = state.policy
+        mime_data = self.clipboard.mimeData(state.mode)
+        if mime_data is None:
+            state.dropped[DROP_NOT_TEXT] += 1
+            return
+        payload = read_rich_payload(mime_data, policy.rich_mime_types) if policy.rich_mime_types else None
+        if payload is not None:
+            # Repeats are recognised by their hash on the media workers, not compared here
+            if policy.max_bytes is not None and payload.size() > policy.max_bytes:
+                state.dropped[DROP_TOO_LONG] += 1
+            elif not self._within_rate(state):
+                state.dropped[DROP_RATE_LIMITED] += 1
+            else:
+                state.last_text = None
+                state.captured += 1
+                self.captured_payload.emit(payload, source)
+            return
+        if not mime_data.hasText():
+            state.dropped[DROP_NOT_TEXT] += 1
+            return
+        text = mime_data.text()
+        # Checked before strip() so an oversized text is not copied again
+        if policy.max_length is not None and len(text) > policy.max_length:
+            state.dropped[DROP_TOO_LONG] += 1
+            return
+        if is_large(text):
+            # Stripped and checked for repeats on the large-clip worker, not kept here
+            if not self._within_rate(state):
+                state.dropped[DROP_RATE_LIMITED] += 1
+                return
+            state.last_text = None
+            state.captured += 1
+            self.captured_large.emit(text, source)
+            return
+        text = text.strip()
+        if not text or len(text) < policy.min_length:
+            state.dropped[DROP_TOO_SHORT] += 1
+            return
+        if policy.skip_unchanged and text == state.last_text:
+            state.dropped[DROP_UNCHANGED] += 1
+            return
+        if not self._within_rate(state):
+            state.dropped[DROP_RATE_LIMITED] += 1
+            return
+
+        state.last_text = text
+        state.captured += 1
+        self.captured.emit(text, source)
+
+    @staticmethod
+    def _within_rate(state):
+        limit = state.policy.max_per_minute
+        if limit is None:
+            return True
+        now = time.monotonic()
+        window = state.accepted_at
+        while window and now - window[0] >= 60:
+            window.popleft()
+        if len(window) >= limit:
+            return False
+        window.append(now)
+        return True
+
+    def forget_last(self):
+        """Accept the current texts again, e.g. after the list was cleared"""
+        for state in self._sources.values():
+            state.last_text = None
+
+    def stats(self):
+        """{source: {"events", "captured", "dropped": {reason: count}}} since startup"""
+        return {
+            source: {
+                "events": state.events,
+                "captured": state.captured,
+                "dropped": dict(state.dropped),
+            }
+            for source, state in self._sources.items()
+        }
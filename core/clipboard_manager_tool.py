@@ -1,11 +1,11 @@
 from PyQt5.QtWidgets import QApplication, QMainWindow,QSystemTrayIcon, QMenu, QAction # type: ignore
-from PyQt5.QtCore import pyqtSlot, Qt, QDate # type: ignore
-from PyQt5.QtGui import QClipboard , QIcon , QKeySequence # type: ignore
+from PyQt5.QtCore import Qt, QDate # type: ignore
+from PyQt5.QtGui import QIcon , QKeySequence , QMovie # type: ignore
 from PyQt5 import QtWidgets , QtCore # type: ignore
-from PyQt5.QtSql import QSqlQuery # type: ignore
 
 #? Utility imports
-from utils.clippad_text_resize import ElidedLabel
+from utils.search_result_label import SearchResultLabel
+from utils.clip_list import ClipEntry, ClipListModel, ENTRY_TEXT, ENTRY_IMAGE, ENTRY_LARGE, ENTRY_FILES
 from datetime import datetime 
 import os
 import ctypes
@@ -13,86 +13,48 @@ import sys
 
 #? Ui imports
 from ui.clipboard_manager import Ui_MainWindow
-from stylesheets.button_styles import *
-from stylesheets.label_text_style import *
 
 #? DB imports
-from Db.database import get_db_connection
+from Db.database import close_db_connection
 from Db.models import init_db
-from Db.sql_queries.sql_command_for_load_histories import *
-from Db.sql_queries.sql_command_for_text_save import *
-from Db.sql_queries.sql_command_for_data_insertion import *
-from Db.sql_queries.sql_command_for_load_alltime_histories import *
+from Db.loader import HistoryLoader
+from Db.search import search_history, parse_search_query, highlight_snippet
+from Db.repository import get_repository
+from Db.dedupe import DedupeIndex
+from Db.blob_store import BlobStore, MIME_PNG, MIME_URI_LIST
+from utils.content_hash import content_hash
+from utils.content_kind import KINDS, KIND_LABELS, KIND_FILES
+from utils.trigram_index import TrigramIndex
+from config import DAEMON_POLL_MS, FILTER_MAX_RESULTS
 
 
 from core.navigation.month_navigation import MonthNavigator
-import logging
-from logging.handlers import RotatingFileHandler
-
-def setup_logging():
-    try:
-        # Get the application's base directory (works in both script and frozen app)
-        if getattr(sys, 'frozen', False):
-            # If the application is frozen (compiled with PyInstaller)
-            base_dir = os.path.dirname(sys.executable)
-        else:
-            # If running as a normal Python script
-            base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        
-        # Create logs directory
-        logs_dir = os.path.join(base_dir, "sys-logs")
-        if not os.path.exists(logs_dir):
-            os.makedirs(logs_dir)
-        
-        # Log file path with date
-        today = datetime.now().strftime("%Y-%m-%d")
-        log_file = os.path.join(logs_dir, f"clipboard-manager-{today}.log")
-        
-        # Configure logger
-        logger = logging.getLogger('clipboard_manager')
-        logger.setLevel(logging.DEBUG)
-        
-        # Clear any existing handlers (avoid duplicate logs)
-        if logger.hasHandlers():
-            logger.handlers.clear()
-        
-        # Create file handler with rotation
-        file_handler = RotatingFileHandler(log_file, maxBytes=5*1024*1024, backupCount=3)
-        file_handler.setLevel(logging.DEBUG)
-        
-        # Create console handler
-        console_handler = logging.StreamHandler()
-        console_handler.setLevel(logging.DEBUG)
-        
-        # Create formatter and add it to handlers
-        formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-        file_handler.setFormatter(formatter)
-        console_handler.setFormatter(formatter)
-        
-        # Add handlers to logger
-        logger.addHandler(file_handler)
-        logger.addHandler(console_handler)
-        
-        # Log the paths to help debug
-        logger.info(f"Application directory: {base_dir}")
-        logger.info(f"Log file location: {log_file}")
-        
-        return logger
-    except Exception as e:
-        # If there's an error with logging setup, create a simple fallback
-        print(f"Error setting up logging: {e}")
-        fallback_logger = logging.getLogger('clipboard_manager_fallback')
-        fallback_logger.addHandler(logging.StreamHandler())
-        fallback_logger.setLevel(logging.DEBUG)
-        fallback_logger.error(f"Failed to set up file logging: {e}")
-        return fallback_logger
+from core.navigation.timeline import HistoryTimeline
+from core.media import MediaIngest
+from core.ingest import is_large, preview_of
+from core.pipeline import CapturePipeline, CLIP_LARGE, CLIP_RICH
+from utils.log_setup import setup_logging
+from utils.startup_profile import StartupProfile, MARK_WINDOW, MARK_FIRST_SCREEN, MARK_HISTORY
 
 # Create logger instance
 logger = setup_logging()
 
+PLACEHOLDER_TEXT = "Nothing Here\nYou'll see your clipboard history once you copied something.."
+
 class ClipboardManager(QMainWindow, Ui_MainWindow):
-    def __init__(self):
+    """
+    The clipboard history window. It runs its own CapturePipeline, unless
+    `daemon` (a core.daemon_client.DaemonClient) is given: the headless daemon is then
+    the one capturing and the window only lists, polling it for new clips.
+
+    Only the window and the newest of today's clips are on the startup path,
+    background threads start after the first paint (see `startup`, a
+    utils.startup_profile.StartupProfile).
+    """
+
+    def __init__(self, daemon=None, startup=None):
         super().__init__()
+        self.startup = startup or StartupProfile()
         self.setupUi(self)
         # Set window icon
         icon_path = self.resource_path("assets/icon.ico")
@@ -109,32 +71,65 @@ class ClipboardManager(QMainWindow, Ui_MainWindow):
         if not init_db():
             logger.error("Failed to initialize database")
 
+        self.history_heading = None
+        self.is_history_button_clicked = False
+        #? Reference to system clipboard
+        self.clipboard = QApplication.clipboard()
+        #? Background reader, history loads (and decompression) happen off the GUI thread
+        self.loader = HistoryLoader(self)
+
+        self.daemon = daemon
+        if daemon is None:
+            #? Capture, dedupe, saving and retention, the same pipeline the headless daemon runs
+            self.pipeline = CapturePipeline(
+                self.clipboard, self, is_paused=lambda: self.is_history_button_clicked
+            )
+            self.pipeline.clip_added.connect(self.on_clip_added)
+            self.pipeline.clips_saved.connect(self.on_clips_saved)
+            self.startup.after_first_paint(self, self.pipeline.start)
+            self.dedupe = self.pipeline.dedupe
+            self.blob_store = self.pipeline.blob_store
+            self.media = self.pipeline.media
+        else:
+            logger.info("Clipboard daemon is running, the window only lists its clips")
+            self.pipeline = None
+            #? Only tracks what is listed, the daemon owns the Bloom filter and the writes
+            self.dedupe = DedupeIndex()
+            self.blob_store = BlobStore()
+            self.media = MediaIngest(self.blob_store, self)
+            self._daemon_after_id = None
+            self._daemon_polling = False
+            self.daemon_timer = QtCore.QTimer(self)
+            self.daemon_timer.setInterval(DAEMON_POLL_MS)
+            self.daemon_timer.timeout.connect(self.poll_daemon)
+            self.startup.after_first_paint(self, self.daemon_timer.start)
+
         # In __init__
         self.current_view_items = []  # To track items currently displayed
         self.selected_date = None     # Optional: track selected date
+        #? The listed text clips, for the as-you-type filter; replaced by one built on the loader with each day load
+        self.filter_index = TrigramIndex()
+        #? Listed texts indexed once the writer reports the kind it stored them as
+        self._awaiting_kind = set()
+        self._filter_generation = 0
+        self._filter_shown = None
+
+        #? Today's clips; a day picked on the calendar gets a model of its own (see show_clip_list)
+        self.clip_model = ClipListModel(self)
+        self.history_area = self.clip_list_area
+        self.show_clip_list(self.clip_model)
 
         #? Initialize navigator
         self.month_navigator = MonthNavigator(self)
+        #? All-time timeline under the calendar, paged in as the history area scrolls
+        self.timeline = HistoryTimeline(self)
         
-        self.history_heading = None
-        self.is_history_button_clicked = False
         self.setWindowFlag(Qt.FramelessWindowHint)
         
-        #? Reference to system clipboard
-        self.clipboard = QApplication.clipboard()
-        self.clipboard.dataChanged.connect(self.on_clipboard_changed)
-        
-        #? Also monitor primary selection
-        self.clipboard.selectionChanged.connect(self.on_selection_changed)
-        
-        #? Keep track of clipboard items to avoid duplicates
-        #? For new items to save to DB
-        self.clipboard_items = []
-        #? For items already in DB     
-        self.loaded_from_db = []     
-
         self.load_clipboard_history() #* Load today's history on *startup*
-        print(f"Loaded {len(self.loaded_from_db)} items from DB")  # Debug log
+        if self.daemon is not None:
+            # Right behind today's load on the loader thread: clips the daemon saves from here on are new
+            self.poll_daemon()
         self.clearall_button.installEventFilter(self)
         self.restore_button.installEventFilter(self)
         #? Implementation the logic of clearing all items
@@ -143,6 +138,22 @@ class ClipboardManager(QMainWindow, Ui_MainWindow):
         self.restore_button.clicked.connect(self.handle_restore_click)
         #? History Button connection for loading all-time history
         self.history_button.clicked.connect(self.load_alltime_history)
+        #? Every keystroke filters the listed clips in memory, the full-text search over
+        #? all history is debounced so we query once the user pauses typing
+        self.search_input.textChanged.connect(self.run_filter)
+        self.search_timer = QtCore.QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(200)
+        self.search_timer.timeout.connect(self.run_search)
+        self.search_input.textChanged.connect(self.search_timer.start)
+        #? Kind filter, answered by the database from idx_contents_kind_length
+        self.kind_filter.addItem("All", None)
+        for kind in KINDS:
+            self.kind_filter.addItem(KIND_LABELS[kind], kind)
+        self.kind_filter.currentIndexChanged.connect(self.on_kind_filter_changed)
+        #? Release the DB cleanly once the event loop stops
+        QApplication.instance().aboutToQuit.connect(self.on_about_to_quit)
+        self.startup.mark(MARK_WINDOW)
         
     def eventFilter(self, obj, event):
         if obj in [self.clearall_button, self.restore_button]:
@@ -160,6 +171,116 @@ class ClipboardManager(QMainWindow, Ui_MainWindow):
         QtWidgets.QApplication.restoreOverrideCursor()
         event.accept()
 
+    def run_search(self):
+        """Show ranked matches for the search box, or the normal view when it is empty"""
+        text = self.search_input.text().strip()
+        if not text:
+            self.clear_search_results()
+            self.search_results_area.hide()
+            self.history_area.show()
+            return
+
+        kind = self.kind_filter.currentData()
+        self.loader.run(
+            lambda repository: search_history(text, repository=repository, kind=kind),
+            lambda results: self.show_search_results(text, results, kind),
+        )
+
+    def run_filter(self, text):
+        """Rank the listed clips against the search box right away, the full-text search replaces them later"""
+        text = text.strip()
+        if not text:
+            self.run_search()
+            return
+        kind = self.kind_filter.currentData()
+        # Kinds were stored with each listed clip, the filter only compares them
+        matches = self.filter_index.search(text, FILTER_MAX_RESULTS, kind=kind)
+        self.show_filter_results(text, matches, kind)
+
+    def on_kind_filter_changed(self, _index):
+        self.timeline.set_kind(self.kind_filter.currentData())
+        if self.search_input.text().strip():
+            self.run_filter(self.search_input.text())
+            self.run_search()
+
+    def clear_search_results(self):
+        layout = self.search_results_layout
+        for i in reversed(range(layout.count())):
+            widget = layout.itemAt(i).widget()
+            if widget:
+                layout.removeWidget(widget)
+                widget.deleteLater()
+
+    def show_search_results(self, text, results, kind=None):
+        # The user kept typing (or changed the filter) while this query ran, a newer one is on its way
+        if text != self.search_input.text().strip() or kind != self.kind_filter.currentData():
+            return
+        # Nothing matches exactly (a typo?), keep the close matches the filter found
+        if not results and self._filter_shown == (text, kind):
+            return
+
+        logger.info(f"Search {text!r}: {len(results)} results")
+        self._filter_shown = None
+        self._show_results(
+            text,
+            f"{len(results)} result{'s' if len(results) != 1 else ''} for \"{text}\""
+            + (f" in {KIND_LABELS[kind]}" if kind else ""),
+            results,
+        )
+
+    def show_filter_results(self, text, matches, kind=None):
+        """Close matches among the listed clips, shown while the full-text search waits"""
+        today_date = datetime.now().strftime("%Y-%m-%d")
+        self._filter_shown = (text, kind) if matches else None
+        # Images are not indexed, file lists are the only matches not copied back as text
+        files = {content for content in matches if self.filter_index.kind_of(content) == KIND_FILES}
+        self._show_results(
+            text,
+            f"{len(matches)} close match{'es' if len(matches) != 1 else ''} for \"{text}\" in today's clips"
+            + (f" ({KIND_LABELS[kind]})" if kind else ""),
+            [(content, today_date, MIME_URI_LIST if content in files else None, None) for content in matches],
+        )
+
+    def _show_results(self, text, summary_text, results):
+        self.clear_search_results()
+        layout = self.search_results_layout
+        _, terms = parse_search_query(text)
+
+        summary = QtWidgets.QLabel(summary_text, self.search_results_widget)
+        summary.setStyleSheet("color: #888; font-size: 13px; padding: 4px;")
+        summary.setTextFormat(Qt.PlainText)
+        layout.addWidget(summary)
+
+        for content, date, mime_type, blob_hash in results:
+            # Copied back the way the clip list copies its rows
+            if mime_type == MIME_PNG and blob_hash:
+                kind = ENTRY_IMAGE
+            elif mime_type == MIME_URI_LIST:
+                kind = ENTRY_FILES
+            else:
+                kind = ENTRY_TEXT
+            label = SearchResultLabel(
+                content, date, highlight_snippet(content, terms), self.search_results_widget,
+                kind=kind, blob_hash=blob_hash, blob_store=self.blob_store,
+            )
+            layout.addWidget(label)
+
+        self.history_area.hide()
+        self.search_results_area.show()
+        self.search_results_area.verticalScrollBar().setValue(0)
+
+    def on_about_to_quit(self):
+        logger.info("Flushing pending clips")
+        if self.pipeline is not None:
+            self.pipeline.shutdown()
+        else:
+            self.daemon_timer.stop()
+            self.daemon.close()
+            self.media.shutdown()
+        self.loader.shutdown()
+        logger.info("Closing database connection")
+        close_db_connection(optimize=True)
+
     def resource_path(self,relative_path):
         """ Get absolute path to resource, works for dev and for PyInstaller """
         try:
@@ -172,8 +293,7 @@ class ClipboardManager(QMainWindow, Ui_MainWindow):
 
     def load_alltime_history(self):
         layout = self.content_layout
-        db = get_db_connection()
-        if not db:
+        if not get_repository():
             logger.error("Failed to connect to database")
             return
 
@@ -187,20 +307,11 @@ class ClipboardManager(QMainWindow, Ui_MainWindow):
             # Clear current UI state
             for i in reversed(range(layout.count())):
                 item = layout.itemAt(i)
-                if item.widget() and item.widget() != self.placeholder_label:
+                if item.widget():
                     widget = item.widget()
                     layout.removeWidget(widget)
                     widget.deleteLater()
 
-            # Remove placeholder if exists
-            if self.placeholder_label is not None:
-                try:
-                    layout.removeWidget(self.placeholder_label)
-                    self.placeholder_label.deleteLater()
-                    self.placeholder_label = None
-                except Exception as e:
-                    logger.error("Error removing placeholder:", e)
-
             # Setup month/year from current date
             current_date = QtCore.QDate.currentDate()
             self.month_navigator.current_year = current_date.year()
@@ -275,6 +386,10 @@ class ClipboardManager(QMainWindow, Ui_MainWindow):
             self.calendar_widget = self.month_navigator.create_calendar_buttons()
             layout.insertWidget(2, self.calendar_widget)
 
+            # Timeline of every clip, newest first, below the calendar
+            layout.insertWidget(3, self.timeline.create())
+            self.show_history_area(self.scroll_area)
+
             self.is_history_button_clicked = True
             self.history_button.setText("Back")
 
@@ -286,38 +401,6 @@ class ClipboardManager(QMainWindow, Ui_MainWindow):
             self.history_button.setText("History")
             self.is_history_button_clicked = False
 
-            if self.placeholder_label is None:
-                # Recreate placeholder if it doesn't exist
-                self.placeholder_container = QtWidgets.QWidget(self.content_widget)
-                placeholder_layout = QtWidgets.QVBoxLayout(self.placeholder_container)
-                placeholder_layout.setContentsMargins(0, 0, 0, 0)
-
-                # Add expanding spacers for vertical centering
-                spacer_top = QtWidgets.QSpacerItem(20, 40, QtWidgets.QSizePolicy.Minimum, QtWidgets.QSizePolicy.Expanding)
-                spacer_bottom = QtWidgets.QSpacerItem(20, 40, QtWidgets.QSizePolicy.Minimum, QtWidgets.QSizePolicy.Expanding)
-
-                # Create the label
-                self.placeholder_label = QtWidgets.QLabel(
-                    "Nothing Here\nYou'll see your clipboard history once you copied something..", 
-                    self.placeholder_container
-                )
-                self.placeholder_label.setAlignment(Qt.AlignCenter)
-                self.placeholder_label.setWordWrap(True)
-                self.placeholder_label.setObjectName("placeholder_label")
-                self.placeholder_label.setStyleSheet(PLACEHOLDER_LABEL_STYLE)
-
-                # Add to layout
-                placeholder_layout.addItem(spacer_top)
-                placeholder_layout.addWidget(self.placeholder_label)
-                placeholder_layout.addItem(spacer_bottom)
-
-                # Add the container to your main layout
-                layout.addWidget(self.placeholder_container)
-
-
-
-                
-
             # Safely remove heading
             if self.history_heading:
                 layout.removeWidget(self.history_heading)
@@ -330,6 +413,8 @@ class ClipboardManager(QMainWindow, Ui_MainWindow):
                 self.calendar_widget.deleteLater()
                 self.calendar_widget = None
 
+            self.timeline.remove()
+
             # Safely remove navigation bar
             if self.month_nav_widget:
                 layout.removeWidget(self.month_nav_widget)
@@ -342,36 +427,44 @@ class ClipboardManager(QMainWindow, Ui_MainWindow):
             self.month_navigator.month_label = None
 
             # Reload today's data
+            self.show_clip_list(self.clip_model)
             self.handle_restore_click()
     
     def add_clipboard_item_to_ui(self, text):
-        # Check if we already have a container
-        if not hasattr(self, 'clipboard_container') or self.clipboard_container is None:
-            # Recreate container if it doesn't exist
-            self.clipboard_container = QtWidgets.QWidget(self.content_widget)
-            self.clipboard_container.setObjectName("clipboard_container")
-            self.clipboard_container.setStyleSheet("background-color: transparent;")
-
-            self.clipboard_container_layout = QtWidgets.QVBoxLayout(self.clipboard_container)
-            self.clipboard_container_layout.setSpacing(5)
-            self.clipboard_container_layout.setContentsMargins(0, 0, 0, 0)
-
-            # Insert container at index 3 (after heading, nav bar, and calendar)
-            self.content_layout.insertWidget(0, self.clipboard_container)
-
-        # Create new elided label
-        label = ElidedLabel(manager=self,parent=self.clipboard_container)
-        label.setOriginalText(text)
-        label.setMaxLines(3)
-        label.setAlignment(Qt.AlignLeft | Qt.AlignTop)
-        label.setWordWrap(True)
-        label.setCursor(Qt.PointingHandCursor)
-        label.setStyleSheet(DATA_TEXT_FIELD_STYLE)
-        label.setObjectName("dynamic_text_label")
-        label.setMinimumHeight(40)
-
-        # Add to container layout
-        self.clipboard_container_layout.addWidget(label)
+        """List `text` below the clips shown, whichever day the clip list is showing"""
+        self.clip_list.model().append([ClipEntry(text)])
+
+    def show_clip_list(self, model, heading=None, placeholder=PLACEHOLDER_TEXT):
+        """Show `model` in the clip list, with a heading above it for a day picked on the calendar"""
+        self.clip_list.setModel(model)
+        self.clip_list.placeholder = placeholder
+        self.clip_list_heading.setText(heading or "")
+        self.clip_list_heading.setVisible(heading is not None)
+        self.clip_list.scrollToTop()
+        self.show_history_area(self.clip_list_area)
+
+    def show_history_area(self, area):
+        """Make `area` (the clip list or the History scroll area) the history view, search results stay on top of it"""
+        for other in (self.clip_list_area, self.scroll_area):
+            if other is not area:
+                other.hide()
+        self.history_area = area
+        if self.search_results_area.isHidden():
+            area.show()
+
+    def clip_entries(self, items):
+        """ClipEntry rows for load_day_items() results, newest first"""
+        entries = []
+        for text, mime_type, blob_hash, item_hash, _ in reversed(items):
+            if mime_type == MIME_PNG and blob_hash:
+                entries.append(ClipEntry(text, ENTRY_IMAGE, item_hash, blob_hash))
+            elif mime_type == MIME_URI_LIST and blob_hash:
+                entries.append(ClipEntry(text, ENTRY_FILES, item_hash, blob_hash))
+            elif is_large(text):
+                entries.append(ClipEntry(preview_of(text), ENTRY_LARGE, item_hash))
+            else:
+                entries.append(ClipEntry(text, content_hash=item_hash))
+        return entries
 
     def show_no_history_message(self, message: str):
         # Remove previous no_history_label if it exists and has been deleted
@@ -402,87 +495,80 @@ class ClipboardManager(QMainWindow, Ui_MainWindow):
 
     def load_clipboard_history(self):
         """Load clipboard history from database and display"""
-        db = get_db_connection()
-        if not db:
-            logger.error("Failed to connect to database")
-            return
-
         today_date = datetime.now().strftime("%Y-%m-%d")
-        query = QSqlQuery()
-        query.exec_(SQL_QUERY_FOR_LOAD_HISTORIES(today_date))
-
+        self.loader.run(
+            lambda repository: (repository.load_day_items(today_date), repository.day_hashes(today_date)),
+            self.on_history_loaded,
+        )
 
-        while query.next():
-            text = query.value(0)
-            if text not in self.loaded_from_db:
-                self.loaded_from_db.append(text)
-                self.add_clipboard_item(text)
+    def rebuild_filter_index(self, items):
+        """Index the text clips of a day load on the loader thread, after the load itself so the list comes first"""
+        def build(_repository):
+            filter_index = TrigramIndex()
+            for text, mime_type, blob_hash, _, kind in items:
+                if not (mime_type == MIME_PNG and blob_hash) and not is_large(text):
+                    filter_index.add(text, kind)
+            return filter_index
+        self._filter_generation += 1
+        generation = self._filter_generation
+        self.loader.run(build, lambda filter_index: self.use_filter_index(filter_index, generation))
+
+    def use_filter_index(self, filter_index, generation):
+        if generation != self._filter_generation:
+            return  # the list was cleared or reloaded while it was built
+        # Clips that arrived meanwhile are newer than every loaded one
+        for text, kind in self.filter_index.entries():
+            filter_index.add(text, kind)
+        self.filter_index = filter_index
+
+    def on_history_loaded(self, result):
+        items, hashes = result
+        # One row per text and day, so the day's clips are already distinct
+        self.dedupe.remember_day(hashes)
+        self.rebuild_filter_index(items)
+        print(f"Loaded {len(items)} items from DB")  # Debug log
+        # One model insert however many clips there are, the view only paints the rows on screen.
+        # Clips captured while the day was loading are newer, they stay on top
+        self.clip_model.append(self.clip_entries(items))
+        self.startup.mark(MARK_FIRST_SCREEN)
+        self.startup.mark(MARK_HISTORY)
 
     # Show animation
     def handle_restore_click(self):
         """Restore all items from the database"""
-        self.animation_label.show()
-        self.animation_movie.start()
-        has_data = False
+        self.start_restore_animation()
 
         # Hide original button temporarily (optional)
         self.restore_button.setEnabled(False)
         logger.info("Restoring all items!")
-        db = get_db_connection()
-        if not db:
-            logger.error("Failed to connect to database")
-            return
         # always clear all items before restoring
         self.clear_all_items()
         # Delay to allow animation to show
         QtCore.QTimer.singleShot(1000, self.stop_restore_animation)
-        
-        today_date = datetime.now().strftime("%Y-%m-%d")
-        query = QSqlQuery()
-        query.exec_(SQL_QUERY_FOR_LOAD_HISTORIES(today_date))
 
-        
+        today_date = datetime.now().strftime("%Y-%m-%d")
+        self.loader.run(
+            lambda repository: (repository.load_day_items(today_date), repository.day_hashes(today_date)),
+            self.on_restore_loaded,
+        )
 
-        while query.next():
-            has_data = True
-            text = query.value(0)
-            # Create new elided label
-            self.clipboard_items.append(text)
-            label = ElidedLabel(manager=self,parent=self.content_widget)
-            label.setOriginalText(text)
-            label.setMaxLines(3)
-            label.setAlignment(Qt.AlignLeft | Qt.AlignTop)
-            label.setWordWrap(True)
-            label.setCursor(Qt.PointingHandCursor)
-            label.setStyleSheet(DATA_TEXT_FIELD_STYLE)
-            label.setObjectName("dynamic_text_label")
-            label.setMinimumHeight(40)
-            logger.info("Restoring labels to layout")  # Debug log
-            self.content_layout.insertWidget(0, label)
-            # Force layout updates
-            self.content_widget.updateGeometry()
-            self.scroll_area.updateGeometry()
-            self.update()
-        if not has_data:
+    def on_restore_loaded(self, result):
+        items, hashes = result
+        self.dedupe.remember_day(hashes)
+        self.rebuild_filter_index(items)
+        if not items:
             logger.info("DATA IS YET TO BE ENTRIED")
-        elif hasattr(self, 'placeholder_label') and self.placeholder_label is not None:
-            try:
-                logger.info("Removing placeholder")  # Debug log
-                self.content_layout.removeWidget(self.placeholder_label)
-                self.placeholder_label.deleteLater()
-                self.placeholder_label = None
-            except:
-                pass  # Placeholder might already be removed
-        # Clear calendar view elements
-        elif hasattr(self, 'calendar_widget') and self.calendar_widget:
-            self.content_layout.removeWidget(self.calendar_widget)
-            self.calendar_widget.deleteLater()
-            self.calendar_widget = None
-        else:
-            ...
+        logger.info("Restoring items to the list")  # Debug log
+        self.clip_model.append(self.clip_entries(items))
+
+    def start_restore_animation(self):
+        if self.animation_movie is None:
+            # Built on first use, it is not needed to show the window
+            self.animation_movie = QMovie(self.resource_path("assets/restore_gif.gif"))
+            self.animation_label.setMovie(self.animation_movie)
+        self.animation_label.show()
+        self.animation_movie.start()
 
-        # Stop animation after 1 seconds and restore button
-    
     def stop_restore_animation(self):
         self.animation_label.hide()
         self.animation_movie.stop()
@@ -490,182 +576,124 @@ class ClipboardManager(QMainWindow, Ui_MainWindow):
         self.restore_button.setEnabled(True)
 
     def clear_all_items(self):
-        """Clear all clipboard items but keep the placeholder"""
+        """Clear all clipboard items, the empty list shows the placeholder"""
         logger.info("Clearing all items!")
 
-        layout = self.content_layout
-        
-        # Check if there are any clipboard items to clear
-        has_clipboard_items = any(
-            item.widget() and item.widget() != self.placeholder_label 
-            for item in [layout.itemAt(i) for i in range(layout.count())] 
-            if item and item.widget()
-        )
-        
         # If no clipboard items exist, don't do anything
-        if not has_clipboard_items and len(self.clipboard_items) == 0:
+        if self.clip_model.rowCount() == 0 and len(self.dedupe) == 0:
             logger.info("No items to clear, placeholder already visible")
             return
-        
-        # Remove all widgets except the placeholder and spacers
-        for i in reversed(range(layout.count())):
-            item = layout.itemAt(i)
-            if item.widget():
-                widget = item.widget()
-                # Only remove widgets that are NOT the placeholder
-                if widget != self.placeholder_label:
-                    logger.info(f"Removing widget: {widget.objectName()}")
-                    layout.removeWidget(widget)
-                    widget.deleteLater()
-            elif item.spacerItem():
-                # Remove spacer items (stretch)
-                layout.removeItem(item)
-
-        # Show placeholder if it was hidden
-        if hasattr(self, 'placeholder_label') and self.placeholder_label is not None:
-            self.placeholder_label.show()
-            # Check if placeholder is already in layout
-            placeholder_in_layout = any(
-                layout.itemAt(i).widget() == self.placeholder_label 
-                for i in range(layout.count()) 
-                if layout.itemAt(i) and layout.itemAt(i).widget()
-            )
-            
-            if not placeholder_in_layout:
-                # Add spacers and placeholder
-                spacer_top = QtWidgets.QSpacerItem(20, 40, QtWidgets.QSizePolicy.Minimum, QtWidgets.QSizePolicy.Expanding)
-                spacer_bottom = QtWidgets.QSpacerItem(20, 40, QtWidgets.QSizePolicy.Minimum, QtWidgets.QSizePolicy.Expanding)
-                layout.addItem(spacer_top)
-                layout.addWidget(self.placeholder_label)
-                layout.addItem(spacer_bottom)
-            else:
-                # Placeholder is already in layout, just add spacers if needed
-                if layout.count() == 1:  # Only placeholder exists
-                    spacer_top = QtWidgets.QSpacerItem(20, 40, QtWidgets.QSizePolicy.Minimum, QtWidgets.QSizePolicy.Expanding)
-                    spacer_bottom = QtWidgets.QSpacerItem(20, 40, QtWidgets.QSizePolicy.Minimum, QtWidgets.QSizePolicy.Expanding)
-                    layout.insertItem(0, spacer_top)
-                    layout.addItem(spacer_bottom)
+
+        self.clip_model.clear()
+        self.filter_index.clear()
+        self._awaiting_kind.clear()
+        self._filter_generation += 1
+        # Clear the clips tracked for dedupe
+        if self.pipeline is not None:
+            self.pipeline.forget_session()
         else:
-            # Recreate placeholder if it doesn't exist
-            self.placeholder_label = QtWidgets.QLabel("Nothing Here\nYou'll see your clipboard history once you copied something..", self.content_widget)
-            self.placeholder_label.setAlignment(Qt.AlignCenter)
-            self.placeholder_label.setWordWrap(True)
-            self.placeholder_label.setObjectName("placeholder_label")
-            self.placeholder_label.setStyleSheet(
-                PLACEHOLDER_LABEL_STYLE
-            )
-            spacer_top = QtWidgets.QSpacerItem(20, 40, QtWidgets.QSizePolicy.Minimum, QtWidgets.QSizePolicy.Expanding)
-            spacer_bottom = QtWidgets.QSpacerItem(20, 40, QtWidgets.QSizePolicy.Minimum, QtWidgets.QSizePolicy.Expanding)
-            layout.addItem(spacer_top)
-            layout.addWidget(self.placeholder_label)
-            layout.addItem(spacer_bottom)
-                        
-        # Clear internal list
-        self.clipboard_items.clear()
-        
-        # Force update
-        self.content_widget.update()
-        self.scroll_area.update()
+            self.dedupe.clear_session()
         logger.info("All items cleared, placeholder restored")
 
-    @pyqtSlot()
-    def on_clipboard_changed(self):
+    def on_clip_added(self, kind, clip):
+        """A clip the pipeline (or the daemon) just saved, listed at the top"""
         if self.is_history_button_clicked:
-            return  # Prevent saving while browsing history
-
-        mime_data = self.clipboard.mimeData()
-        if mime_data.hasText():
-            text = mime_data.text().strip()
-            if text and text not in self.loaded_from_db and text not in self.clipboard_items:
-                self.clipboard_items.append(text)
-                self.save_to_database(text)  # Saves to DB
-                self.add_clipboard_item(text)  # NEW: Adds to UI
-
-    @pyqtSlot()
-    def on_selection_changed(self):
-        """Triggered when primary selection changes"""
-        logger.info("Primary selection changed!")  # Debug log
-        mime_data = self.clipboard.mimeData(QClipboard.Selection)
-        
-        if mime_data.hasText():
-            text = mime_data.text().strip()
-            if text and text not in self.clipboard_items:  # Avoid duplicates
-                logger.info(f"New selection text: {text}")  # Debug log
-                self.add_clipboard_item(text)
-
-    def add_clipboard_item(self, text):
-        # print(f"Adding clipboard item: {text}")  # Debug log
-        
-        # Add to our tracking list
-        self.clipboard_items.append(text)
-
-        
-        
-        # Remove placeholder if it exists
-        if hasattr(self, 'placeholder_label') and self.placeholder_label is not None:
-            try:
-                logger.info("Removing placeholder")  # Debug log
-                self.content_layout.removeWidget(self.placeholder_label)
-                self.placeholder_label.deleteLater()
-                self.placeholder_label = None
-            except:
-                pass  # Placeholder might already be removed
-        
-        # Create new elided label
-        label = ElidedLabel(manager=self,parent=self.content_widget)
-        label.setOriginalText(text)
-        label.setMaxLines(3)
-        label.setAlignment(Qt.AlignLeft | Qt.AlignTop)
-        label.setWordWrap(True)
-        label.setCursor(Qt.PointingHandCursor)
-        label.setStyleSheet(DATA_TEXT_FIELD_STYLE)
-        label.setObjectName("dynamic_text_label")
-        
-        # Set minimum height to ensure visibility
-        label.setMinimumHeight(40)
-        # Save to database
-        
-        # Add to layout at the top (most recent first)
-        logger.info("Adding label to layout")  # Debug log
-        self.content_layout.insertWidget(0, label)
-        self.save_to_database(text)
-        
-        # Force layout updates
-        self.content_widget.updateGeometry()
-        self.scroll_area.updateGeometry()
-        self.update()
-        
-        print(f"Layout now has {self.content_layout.count()} items")  # Debug log
-
-    def save_to_database(self, text):
-        db = get_db_connection()
-        if not db:
+            return  # the list is showing history, today's view is reloaded on Back
+        if kind == CLIP_LARGE:
+            self.add_large_item(clip.preview, clip.content_hash)
+        elif kind == CLIP_RICH and clip.mime_type == MIME_PNG:
+            self.add_image_item(clip.text, clip.blob_hash)
+        elif kind == CLIP_RICH:
+            # File lists are copied back as the files, HTML kept without text as its text
+            entry_kind = ENTRY_FILES if clip.mime_type == MIME_URI_LIST else ENTRY_TEXT
+            self.add_clipboard_item(clip.text, save=False, kind=entry_kind)
+        else:
+            self.add_clipboard_item(clip, save=False)
+
+    def on_clips_saved(self, saved):
+        """Kinds the writer stored clips as, a listed text waiting for its kind is indexed for the filter"""
+        for text, kind in saved:
+            if text in self._awaiting_kind:
+                self._awaiting_kind.discard(text)
+                self.filter_index.add(text, kind)
+
+    def poll_daemon(self):
+        """Ask the daemon for clips saved since the last poll, off the GUI thread"""
+        if self._daemon_polling:
             return
+        self._daemon_polling = True
+        after_id = self._daemon_after_id
+        self.loader.run(
+            lambda repository: self._fetch_daemon_clips(after_id),
+            self.on_daemon_clips,
+        )
 
+    def _fetch_daemon_clips(self, after_id):
+        if after_id is None:
+            # First poll, start after the newest clip: today's were loaded from the database
+            newest = self.daemon.call("recent", limit=1)
+            return None if newest is None else (newest[0]["id"] if newest else 0), []
+        return after_id, self.daemon.call("since", after_id=after_id) or []
+
+    def on_daemon_clips(self, result):
+        self._daemon_polling = False
+        after_id, clips = result
+        if after_id is None:
+            return  # daemon not answering, try again on the next tick
+        self._daemon_after_id = clips[-1]["id"] if clips else after_id
         today_date = datetime.now().strftime("%Y-%m-%d")
+        for clip in clips:
+            if clip["date"] != today_date or self.dedupe.in_session(clip["content_hash"]):
+                continue
+            self.dedupe.remember(clip["content_hash"])
+            if self.is_history_button_clicked:
+                continue
+            if clip["mime_type"] == MIME_PNG and clip["blob_hash"]:
+                self.add_image_item(clip["content"], clip["blob_hash"])
+            elif clip["mime_type"] == MIME_URI_LIST and clip["blob_hash"]:
+                self.add_clipboard_item(clip["content"], save=False, kind=ENTRY_FILES, content_kind=clip["kind"])
+            elif clip.get("truncated"):
+                self.add_large_item(clip["content"], clip["content_hash"])
+            else:
+                self.add_clipboard_item(clip["content"], save=False, content_kind=clip["kind"])
 
-        # Check if this text was already saved today
-        query = QSqlQuery()
-        query.prepare(SQL_CHECK_FOR_TEXT_SAVE)
-        query.bindValue(":content", text)
-        query.bindValue(":date", today_date)
-        query.exec_()
-        query.next()
+    def add_large_item(self, preview, item_hash, index=0):
+        """Add a large clip's preview to the list (at the top by default), clicking it copies the full text"""
+        entry = ClipEntry(preview, ENTRY_LARGE, item_hash)
+        self.clip_model.insert(index, [entry])
+        return entry
 
-        if query.value(0) > 0:
-            logger.info("Text already exists in DB for today")
-            return
+    def add_image_item(self, description, blob_hash, index=0):
+        """Add an image clip to the list (at the top by default), its thumbnail is asked for when the row is painted"""
+        entry = ClipEntry(description, ENTRY_IMAGE, blob_hash=blob_hash)
+        self.clip_model.insert(index, [entry])
+        return entry
 
-        # Insert if not duplicate
-        insert_query = QSqlQuery()
-        insert_query.prepare(SQL_COMMAND_FOR_DATA_INSERTION)
-        insert_query.bindValue(":content", text)
-        insert_query.bindValue(":date", today_date)
-
-        if not insert_query.exec_():
-            logger.error("Error saving to database:", insert_query.lastError().text())
+    def add_clipboard_item(self, text, save=True, item_hash=None, index=0, kind=ENTRY_TEXT, content_kind=None):
+        # print(f"Adding clipboard item: {text}")  # Debug log
+        
+        # Track it so the next copy of the same text is skipped
+        if save:
+            item_hash = item_hash or content_hash(text)
+            self.dedupe.remember(item_hash)
+        # Indexed with the kind it was stored as: the daemon's clips carry theirs, the writer reports the others
+        if content_kind is None:
+            self._awaiting_kind.add(text)
         else:
-            logger.info(f"Saved to DB: {text[:30]}...")
+            self.filter_index.add(text, content_kind)
+
+        # Add to the list at the top (most recent first)
+        entry = ClipEntry(text, kind, content_hash=item_hash)
+        self.clip_model.insert(index, [entry])
+        if save:
+            self.save_to_database(text, item_hash)
+        return entry
+
+    def save_to_database(self, text, item_hash=None):
+        # The inserts happen on the writer thread, a known text is not stored again
+        # and repeats on the same day are dropped by the unique indexes
+        if self.pipeline is not None:
+            self.pipeline.writer.submit(text, item_hash=item_hash)
 
 if __name__ == "__main__":
     try:
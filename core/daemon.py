@@ -0,0 +1,61 @@
+from PyQt5.QtGui import QGuiApplication # type: ignore
+from PyQt5 import QtCore # type: ignore
+import signal
+import sys
+import logging
+
+from config import DAEMON_SOCKET_PATH
+from Db.backends.sqlite_backend import SqliteBackend
+from Db.migrations import run_migrations
+from core.ipc import IpcServer, QueryHandler
+from core.pipeline import CapturePipeline
+
+logger = logging.getLogger('clipboard_manager')
+
+
+def run_daemon(argv=None, socket_path=DAEMON_SOCKET_PATH):
+    """
+    Capture clipboard history without a window: a QGuiApplication (no widgets
+    are loaded) runs the capture pipeline, and an IpcServer answers queries on
+    `socket_path`. Stops on SIGINT/SIGTERM. Returns the exit status.
+
+    Everything here reads and writes through one stdlib SqliteBackend (its
+    connections are per thread), so QtSql, and the QtWidgets it links, are never loaded.
+
+    Qt still needs a platform that has a system clipboard (xcb, wayland,
+    windows, cocoa); under -platform offscreen or minimal nothing is captured.
+    """
+    app = QGuiApplication(argv if argv is not None else sys.argv)
+    #? The daemon has no windows, closing none of them must not end it
+    app.setQuitOnLastWindowClosed(False)
+
+    backend = SqliteBackend()
+    #? Creates the schema on a fresh file and upgrades older files in place
+    if not run_migrations(backend):
+        logger.error("Failed to initialize database")
+        return 1
+
+    pipeline = CapturePipeline(app.clipboard(), backend=backend)
+    pipeline.start()
+    server = IpcServer(QueryHandler(backend, pipeline.stats), socket_path)
+    if not server.start():
+        pipeline.shutdown()
+        backend.close()
+        return 1
+
+    #? Python only runs signal handlers between bytecodes, wake up regularly while Qt waits
+    signal.signal(signal.SIGINT, lambda *_: app.quit())
+    signal.signal(signal.SIGTERM, lambda *_: app.quit())
+    wakeup = QtCore.QTimer()
+    wakeup.timeout.connect(lambda: None)
+    wakeup.start(500)
+
+    logger.info(f"Clipboard daemon running on {app.platformName()}")
+    status = app.exec_()
+
+    logger.info("Stopping clipboard daemon")
+    server.stop()
+    pipeline.shutdown()
+    backend.execute("PRAGMA optimize")
+    backend.close()
+    return status
@@ -0,0 +1,87 @@
+import json
+import socket
+import threading
+import logging
+
+from config import DAEMON_SOCKET_PATH, DAEMON_TIMEOUT_S
+
+logger = logging.getLogger('clipboard_manager')
+
+#? Replies above this are not read by the client, the daemon would be misbehaving
+MAX_REPLY_BYTES = 256 * 1024 * 1024
+
+
+def daemon_supported():
+    """Whether this platform has Unix domain sockets (CPython on Windows does not), the daemon needs them"""
+    return hasattr(socket, "AF_UNIX")
+
+
+def find_daemon(path=DAEMON_SOCKET_PATH):
+    """A DaemonClient for the daemon answering on `path`, None when none does"""
+    daemon = DaemonClient(path)
+    return daemon if daemon.ping() is not None else None
+
+
+class DaemonClient:
+    """
+    Blocking client for core.ipc.IpcServer on plain sockets, safe to share between threads.
+    Kept apart from the server so the window can look for a daemon without importing asyncio.
+
+    call() returns the result, or None when the daemon is not running,
+    replied with an error (logged) or cannot run on this platform. The connection is opened on first use
+    and reopened after a failure.
+    """
+
+    def __init__(self, path=DAEMON_SOCKET_PATH, timeout=DAEMON_TIMEOUT_S):
+        self.path = path
+        self.timeout = timeout
+        self._socket = None
+        self._reader = None
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(self.path)
+        except OSError:
+            sock.close()
+            raise
+        self._socket = sock
+        self._reader = sock.makefile("rb")
+
+    def close(self):
+        if self._socket is not None:
+            self._reader.close()
+            self._socket.close()
+            self._socket = None
+            self._reader = None
+
+    def call(self, method, **params):
+        if not daemon_supported():
+            return None
+        with self._lock:
+            self._next_id += 1
+            request = {"id": self._next_id, "method": method, "params": params}
+            try:
+                if self._socket is None:
+                    self._connect()
+                self._socket.sendall(json.dumps(request).encode("utf-8") + b"\n")
+                line = self._reader.readline(MAX_REPLY_BYTES)
+                if not line.endswith(b"\n"):
+                    raise ConnectionError("connection closed")
+                reply = json.loads(line)
+            except (OSError, ValueError) as e:
+                self.close()
+                if method != "ping":
+                    logger.error(f"Daemon {method} failed: {e}")
+                return None
+        if reply.get("id") != request["id"] or "error" in reply:
+            logger.error(f"Daemon {method} failed: {reply.get('error', 'mismatched reply')}")
+            return None
+        return reply.get("result")
+
+    def ping(self):
+        """The daemon's pid and schema version, None when no daemon answers"""
+        return self.call("ping")
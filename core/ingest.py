@@ -0,0 +1,91 @@
+from PyQt5 import QtCore # type: ignore
+from concurrent.futures import ThreadPoolExecutor
+import logging
+
+from config import LARGE_CLIP_CHARS, CLIP_CEILING_CHARS, CLIP_PREVIEW_CHARS, HASH_CHUNK_CHARS
+from utils.content_hash import content_hash_chunked
+
+logger = logging.getLogger('clipboard_manager')
+
+
+def is_large(text):
+    return len(text) > LARGE_CLIP_CHARS
+
+
+def preview_of(text, preview_chars=CLIP_PREVIEW_CHARS):
+    """Bounded prefix shown in place of a large clip"""
+    return text[:preview_chars]
+
+
+class LargeClip:
+    """What the GUI keeps of a large clip: its preview and the key to load the full text"""
+
+    def __init__(self, preview, content_hash, length, truncated):
+        self.preview = preview
+        self.content_hash = content_hash
+        self.length = length
+        self.truncated = truncated
+
+
+class LargeClipIngest(QtCore.QObject):
+    """
+    Ingestion path for copies above LARGE_CLIP_CHARS.
+
+    The GUI thread only hands the text over. On one worker it is stripped,
+    hashed in chunks, checked against the dedupe index and queued on the
+    writer; the GUI gets back a LargeClip with a bounded preview, so the
+    full text is never laid out, logged or kept by a widget.
+    Above `ceiling_chars` only the preview and the original length are stored;
+    the content_hash is still that of the full text, so repeats are recognised.
+    """
+
+    _finished = QtCore.pyqtSignal(object, object)
+
+    def __init__(self, writer, dedupe, parent=None, ceiling_chars=CLIP_CEILING_CHARS,
+                 preview_chars=CLIP_PREVIEW_CHARS, chunk_chars=HASH_CHUNK_CHARS):
+        super().__init__(parent)
+        self.writer = writer
+        self.dedupe = dedupe
+        self.ceiling_chars = ceiling_chars
+        self.preview_chars = preview_chars
+        self.chunk_chars = chunk_chars
+        # One worker keeps large copies in capture order
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="large-clip")
+        self._finished.connect(self._deliver)
+
+    def _deliver(self, callback, result):
+        callback(result)
+
+    def ingest(self, text, callback):
+        """Process `text` on the worker, then callback(LargeClip, or None for a repeat) on the GUI thread"""
+        self._executor.submit(self._run, text, callback)
+
+    def _run(self, text, callback):
+        try:
+            clip = self._ingest(text)
+        except Exception as e:
+            logger.error(f"Large clip ingestion failed: {e}")
+            clip = None
+        self._finished.emit(callback, clip)
+
+    def _ingest(self, text):
+        text = text.strip()
+        item_hash = content_hash_chunked(text, self.chunk_chars)
+        preview = preview_of(text, self.preview_chars)
+        truncated = len(text) > self.ceiling_chars
+        if truncated:
+            logger.info(f"Clip of {len(text)} characters is over the ceiling, keeping a preview only")
+            stored = f"{preview}\n… [truncated, {len(text):,} characters copied]"
+        else:
+            stored = text
+        if self.dedupe.in_session(item_hash):
+            # Listed already, the writer counts the copy
+            self.writer.submit(stored, item_hash=item_hash)
+            return None
+        self.dedupe.remember(item_hash)
+        if not self.writer.submit(stored, item_hash=item_hash):
+            return None
+        return LargeClip(preview, item_hash, len(text), truncated)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
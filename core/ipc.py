@@ -0,0 +1,145 @@
+import asyncio
+import json
+import os
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from config import DAEMON_SOCKET_PATH
+from Db.history import HistoryQueries
+from core.daemon_client import DaemonClient, daemon_supported
+
+logger = logging.getLogger('clipboard_manager')
+
+
+class QueryHandler(HistoryQueries):
+    """
+    The methods the daemon answers, one per request "method".
+
+    Runs on a single worker thread, so `backend` (a stdlib SqliteBackend with
+    thread-local connections) keeps one connection for every query.
+    """
+
+    def __init__(self, backend, extra_stats=None):
+        super().__init__(backend, extra_stats)
+        self.methods = {
+            "ping": self.ping,
+            "recent": self.recent,
+            "day": self.day,
+            "search": self.search,
+            "similar": self.similar,
+            "since": self.since,
+            "content": self.content,
+            "stats": self.stats,
+        }
+
+    def ping(self):
+        return {"pid": os.getpid(), "schema": self.backend.schema_version()}
+
+    def handle(self, request):
+        """The reply (a dict) for one decoded request"""
+        request_id = request.get("id") if isinstance(request, dict) else None
+        if not isinstance(request, dict) or request.get("method") not in self.methods:
+            return {"id": request_id, "error": "unknown method"}
+        params = request.get("params") or {}
+        if not isinstance(params, dict):
+            return {"id": request_id, "error": "params must be an object"}
+        try:
+            return {"id": request_id, "result": self.methods[request["method"]](**params)}
+        except (TypeError, ValueError) as e:
+            return {"id": request_id, "error": f"bad params: {e}"}
+        except Exception as e:
+            logger.error(f"IPC {request['method']} failed: {e}")
+            return {"id": request_id, "error": "internal error"}
+
+
+class IpcServer:
+    """
+    Unix-domain-socket query server for the headless daemon.
+
+    Newline-delimited JSON both ways: each request line is
+    {"id": ..., "method": ..., "params": {...}} and gets one reply line,
+    {"id": ..., "result": ...} or {"id": ..., "error": "..."}. Connections
+    stay open for any number of requests.
+
+    asyncio runs on its own thread so the Qt event loop doing the capturing
+    is never blocked; queries run on one worker thread next to it.
+    """
+
+    def __init__(self, handler, path=DAEMON_SOCKET_PATH):
+        self.handler = handler
+        self.path = path
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ipc-query")
+        self._thread = None
+        self._loop = None
+        self._stopped = None
+        self._ready = threading.Event()
+        self._listening = False
+
+    def start(self):
+        """Bind the socket and serve in the background, returns False if it could not be bound"""
+        if not daemon_supported():
+            logger.error("Unix domain sockets are not available on this platform")
+            return False
+        if DaemonClient(self.path).ping() is not None:
+            logger.error(f"Another daemon already answers on {self.path}")
+            return False
+        if os.path.exists(self.path):
+            os.unlink(self.path)  # left behind by a daemon that did not stop cleanly
+        self._thread = threading.Thread(target=self._run, name="ipc-server", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        return self._listening
+
+    def _run(self):
+        asyncio.run(self._serve())
+
+    async def _serve(self):
+        self._loop = asyncio.get_running_loop()
+        self._stopped = asyncio.Event()
+        try:
+            server = await asyncio.start_unix_server(self._handle_connection, path=self.path)
+            # Clipboard history is private, only the owner may connect
+            os.chmod(self.path, 0o600)
+        except OSError as e:
+            logger.error(f"Could not listen on {self.path}: {e}")
+            self._ready.set()
+            return
+        self._listening = True
+        self._ready.set()
+        logger.info(f"Answering queries on {self.path}")
+        async with server:
+            await self._stopped.wait()
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    break  # request line over the stream limit
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                except ValueError:
+                    reply = {"id": None, "error": "invalid JSON"}
+                else:
+                    reply = await self._loop.run_in_executor(self._executor, self.handler.handle, request)
+                writer.write(json.dumps(reply, ensure_ascii=False).encode("utf-8") + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass  # client went away
+        finally:
+            writer.close()
+
+    def stop(self):
+        if self._thread is None:
+            return
+        if self._loop is not None and self._stopped is not None:
+            self._loop.call_soon_threadsafe(self._stopped.set)
+        self._thread.join(timeout=5)
+        self._executor.shutdown(wait=True)
+        self._thread = None
+        if self._listening and os.path.exists(self.path):
+            os.unlink(self.path)
@@ -0,0 +1,195 @@
+from PyQt5 import QtCore, QtGui # type: ignore
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import html
+import os
+import re
+import threading
+import logging
+
+from config import THUMBNAIL_SIZE_PX, THUMBNAIL_WORKERS, BLOB_MAX_BYTES
+from Db.blob_store import MIME_PNG, MIME_URI_LIST, MIME_HTML
+from utils.content_hash import blob_content_hash
+
+logger = logging.getLogger('clipboard_manager')
+
+#? Thumbnails kept as QPixmaps for the labels on screen
+PIXMAP_CACHE_SIZE = 256
+
+
+class RichPayload:
+    """A non-text clipboard payload, copied out of QMimeData on the GUI thread"""
+
+    def __init__(self, mime_type, data=None, image=None, text=""):
+        self.mime_type = mime_type
+        self.data = data
+        # QImage when the clipboard offers no encoded PNG, encoded on a worker
+        self.image = image
+        self.text = text
+
+    def size(self):
+        if self.data is not None:
+            return len(self.data)
+        return self.image.sizeInBytes() if self.image is not None else 0
+
+
+class StoredClip:
+    """A payload written to the blob store, ready for the history list and the writer"""
+
+    def __init__(self, text, mime_type, blob_hash):
+        self.text = text
+        self.mime_type = mime_type
+        self.blob_hash = blob_hash
+        self.content_hash = blob_content_hash(mime_type, blob_hash)
+
+
+def read_rich_payload(mime_data, mime_types):
+    """
+    RichPayload for a list of local files, an image or (when asked for) HTML in `mime_data`.
+    None for anything that has plain text, a spreadsheet range that also comes as a picture
+    or a web page selection with its markup: the text is kept like any other copy, so it
+    dedupes, is classified and takes the large-clip path.
+    """
+    if MIME_URI_LIST in mime_types and mime_data.hasUrls():
+        urls = mime_data.urls()
+        # Links copied in a browser can come as URLs too, only files make a file list
+        if urls and all(url.isLocalFile() for url in urls):
+            text = "\n".join(url.toString() for url in urls)
+            return RichPayload(MIME_URI_LIST, data=text.encode('utf-8'), text=text)
+    if mime_data.hasText():
+        return None
+    if MIME_PNG in mime_types and mime_data.hasImage():
+        if mime_data.hasFormat(MIME_PNG):
+            return RichPayload(MIME_PNG, data=bytes(mime_data.data(MIME_PNG)))
+        image = mime_data.imageData()
+        return RichPayload(MIME_PNG, image=QtGui.QImage(image)) if image is not None else None
+    if MIME_HTML in mime_types and mime_data.hasHtml():
+        return RichPayload(MIME_HTML, data=mime_data.html().encode('utf-8'))
+    return None
+
+
+def _html_to_text(markup):
+    text = re.sub(r"<(script|style)\b.*?</\1>", " ", markup, flags=re.S | re.I)
+    return re.sub(r"\s+", " ", html.unescape(re.sub(r"<[^>]+>", " ", text))).strip()
+
+
+class MediaIngest(QtCore.QObject):
+    """
+    Stores rich payloads in the blob store and makes image thumbnails on a
+    worker pool, then hands the results back on the GUI thread (like
+    Db.loader.HistoryLoader). Encoding, hashing, file writes and scaling never
+    run on the GUI thread, so a burst of screenshots only queues work.
+
+    Thumbnails are cached on disk next to the blobs and as QPixmaps in memory;
+    a repeated copy finds both and costs one hash of the payload.
+    """
+
+    _finished = QtCore.pyqtSignal(object, object)
+
+    def __init__(self, store, parent=None, workers=THUMBNAIL_WORKERS, thumbnail_size=THUMBNAIL_SIZE_PX):
+        super().__init__(parent)
+        self.store = store
+        self.thumbnail_size = thumbnail_size
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="media")
+        self._pixmaps = OrderedDict()
+        #? blob_hash -> callbacks waiting for a thumbnail already being made
+        self._waiting = {}
+        self._finished.connect(self._deliver)
+
+    def _deliver(self, callback, result):
+        callback(result)
+
+    def _submit(self, job, callback, *args):
+        def run():
+            try:
+                result = job(*args)
+            except Exception as e:
+                logger.error(f"Media job failed: {e}")
+                result = None
+            self._finished.emit(callback, result)
+        self._executor.submit(run)
+
+    def ingest(self, payload, callback):
+        """Store `payload` on a worker, then callback(StoredClip or None) on the GUI thread"""
+        self._submit(self._store_payload, callback, payload)
+
+    def _store_payload(self, payload):
+        data = payload.data
+        if data is None:
+            buffer = QtCore.QBuffer()
+            buffer.open(QtCore.QIODevice.WriteOnly)
+            if not payload.image.save(buffer, "PNG"):
+                logger.error("Could not encode clipboard image")
+                return None
+            data = bytes(buffer.data())
+        if len(data) > BLOB_MAX_BYTES:
+            logger.info(f"Skipped a {len(data)} byte {payload.mime_type} clip")
+            return None
+
+        blob_hash = self.store.put(data)
+        if blob_hash is None:
+            return None
+        if payload.mime_type == MIME_PNG:
+            size = QtGui.QImageReader(self.store.path(blob_hash)).size()
+            if not size.isValid():
+                logger.error(f"Clipboard image {blob_hash} could not be read back")
+                return None
+            # Made now so the label can show it as soon as it is added
+            self._thumbnail_image(blob_hash)
+            text = f"Image {size.width()}×{size.height()}"
+        elif payload.mime_type == MIME_HTML:
+            text = _html_to_text(data.decode('utf-8', 'replace'))
+        else:
+            text = payload.text
+        return StoredClip(text or payload.mime_type, payload.mime_type, blob_hash)
+
+    def thumbnail(self, blob_hash, callback):
+        """callback(QPixmap or None) on the GUI thread, immediately when it is cached"""
+        pixmap = self._pixmaps.get(blob_hash)
+        if pixmap is not None:
+            self._pixmaps.move_to_end(blob_hash)
+            callback(pixmap)
+            return
+        if blob_hash in self._waiting:
+            self._waiting[blob_hash].append(callback)
+            return
+        self._waiting[blob_hash] = [callback]
+        self._submit(self._thumbnail_image, lambda image: self._thumbnail_ready(blob_hash, image), blob_hash)
+
+    def _thumbnail_ready(self, blob_hash, image):
+        # QPixmap may only be created on the GUI thread, the worker returns a QImage
+        pixmap = QtGui.QPixmap.fromImage(image) if image is not None else None
+        if pixmap is not None:
+            self._pixmaps[blob_hash] = pixmap
+            if len(self._pixmaps) > PIXMAP_CACHE_SIZE:
+                self._pixmaps.popitem(last=False)
+        for callback in self._waiting.pop(blob_hash, []):
+            callback(pixmap)
+
+    def _thumbnail_image(self, blob_hash):
+        """Cached thumbnail as a QImage, made from the blob the first time"""
+        path = self.store.thumbnail_path(blob_hash, self.thumbnail_size)
+        if os.path.exists(path):
+            image = QtGui.QImage(path)
+            if not image.isNull():
+                return image
+        reader = QtGui.QImageReader(self.store.path(blob_hash))
+        # Decode at (about) thumbnail size instead of scaling the full image down
+        size = reader.size()
+        if size.isValid():
+            reader.setScaledSize(size.scaled(self.thumbnail_size, self.thumbnail_size, QtCore.Qt.KeepAspectRatio))
+        image = reader.read()
+        if image.isNull():
+            logger.error(f"Could not make a thumbnail for blob {blob_hash}: {reader.errorString()}")
+            return None
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temporary = f"{path}.{threading.get_ident()}.tmp"
+            if image.save(temporary, "PNG"):
+                os.replace(temporary, path)
+        except OSError as e:
+            logger.error(f"Could not cache thumbnail {path}: {e}")
+        return image
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
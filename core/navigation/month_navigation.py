@@ -1,13 +1,18 @@
-from PyQt5.QtWidgets import QWidget, QGridLayout, QPushButton, QVBoxLayout, QLabel # type: ignore
-from PyQt5 import QtWidgets # type: ignore
+from PyQt5.QtWidgets import QWidget, QGridLayout, QPushButton # type: ignore
 from PyQt5.QtCore import Qt # type: ignore
 from PyQt5.QtGui import QCursor # type: ignore
-from PyQt5.QtSql import QSqlQuery # type: ignore
 import calendar
 from datetime import date, datetime
-from Db.database import *
-from stylesheets.label_text_style import DATA_TEXT_FIELD_STYLE
-from utils.clippad_text_resize import ElidedLabel
+from Db.repository import get_repository
+from utils.clip_list import ClipListModel
+
+
+def format_bytes(size):
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
 
 
 class MonthNavigator:
@@ -21,29 +26,12 @@ class MonthNavigator:
         self.calendar_widget = None
 
     def get_days_with_data(self):
-        """Get a set of days that have clipboard history data for current month/year"""
-        db = get_db_connection()
-        if not db:
-            return set()
-        
-        query = QSqlQuery()
-        query.prepare("""
-            SELECT DISTINCT CAST(strftime('%d', date) AS INTEGER) as day
-            FROM clipboard_items
-            WHERE strftime('%Y', date) = :year
-            AND strftime('%m', date) = :month
-        """)
-        query.bindValue(":year", str(self.current_year))
-        query.bindValue(":month", f"{self.current_month:02d}")
-        
-        days_with_data = set()
-        if query.exec_():
-            while query.next():
-                day = query.value(0)
-                if day:
-                    days_with_data.add(day)
-        
-        return days_with_data
+        """Get {day: (item_count, bytes)} for days that have clipboard history in current month/year"""
+        repository = get_repository()
+        if not repository:
+            return {}
+
+        return repository.month_summary(self.current_year, self.current_month)
 
     def load_previous_month(self):
         if self.current_month == 1:
@@ -134,6 +122,9 @@ class MonthNavigator:
                     background-color: #15803d;
                 }}
             """)
+            if has_data:
+                item_count, total_bytes = days_with_data[day]
+                btn.setToolTip(f"{item_count} clip{'s' if item_count != 1 else ''} · {format_bytes(total_bytes)}")
             btn.clicked.connect(lambda checked, d=day: self.load_history_for_date(d))
             layout.addWidget(btn, row, col)
             col += 1
@@ -166,86 +157,33 @@ class MonthNavigator:
                 setattr(self.parent, widget_attr, None)
         
         # First, clean up everything else to make room for date content
-        safe_remove_widget('clipboard_container')
         safe_remove_widget('month_nav_widget')
         safe_remove_widget('history_heading')
         safe_remove_widget('calendar_widget')
+        self.parent.timeline.remove()
         
         self.parent.history_button.setText("Back")
         self.date_view_active = True
         
-        # Create a clean container for the date view
-        self.parent.clipboard_container = QtWidgets.QWidget(self.parent.content_widget)
-        self.parent.clipboard_container.setObjectName("clipboard_container")
-        self.parent.clipboard_container.setStyleSheet("background-color: transparent;")
-
-        container_layout = QtWidgets.QVBoxLayout(self.parent.clipboard_container)
-        container_layout.setSpacing(5)
-        container_layout.setContentsMargins(0, 0, 0, 0)
-        
-        # Add a date heading
-        date_heading = QtWidgets.QLabel(f"Clipboard History Of {target_date}", self.parent.clipboard_container)
-        date_heading.setObjectName("date_heading")
-        date_heading.setStyleSheet("""
-            QLabel#date_heading {
-                font: 11pt "MS Shell Dlg 2";
-                color: white;
-                background-color: transparent;
-                margin-bottom: 10px;
-                color: #34D399;
-            }
-        """)
-        container_layout.addWidget(date_heading)
-
-        # Add the container to the main layout
-        self.parent.content_layout.insertWidget(0, self.parent.clipboard_container)
-        self.parent.clipboard_container_layout = container_layout
-
-        # Now query and add items
-        db = get_db_connection()
-        if not db:
-            return
-
-        query = QSqlQuery()
-        success = query.exec_(f"""
-            SELECT content FROM clipboard_items
-            WHERE date = '{target_date}'
-            ORDER BY timestamp ASC
-        """)
-
-        if not success:
-            print("Query failed:", query.lastError().text())
+        # The day gets a list model of its own, today's stays as it is for Back
+        model = ClipListModel(self.parent.clip_list)
+        self.parent.show_clip_list(
+            model,
+            heading=f"Clipboard History Of {target_date}",
+            placeholder=f"No clipboard items found for {target_date}",
+        )
+
+        # Now query and add items (read and decoded on the loader thread)
+        self.parent.loader.run(
+            lambda repository: repository.load_day_items(target_date),
+            lambda items: self.show_history_for_date(target_date, model, items),
+        )
+
+    def show_history_for_date(self, target_date, model, items):
+        # Another view replaced this one while the day was loading
+        if self.parent.clip_list.model() is not model:
             return
 
         # Reset temporary list for current view
-        if hasattr(self.parent, 'current_view_items'):
-            self.parent.current_view_items.clear()
-        else:
-            self.parent.current_view_items = []
-
-        count = 0
-        while query.next():
-            text = query.value(0)
-            self.parent.current_view_items.append(text)
-            
-            # Add item to UI
-            label = ElidedLabel(manager=self.parent, parent=self.parent.clipboard_container)
-            label.setOriginalText(text)
-            label.setMaxLines(3)
-            label.setAlignment(Qt.AlignLeft | Qt.AlignTop)
-            label.setWordWrap(True)
-            label.setCursor(Qt.PointingHandCursor)
-            label.setStyleSheet(DATA_TEXT_FIELD_STYLE)
-            label.setObjectName("dynamic_text_label")
-            label.setMinimumHeight(40)
-            
-            # Add to container layout
-            self.parent.clipboard_container_layout.addWidget(label)
-            count += 1
-            
-        # Show a message if no items found
-        if count == 0:
-            no_items_label = QtWidgets.QLabel(f"No clipboard items found for {target_date}", self.parent.clipboard_container)
-            no_items_label.setAlignment(Qt.AlignCenter)
-            no_items_label.setStyleSheet("color: #888; font-size: 16px; padding: 20px;")
-            self.parent.clipboard_container_layout.addWidget(no_items_label)
+        self.parent.current_view_items = [text for text, *_ in items]
+        model.reset(self.parent.clip_entries(items))
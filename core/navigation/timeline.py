@@ -0,0 +1,199 @@
+from PyQt5 import QtWidgets # type: ignore
+import logging
+
+from config import (
+    TIMELINE_PAGE_SIZE,
+    TIMELINE_PREFETCH_PX,
+    TIMELINE_VIEW_HEIGHT,
+    TIMELINE_COLLAPSE_NEAR_DUPLICATES,
+    SIMHASH_MAX_DISTANCE,
+)
+from Db.backends.base import TIMELINE_START
+from utils.clip_list import ClipEntry, ClipListModel, ClipListView, ENTRY_HEADING, ENTRY_GROUP
+from utils.simhash import hamming
+
+logger = logging.getLogger('clipboard_manager')
+
+
+class HistoryTimeline:
+    """
+    All-time timeline shown under the calendar in the History view.
+
+    Clips are fetched a page at a time, newest first, with keyset pagination
+    on (timestamp, id): each page continues after the last row shown, so every
+    query costs the same no matter how deep the user has scrolled or how big
+    the history is. Pages are appended to a ClipListModel shown by a ClipListView,
+    date headings included, so only the rows on screen are painted however many
+    pages are loaded. The next page is only requested when the list scrolls
+    within `prefetch_px` of its bottom. set_kind() narrows it to one content kind
+    (utils.content_kind), filtered by the query.
+
+    With `collapse_similar`, consecutive clips of one day whose fingerprints are
+    within SIMHASH_MAX_DISTANCE bits of the first one are folded into a
+    "N similar clips" row under it, which lists them in its place when clicked.
+    """
+
+    def __init__(self, parent, page_size=TIMELINE_PAGE_SIZE, prefetch_px=TIMELINE_PREFETCH_PX,
+                 collapse_similar=TIMELINE_COLLAPSE_NEAR_DUPLICATES):
+        self.parent = parent
+        self.page_size = page_size
+        self.prefetch_px = prefetch_px
+        self.collapse_similar = collapse_similar
+        self.widget = None
+        self.model = None
+        self.view = None
+        self.kind = None
+        self._next_key = TIMELINE_START
+        self._last_date = None
+        self._loading = False
+        self._exhausted = False
+        self._reset_group()
+
+    def create(self):
+        """Build an empty timeline widget and request its first page"""
+        self.remove()
+        self._next_key = TIMELINE_START
+        self._last_date = None
+        self._loading = False
+        self._exhausted = False
+        self._reset_group()
+
+        self.widget = QtWidgets.QWidget(self.parent.content_widget)
+        self.widget.setObjectName("timeline_widget")
+        self.widget.setStyleSheet("background-color: transparent;")
+        layout = QtWidgets.QVBoxLayout(self.widget)
+        layout.setSpacing(5)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        heading = QtWidgets.QLabel("Timeline", self.widget)
+        heading.setObjectName("timeline_heading")
+        heading.setStyleSheet("""
+            QLabel#timeline_heading {
+                font: 11pt "MS Shell Dlg 2";
+                color: white;
+                background-color: transparent;
+                padding: 10px 0 5px 0;
+            }
+        """)
+        layout.addWidget(heading)
+
+        self.model = ClipListModel(self.widget)
+        self.view = ClipListView(self.parent, self.widget)
+        self.view.setObjectName("timeline_list")
+        # Date headings and groups are shorter than clip rows
+        self.view.setUniformItemSizes(False)
+        self.view.setModel(self.model)
+        self.view.setFixedHeight(TIMELINE_VIEW_HEIGHT)
+        scroll_bar = self.view.verticalScrollBar()
+        scroll_bar.valueChanged.connect(self.maybe_load_more)
+        #? A page shorter than the list can't be scrolled, the range change asks for the next one
+        scroll_bar.rangeChanged.connect(self.maybe_load_more)
+        layout.addWidget(self.view)
+
+        self.load_next_page()
+        return self.widget
+
+    def set_kind(self, kind):
+        """Show only clips of `kind` (None for all), restarting from the newest"""
+        self.kind = kind
+        if self.widget is None:
+            return
+        index = self.parent.content_layout.indexOf(self.widget)
+        self.parent.content_layout.insertWidget(index, self.create())
+
+    def remove(self):
+        """Drop the timeline widget, pages still in flight are then ignored"""
+        if self.widget is None:
+            return
+        try:
+            self.parent.content_layout.removeWidget(self.widget)
+            self.widget.deleteLater()
+        except RuntimeError:
+            pass  # already deleted with its parent
+        self.widget = None
+        self.model = None
+        self.view = None
+
+    def maybe_load_more(self, *_):
+        if self.widget is None or self._loading or self._exhausted:
+            return
+        scroll_bar = self.view.verticalScrollBar()
+        if scroll_bar.maximum() - scroll_bar.value() > self.prefetch_px:
+            return
+        self.load_next_page()
+
+    def load_next_page(self):
+        self._loading = True
+        widget = self.widget
+        limit, before, kind = self.page_size, self._next_key, self.kind
+        self.parent.loader.run(
+            lambda repository: repository.load_timeline_page(limit, before, kind),
+            lambda rows: self.show_page(widget, rows),
+        )
+
+    def show_page(self, widget, rows):
+        # The timeline was closed or rebuilt while this page was loading
+        if widget is None or widget is not self.widget:
+            return
+        self._loading = False
+
+        # Only an empty page means the end, a page of clips that could not be decoded does not
+        if not rows:
+            self._exhausted = True
+            if self._last_date is None:
+                self.view.placeholder = "No clipboard history yet" if self.kind is None else f"No {self.kind} clips yet"
+                self.view.viewport().update()
+            return
+        # The next page continues after the last row fetched, decoded or not
+        last_id, last_timestamp = rows[-1][0], rows[-1][1]
+        self._next_key = (last_timestamp, last_id)
+
+        # A group left open by the previous page may grow, its row is repainted below
+        open_group = self._group
+        entries = []
+        for item_id, timestamp, text, date, fingerprint in rows:
+            if text is None:
+                continue  # could not be decoded, already logged
+            if date != self._last_date:
+                entries.append(ClipEntry(date, ENTRY_HEADING))
+                self._last_date = date
+                self._reset_group()
+
+            if self._is_similar(fingerprint):
+                self._add_similar(ClipEntry(text), entries)
+                continue
+            entries.append(ClipEntry(text))
+            self._reset_group(fingerprint)
+        self.model.append(entries)
+        if open_group is not None and open_group.members:
+            self.model.entry_changed(open_group)
+        logger.debug(f"Timeline page of {len(rows)} clips, next page before {self._next_key}")
+        if not entries:
+            # Nothing was listed, so no scrolling or range change will ask for the next page
+            self.maybe_load_more()
+
+    def _reset_group(self, fingerprint=None):
+        """Start a new group of similar clips led by the clip with `fingerprint` (None: no group)"""
+        self._group_fingerprint = fingerprint if self.collapse_similar else None
+        self._group = None
+
+    def _is_similar(self, fingerprint):
+        return (
+            fingerprint is not None
+            and self._group_fingerprint is not None
+            and hamming(fingerprint, self._group_fingerprint) <= SIMHASH_MAX_DISTANCE
+        )
+
+    def _add_similar(self, entry, entries):
+        """Fold `entry` into the group row of the current group, adding that row to `entries` if it is new"""
+        group = self._group
+        if group is None:
+            group = self._group = ClipEntry("", ENTRY_GROUP, members=[])
+            entries.append(group)
+        elif group.members is None:
+            # The group was expanded already, later members are listed right away
+            entries.append(entry)
+            return
+        group.members.append(entry)
+        count = len(group.members)
+        group.text = f"▸ {count} similar clip{'s' if count > 1 else ''}"
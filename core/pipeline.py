@@ -0,0 +1,159 @@
+from PyQt5 import QtCore # type: ignore
+import threading
+import logging
+
+from Db.backfill import ContentBackfill
+from Db.blob_store import BlobStore
+from Db.dedupe import DedupeIndex
+from Db.pruner import HistoryPruner
+from Db.writer import ClipboardWriter
+from core.capture_policy import ClipboardCapture, SOURCE_SELECTION
+from core.ingest import LargeClipIngest
+from core.media import MediaIngest
+from utils.content_hash import content_hash
+
+logger = logging.getLogger('clipboard_manager')
+
+#? Kinds of clip_added, the object is the text, a core.ingest.LargeClip or a core.media.StoredClip
+CLIP_TEXT = "text"
+CLIP_LARGE = "large"
+CLIP_RICH = "rich"
+
+
+class CapturePipeline(QtCore.QObject):
+    """
+    Everything that records clips, without a single widget: capture policy,
+    dedupe index, writer, pruner, backfill, blob store with its media workers
+    and the large-clip path. The window (core.clipboard_manager_tool) and the headless
+    daemon (core.daemon) each run one.
+
+    Every new clip is saved, then announced as clip_added(kind, clip) for
+    whoever lists it. A repeat of a clip listed this session is only saved,
+    as one more copy of it. Once committed, clips_saved([(text, kind), ...]) tells
+    the kind each was stored as. `is_paused()` is asked before each capture. The writer,
+    pruner and backfill use `backend` (a StorageBackend) when given, their own
+    QtSql connections otherwise.
+
+    Nothing runs in the background until start(); clips captured before
+    that wait in the writer's queue.
+    """
+
+    clip_added = QtCore.pyqtSignal(str, object)
+    #? Emitted on the writer thread, queued to the receivers
+    clips_saved = QtCore.pyqtSignal(list)
+
+    def __init__(self, clipboard, parent=None, is_paused=None, backend=None):
+        super().__init__(parent)
+        self.is_paused = is_paused or (lambda: False)
+        self.backend = backend
+
+        #? Hash-keyed "seen before?" index, replaces scanning lists of every clip text
+        self.dedupe = DedupeIndex()
+        #? Background writer, clips are committed in batches off the GUI thread
+        self.writer = ClipboardWriter(dedupe=self.dedupe, backend=backend, on_saved=self.clips_saved.emit)
+        #? Images and file lists are kept as files, stored and thumbnailed on worker threads
+        self.blob_store = BlobStore()
+        self.media = MediaIngest(self.blob_store, self)
+        #? Retention limits from config.py, enforced in small batches in the background
+        self.pruner = HistoryPruner(blob_store=self.blob_store, backend=backend)
+        #? Kinds and fingerprints for texts saved before they existed, once, in small batches in the background
+        self.backfill = ContentBackfill(backend=backend)
+        #? Copies above LARGE_CLIP_CHARS are hashed and saved on a worker
+        self.large_ingest = LargeClipIngest(self.writer, self.dedupe, self)
+
+        #? Clipboard and primary selection events are debounced and filtered (config.py) before saving
+        self.capture = ClipboardCapture(clipboard, self)
+        self.capture.captured.connect(self.on_clip_captured)
+        self.capture.captured_payload.connect(self.on_payload_captured)
+        self.capture.captured_large.connect(self.on_large_clip_captured)
+
+    def start(self):
+        """Start the writer, pruner and backfill threads and load the dedupe filter"""
+        self.writer.start()
+        self.pruner.start()
+        self.backfill.start()
+        #? Bloom filter over stored hashes, read from the file (or the database) in the background
+        threading.Thread(target=self._load_dedupe, name="dedupe-load", daemon=True).start()
+
+    def _load_dedupe(self):
+        if self.backend is not None:
+            self.dedupe.load(self.backend)
+            self.backend.close()
+            return
+        # Not a stdlib SqliteBackend: QtSql bundles its own SQLite, and closing a connection of the
+        # other library drops the POSIX locks of this process's Qt connections (SQLite then deletes
+        # the live -wal file). Imported here so a pipeline given a backend never loads QtSql.
+        from Db.database import thread_connection_name, close_thread_connection
+        from Db.repository import get_repository
+        repository = get_repository(thread_connection_name())
+        if repository:
+            self.dedupe.load(repository)
+        del repository
+        close_thread_connection()
+
+    def on_clip_captured(self, text, source):
+        """Text that passed the capture policy, from the clipboard or the primary selection"""
+        if self.is_paused():
+            return
+        item_hash = content_hash(text)
+        if self.dedupe.in_session(item_hash):
+            # Listed already, the writer counts the copy
+            self.writer.submit(text, item_hash=item_hash)
+            return
+        if source == SOURCE_SELECTION:
+            logger.debug(f"New selection text: {text[:30]}...")
+        self.dedupe.remember(item_hash)
+        # The inserts happen on the writer thread, a known text is not stored again
+        # and repeats on the same day are dropped by the unique indexes
+        self.writer.submit(text, item_hash=item_hash)
+        self.clip_added.emit(CLIP_TEXT, text)
+
+    def on_payload_captured(self, payload, source):
+        """An image or file list copy, stored in the blob store off the GUI thread"""
+        if self.is_paused():
+            return
+        self.media.ingest(payload, self._on_payload_stored)
+
+    def _on_payload_stored(self, clip):
+        if clip is None or self.is_paused():
+            return
+        self.writer.submit(clip.text, item_hash=clip.content_hash, blob=(clip.mime_type, clip.blob_hash))
+        if self.dedupe.in_session(clip.content_hash):
+            return  # listed already, the writer counts the copy
+        self.dedupe.remember(clip.content_hash)
+        self.clip_added.emit(CLIP_RICH, clip)
+
+    def on_large_clip_captured(self, text, source):
+        """A copy above LARGE_CLIP_CHARS, hashed, deduped and queued for saving off the GUI thread"""
+        if self.is_paused():
+            return
+        self.large_ingest.ingest(text, self._on_large_clip_stored)
+
+    def _on_large_clip_stored(self, clip):
+        if clip is None:
+            return  # a repeat, or could not be queued
+        self.clip_added.emit(CLIP_LARGE, clip)
+
+    def forget_session(self):
+        """Clips listed so far may be captured again, e.g. after the list was cleared"""
+        self.dedupe.clear_session()
+        self.capture.forget_last()
+
+    def stats(self):
+        return {
+            "capture": self.capture.stats(),
+            "writer": self.writer.stats(),
+            "items_pruned": self.pruner.items_pruned,
+            "items_classified": self.backfill.items_classified,
+            "items_fingerprinted": self.backfill.items_fingerprinted,
+        }
+
+    def shutdown(self):
+        logger.info(f"Capture: {self.capture.stats()}")
+        # Large clips still being hashed are handed to the writer before it stops
+        self.large_ingest.shutdown()
+        self.writer.stop()
+        self.dedupe.save()
+        self.pruner.stop()
+        self.backfill.stop()
+        self.media.shutdown()
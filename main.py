@@ -1,16 +1,52 @@
+import time
+#? Startup milestones are measured from here (utils.startup_profile)
+STARTED = time.perf_counter()
+
+import argparse
+import json
 import sys
-from PyQt5.QtWidgets import QApplication # type: ignore
-from core.clipboard_manager_tool import ClipboardManager
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Clipboard Manager")
+    parser.add_argument(
+        "--daemon", action="store_true",
+        help="capture in the background without a window, answering queries on a local socket",
+    )
+    parser.add_argument(
+        "--startup-profile", action="store_true",
+        help="print the startup milestones (ms) as JSON once today's clips are listed, then quit",
+    )
+    #? Anything else (e.g. -platform xcb) is left for Qt
+    args, qt_args = parser.parse_known_args()
+    qt_argv = sys.argv[:1] + qt_args
+
+    from core.daemon_client import daemon_supported, find_daemon
+    if args.daemon and not daemon_supported():
+        parser.error("--daemon needs Unix domain sockets, which this platform does not have")
+
+    if args.daemon:
+        # Imported here so the daemon never loads QtWidgets
+        from utils.log_setup import setup_logging
+        from core.daemon import run_daemon
+        setup_logging()
+        sys.exit(run_daemon(qt_argv))
+
     try:
+        from PyQt5.QtWidgets import QApplication # type: ignore
+        from core.clipboard_manager_tool import ClipboardManager
+        from utils.startup_profile import StartupProfile, MARK_IMPORTS
+
+        startup = StartupProfile(STARTED)
+        startup.mark(MARK_IMPORTS)
         print("Starting Clipboard Manager...")
         # Initialize the application
-        app = QApplication(sys.argv)
-        window = ClipboardManager()
+        app = QApplication(qt_argv)
+        if args.startup_profile:
+            startup.finished.connect(lambda marks: (print(json.dumps(marks)), app.quit()))
+        #? A running daemon already captures, the window then only lists its clips
+        window = ClipboardManager(daemon=find_daemon(), startup=startup)
         window.show()
         sys.exit(app.exec_())
     except Exception as e:
         print(f"An error occurred: {e}")
         sys.exit(1)
-
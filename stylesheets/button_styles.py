@@ -43,4 +43,4 @@ HISTORY_BUTTON_STYLE = """
                         padding-left: 1px;
                         padding-top: 1px;
                 }
-                """
\ No newline at end of file
+                """
@@ -7,6 +7,15 @@ PLACEHOLDER_LABEL_STYLE = """
                 }
                 """
 
+DATE_HEADING_STYLE = """
+            QLabel#date_heading {
+                font: 11pt "MS Shell Dlg 2";
+                background-color: #252525;
+                padding: 5px;
+                color: #34D399;
+            }
+        """
+
 ANIMATION_LABEL_STYLE = """
 background-color: transparent;
 """
@@ -28,4 +37,19 @@ DATA_TEXT_FIELD_STYLE = """
             QLabel:hover {
                 border: 1px solid white;
             }
-        """
\ No newline at end of file
+        """
+
+SEARCH_RESULT_STYLE = """
+            QLabel {
+                font: 10pt "MS Shell Dlg 2";
+                color: rgb(220, 220, 220);
+                background-color: rgb(30, 30, 30);
+                border: 1px solid rgb(75, 75, 75);
+                border-radius: 8px;
+                padding: 5px;
+                margin: 2px;
+            }
+            QLabel:hover {
+                border: 1px solid white;
+            }
+        """
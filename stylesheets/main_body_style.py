@@ -33,3 +33,43 @@ CONTENT_WIDGET_STYLE = """
 background-color: #252525;
 """
 
+CLIP_LIST_STYLE = """
+        QListView {
+                border: none;
+                background-color: #252525;
+                padding: 2px;
+        }
+        """
+
+SEARCH_INPUT_STYLE = """
+        QLineEdit {
+                font: 10pt "MS Shell Dlg 2";
+                color: rgb(248, 248, 248);
+                background-color: rgb(30, 30, 30);
+                border: 1px solid rgb(75, 75, 75);
+                border-radius: 8px;
+                padding: 4px 8px;
+        }
+        QLineEdit:focus {
+                border: 1px solid rgb(33, 193, 116);
+        }
+        """
+
+KIND_FILTER_STYLE = """
+        QComboBox {
+                font: 10pt "MS Shell Dlg 2";
+                color: rgb(248, 248, 248);
+                background-color: rgb(30, 30, 30);
+                border: 1px solid rgb(75, 75, 75);
+                border-radius: 8px;
+                padding: 4px 8px;
+        }
+        QComboBox:focus {
+                border: 1px solid rgb(33, 193, 116);
+        }
+        QComboBox QAbstractItemView {
+                color: rgb(248, 248, 248);
+                background-color: rgb(30, 30, 30);
+                selection-background-color: rgb(33, 193, 116);
+        }
+        """
@@ -1,5 +1,5 @@
 from PyQt5 import QtCore, QtGui, QtWidgets # type: ignore
-from utils.clippad_text_resize import ElidedLabel # type: ignore
+from utils.clip_list import ClipListView
 from PyQt5.QtGui import QIcon # type: ignore
 from PyQt5.QtCore import Qt # type: ignore
 
@@ -104,13 +104,13 @@ class Ui_MainWindow(object):
         
         MainWindow.setObjectName("MainWindow")
         # MainWindow.resize(476, 551)
-        MainWindow.resize(476, 587)  # Increased to accommodate title bar
+        MainWindow.resize(476, 627)  # Increased to accommodate title bar and search box
         
         # Instead of fixed size, use minimum size
-        MainWindow.setMinimumSize(QtCore.QSize(476, 587))
+        MainWindow.setMinimumSize(QtCore.QSize(476, 627))
         
         # Optional: Set maximum size to same value to mimic fixed size
-        MainWindow.setMaximumSize(QtCore.QSize(476, 587))
+        MainWindow.setMaximumSize(QtCore.QSize(476, 627))
         icon_path = self.resource_path("assets/restore_gif.gif")  # Path to your icon file
         MainWindow.setStyleSheet(MAIN_WINDOW_STYLE)
         self.centralwidget = QtWidgets.QWidget(MainWindow)
@@ -146,10 +146,9 @@ class Ui_MainWindow(object):
         self.restore_button.setText("")  # No text
         self.restore_button.setObjectName("restore_button")
 
-        # Create animation label (for GIF)
+        # Create animation label (for GIF), its QMovie is built on the first restore
         self.animation_label = QtWidgets.QLabel(self.centralwidget)
-        self.animation_movie = QtGui.QMovie(icon_path)
-        self.animation_label.setMovie(self.animation_movie)
+        self.animation_movie = None
         self.animation_label.resize(40, 40)
         self.animation_label.setStyleSheet(ANIMATION_LABEL_STYLE)  # Make it transparent
         self.animation_label.move(238, 47)  # Moved down by 35px
@@ -182,9 +181,23 @@ class Ui_MainWindow(object):
         self.line_seperator.setObjectName("line_seperator")
         self.line_seperator.setStyleSheet(LINE_SEPARATOR_STYLE)
 
+        # Search box (full-text search over all history)
+        self.search_input = QtWidgets.QLineEdit(self.centralwidget)
+        self.search_input.setGeometry(QtCore.QRect(10, 112, 361, 32))
+        self.search_input.setClearButtonEnabled(True)
+        self.search_input.setStyleSheet(SEARCH_INPUT_STYLE)
+        self.search_input.setObjectName("search_input")
+
+        # Kind filter for search results and the History timeline, items are added by the manager
+        self.kind_filter = QtWidgets.QComboBox(self.centralwidget)
+        self.kind_filter.setGeometry(QtCore.QRect(381, 112, 90, 32))
+        self.kind_filter.setCursor(QtGui.QCursor(QtCore.Qt.PointingHandCursor))
+        self.kind_filter.setStyleSheet(KIND_FILTER_STYLE)
+        self.kind_filter.setObjectName("kind_filter")
+
         # Scroll Area for Dynamic Labels
         self.scroll_area = QtWidgets.QScrollArea(self.centralwidget)
-        self.scroll_area.setGeometry(QtCore.QRect(10, 115, 461, 450))  # Moved down by 35px
+        self.scroll_area.setGeometry(QtCore.QRect(10, 155, 461, 450))  # Moved down by 40px for the search box
         self.scroll_area.setWidgetResizable(True)
         self.scroll_area.setStyleSheet(SCROLL_AREA_STYLE)
         self.scroll_area.setObjectName("scroll_area")
@@ -203,29 +216,50 @@ class Ui_MainWindow(object):
         self.content_layout.setSpacing(8)
         self.content_layout.setContentsMargins(5, 5, 5, 5)
 
-        # Add vertical spacer above and below to center the label
-        spacer_top = QtWidgets.QSpacerItem(20, 40, QtWidgets.QSizePolicy.Minimum, QtWidgets.QSizePolicy.Expanding)
-        spacer_bottom = QtWidgets.QSpacerItem(20, 40, QtWidgets.QSizePolicy.Minimum, QtWidgets.QSizePolicy.Expanding)
-
-        
-
-        # Placeholder Label
-        self.placeholder_label = QtWidgets.QLabel("Nothing Here\nYou'll see your clipboard history once you copied something..", self.content_widget)
-        self.placeholder_label.setAlignment(QtCore.Qt.AlignCenter)
-        self.placeholder_label.setWordWrap(True)
-        self.placeholder_label.setObjectName("placeholder_label")
-        self.placeholder_label.setStyleSheet(
-                PLACEHOLDER_LABEL_STYLE
-        )
-        self.content_layout.addItem(spacer_top)
-        self.content_layout.addWidget(self.placeholder_label)
-        self.content_layout.addItem(spacer_bottom)
-
         # Add stretch to push content to top when items are added
         self.content_layout.addStretch()
 
         # Set content widget in scroll area
         self.scroll_area.setWidget(self.content_widget)
+        # The History view, today's clips (and a day picked on the calendar) are in the clip list
+        self.scroll_area.hide()
+
+        # Clip list, a model painted row by row: only the rows on screen cost anything
+        self.clip_list_area = QtWidgets.QWidget(self.centralwidget)
+        self.clip_list_area.setGeometry(QtCore.QRect(10, 155, 461, 450))
+        self.clip_list_area.setStyleSheet(CONTENT_WIDGET_STYLE)
+        self.clip_list_area.setObjectName("clip_list_area")
+        clip_list_layout = QtWidgets.QVBoxLayout(self.clip_list_area)
+        clip_list_layout.setSpacing(0)
+        clip_list_layout.setContentsMargins(0, 0, 0, 0)
+
+        # Date heading, only shown for a day picked on the calendar
+        self.clip_list_heading = QtWidgets.QLabel(self.clip_list_area)
+        self.clip_list_heading.setObjectName("date_heading")
+        self.clip_list_heading.setStyleSheet(DATE_HEADING_STYLE)
+        self.clip_list_heading.hide()
+        clip_list_layout.addWidget(self.clip_list_heading)
+
+        self.clip_list = ClipListView(MainWindow, self.clip_list_area)
+        self.clip_list.setObjectName("clip_list")
+        clip_list_layout.addWidget(self.clip_list)
+
+        # Search results share the history area and replace it while a query is typed
+        self.search_results_area = QtWidgets.QScrollArea(self.centralwidget)
+        self.search_results_area.setGeometry(QtCore.QRect(10, 155, 461, 450))
+        self.search_results_area.setWidgetResizable(True)
+        self.search_results_area.setStyleSheet(SCROLL_AREA_STYLE)
+        self.search_results_area.verticalScrollBar().setStyleSheet(SCROLL_BAR_STYLE)
+        self.search_results_area.setObjectName("search_results_area")
+
+        self.search_results_widget = QtWidgets.QWidget()
+        self.search_results_widget.setStyleSheet(CONTENT_WIDGET_STYLE)
+        self.search_results_layout = QtWidgets.QVBoxLayout(self.search_results_widget)
+        self.search_results_layout.setAlignment(QtCore.Qt.AlignTop)
+        self.search_results_layout.setSpacing(8)
+        self.search_results_layout.setContentsMargins(5, 5, 5, 5)
+        self.search_results_area.setWidget(self.search_results_widget)
+        self.search_results_area.hide()
 
         MainWindow.setCentralWidget(self.centralwidget)
 
@@ -238,6 +272,8 @@ class Ui_MainWindow(object):
         self.header_name.setText(_translate("MainWindow", "Clipboard Data"))
         self.clearall_button.setText(_translate("MainWindow", "Clear All"))
         self.history_button.setText(_translate("MainWindow", "History"))
+        self.search_input.setPlaceholderText(_translate("MainWindow", "Search history…  \"exact phrase\"  prefix*"))
+        self.kind_filter.setToolTip(_translate("MainWindow", "Show only clips of one type in search results and the History timeline"))
     
 
     def resource_path(self,relative_path):
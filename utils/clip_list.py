@@ -0,0 +1,334 @@
+from PyQt5 import QtWidgets, QtCore, QtGui # type: ignore
+from PyQt5.QtWidgets import QApplication # type: ignore
+import logging
+
+from stylesheets.main_body_style import CLIP_LIST_STYLE, SCROLL_BAR_STYLE
+from utils.clippad_text_resize import elided_lines
+
+logger = logging.getLogger('clipboard_manager')
+
+#? What a row lists: a text clip, the preview of a large clip (the full text is loaded
+#? when it is clicked), the description of an image clip or the URLs of a file list.
+#? Timeline rows may also be a date heading or a group of similar clips, expanded when clicked
+ENTRY_TEXT = "text"
+ENTRY_LARGE = "large"
+ENTRY_IMAGE = "image"
+ENTRY_FILES = "files"
+ENTRY_HEADING = "heading"
+ENTRY_GROUP = "group"
+
+EntryRole = QtCore.Qt.UserRole + 1
+
+#? Every row is this many lines tall, so the view never has to measure a row to lay out the list
+ROW_LINES = 2
+#? Box of a row, as DATA_TEXT_FIELD_STYLE drew the per-clip labels: margin, then a 1px border, then padding
+ROW_MARGIN = 3
+ROW_PADDING = 6
+ROW_RADIUS = 8
+ROW_FONT = ("MS Shell Dlg 2", 11)
+ROW_BACKGROUND = QtGui.QColor(30, 30, 30)
+ROW_BORDER = QtGui.QColor(75, 75, 75)
+ROW_BORDER_HOVER = QtGui.QColor(255, 255, 255)
+ROW_BORDER_COPIED = QtGui.QColor(33, 193, 116)
+ROW_TEXT = QtGui.QColor(255, 255, 255)
+PLACEHOLDER_TEXT = QtGui.QColor(150, 150, 150)
+#? Heading and group rows are one line of green text, as the timeline's date labels were
+LABEL_TEXT = QtGui.QColor(52, 211, 153)
+LABEL_INDENT = 8
+COPY_FEEDBACK_MS = 1000
+
+
+class ClipEntry:
+    """One listed clip, what a row of ClipListModel holds instead of a widget"""
+
+    def __init__(self, text, kind=ENTRY_TEXT, content_hash=None, blob_hash=None, members=None):
+        self.text = text
+        self.kind = kind
+        self.content_hash = content_hash
+        self.blob_hash = blob_hash
+        #? Entries folded into an ENTRY_GROUP row, None once it is expanded
+        self.members = members
+        self.copied = False
+
+
+class ClipListModel(QtCore.QAbstractListModel):
+    """Listed clips, newest first: row 0 is the top of the list"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._entries = []
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self._entries)
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        entry = self._entries[index.row()]
+        if role == EntryRole:
+            return entry
+        if role == QtCore.Qt.DisplayRole:
+            return entry.text
+        if role == QtCore.Qt.ToolTipRole and entry.kind == ENTRY_IMAGE:
+            return entry.text
+        return None
+
+    def entries(self):
+        return list(self._entries)
+
+    def insert(self, row, entries):
+        """Insert `entries` (newest first) so the first of them ends up at `row`"""
+        if not entries:
+            return
+        self.beginInsertRows(QtCore.QModelIndex(), row, row + len(entries) - 1)
+        self._entries[row:row] = entries
+        self.endInsertRows()
+
+    def append(self, entries):
+        self.insert(len(self._entries), entries)
+
+    def reset(self, entries):
+        self.beginResetModel()
+        self._entries = list(entries)
+        self.endResetModel()
+
+    def clear(self):
+        self.reset([])
+
+    def expand(self, group):
+        """Replace the row of an ENTRY_GROUP `group` with its members"""
+        try:
+            row = self._entries.index(group)
+        except ValueError:
+            return
+        members, group.members = group.members or [], None
+        self.beginRemoveRows(QtCore.QModelIndex(), row, row)
+        del self._entries[row]
+        self.endRemoveRows()
+        self.insert(row, members)
+
+    def entry_changed(self, entry):
+        """Repaint the row of `entry`, if it is still listed"""
+        try:
+            row = self._entries.index(entry)
+        except ValueError:
+            return
+        index = self.index(row)
+        self.dataChanged.emit(index, index)
+
+
+class ClipItemDelegate(QtWidgets.QStyledItemDelegate):
+    """
+    Paints a row the way DATA_TEXT_FIELD_STYLE drew the per-clip labels: a rounded
+    box with the start of the clip, elided after ROW_LINES lines. Only rows on
+    screen are painted, their lines come from the elided_lines() cache. Heading
+    and group rows are a single line of text, shorter than a clip row.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.font = QtGui.QFont(*ROW_FONT)
+        self.metrics = QtGui.QFontMetrics(self.font)
+        inset = ROW_MARGIN + 1 + ROW_PADDING
+        self.row_height = ROW_LINES * self.metrics.lineSpacing() + 2 * inset
+        self.label_height = self.metrics.lineSpacing() + 2 * ROW_PADDING
+
+    def sizeHint(self, option, index):
+        entry = index.data(EntryRole)
+        if entry is not None and entry.kind in (ENTRY_HEADING, ENTRY_GROUP):
+            return QtCore.QSize(option.rect.width(), self.label_height)
+        return QtCore.QSize(option.rect.width(), self.row_height)
+
+    def paint(self, painter, option, index):
+        entry = index.data(EntryRole)
+        if entry is None:
+            return
+        if entry.kind in (ENTRY_HEADING, ENTRY_GROUP):
+            self._paint_label(painter, option, entry)
+            return
+        painter.save()
+        painter.setRenderHint(QtGui.QPainter.Antialiasing)
+        box = QtCore.QRectF(option.rect).adjusted(ROW_MARGIN + 0.5, ROW_MARGIN + 0.5, -ROW_MARGIN - 0.5, -ROW_MARGIN - 0.5)
+        if entry.copied:
+            border = ROW_BORDER_COPIED
+        elif option.state & QtWidgets.QStyle.State_MouseOver:
+            border = ROW_BORDER_HOVER
+        else:
+            border = ROW_BORDER
+        painter.setPen(QtGui.QPen(border, 1))
+        painter.setBrush(ROW_BACKGROUND)
+        painter.drawRoundedRect(box, ROW_RADIUS, ROW_RADIUS)
+
+        content = option.rect.adjusted(
+            ROW_MARGIN + 1 + ROW_PADDING, ROW_MARGIN + 1 + ROW_PADDING,
+            -ROW_MARGIN - 1 - ROW_PADDING, -ROW_MARGIN - 1 - ROW_PADDING,
+        )
+        if entry.kind == ENTRY_IMAGE:
+            pixmap = option.widget.thumbnail(entry) if option.widget is not None else None
+            if pixmap is not None and not pixmap.isNull():
+                size = pixmap.size().scaled(content.size(), QtCore.Qt.KeepAspectRatio)
+                painter.setRenderHint(QtGui.QPainter.SmoothPixmapTransform)
+                painter.drawPixmap(QtCore.QRect(content.topLeft(), size), pixmap)
+                content.setLeft(content.left() + size.width() + ROW_PADDING)
+
+        painter.setFont(self.font)
+        painter.setPen(ROW_TEXT)
+        line_height = self.metrics.lineSpacing()
+        for i, line in enumerate(elided_lines(entry.text, self.font, content.width(), ROW_LINES)):
+            painter.drawText(
+                QtCore.QRect(content.left(), content.top() + i * line_height, content.width(), line_height),
+                QtCore.Qt.AlignLeft | QtCore.Qt.AlignVCenter, line,
+            )
+        painter.restore()
+
+    def _paint_label(self, painter, option, entry):
+        painter.save()
+        indent = LABEL_INDENT if entry.kind == ENTRY_GROUP else 0
+        hovered = entry.kind == ENTRY_GROUP and option.state & QtWidgets.QStyle.State_MouseOver
+        painter.setFont(self.font)
+        painter.setPen(ROW_TEXT if hovered else LABEL_TEXT)
+        painter.drawText(
+            option.rect.adjusted(ROW_MARGIN + indent, 0, -ROW_MARGIN, 0),
+            QtCore.Qt.AlignLeft | QtCore.Qt.AlignVCenter,
+            self.metrics.elidedText(entry.text, QtCore.Qt.ElideRight, option.rect.width() - 2 * ROW_MARGIN - indent),
+        )
+        painter.restore()
+
+
+class ClipListView(QtWidgets.QListView):
+    """
+    The listed clips: a ClipListModel painted by ClipItemDelegate, so the cost of
+    the list does not grow with the number of clips. Clicking a row copies its clip
+    back, like the per-clip labels did: a text as-is (without capturing it again
+    while history is shown), a large clip's full text loaded from the database,
+    an image from the blob store, a file list as the files. Clicking a group row
+    lists its clips in its place, heading rows do nothing.
+
+    Rows are one height, so the view never measures them; a list with heading or
+    group rows turns uniformItemSizes off.
+    """
+
+    def __init__(self, manager=None, parent=None):
+        super().__init__(parent)
+        self.manager = manager
+        #? Shown in the middle of the list while it has no rows
+        self.placeholder = ""
+        self._waiting_thumbnails = set()
+        #? Images the media workers could not make a thumbnail of, listed with their description only
+        self._no_thumbnail = set()
+        self.setItemDelegate(ClipItemDelegate(self))
+        self.setUniformItemSizes(True)
+        self.setVerticalScrollMode(QtWidgets.QAbstractItemView.ScrollPerPixel)
+        self.setHorizontalScrollBarPolicy(QtCore.Qt.ScrollBarAlwaysOff)
+        self.setSelectionMode(QtWidgets.QAbstractItemView.NoSelection)
+        self.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        self.setFocusPolicy(QtCore.Qt.NoFocus)
+        self.setFrameShape(QtWidgets.QFrame.NoFrame)
+        self.setMouseTracking(True)
+        self.viewport().setAttribute(QtCore.Qt.WA_Hover)
+        self.viewport().setCursor(QtCore.Qt.PointingHandCursor)
+        self.setStyleSheet(CLIP_LIST_STYLE)
+        self.verticalScrollBar().setStyleSheet(SCROLL_BAR_STYLE)
+        self.verticalScrollBar().setSingleStep(20)
+
+    def entry_at(self, pos):
+        index = self.indexAt(pos)
+        return index.data(EntryRole) if index.isValid() else None
+
+    def thumbnail(self, entry):
+        """The thumbnail of an image row if the media workers have it, else asks for it and repaints on arrival"""
+        blob_hash = entry.blob_hash
+        if self.manager is None or blob_hash is None or blob_hash in self._waiting_thumbnails:
+            return None
+        if blob_hash in self._no_thumbnail:
+            return None
+        self._waiting_thumbnails.add(blob_hash)
+        cached = []
+
+        def ready(pixmap):
+            self._waiting_thumbnails.discard(blob_hash)
+            if pixmap is None:
+                self._no_thumbnail.add(blob_hash)
+            elif cached is not None:
+                cached.append(pixmap)  # answered right away, during this paint
+            else:
+                self.viewport().update()
+        self.manager.media.thumbnail(blob_hash, ready)
+        pixmap = cached[0] if cached else None
+        cached = None
+        return pixmap
+
+    def mousePressEvent(self, event):
+        entry = self.entry_at(event.pos())
+        if event.button() == QtCore.Qt.LeftButton and entry is not None:
+            if entry.kind == ENTRY_GROUP:
+                self.model().expand(entry)
+            elif entry.kind != ENTRY_HEADING:
+                self.copy_entry(entry)
+        super().mousePressEvent(event)
+
+    def copy_entry(self, entry):
+        clipboard = QApplication.clipboard()
+        if entry.kind == ENTRY_IMAGE:
+            data = self.manager.blob_store.read(entry.blob_hash) if self.manager is not None else None
+            image = QtGui.QImage.fromData(data) if data else QtGui.QImage()
+            if image.isNull():
+                return
+            # The image is already in the history, don't capture it again
+            clipboard.blockSignals(True)
+            clipboard.setImage(image)
+            clipboard.blockSignals(False)
+        elif entry.kind == ENTRY_FILES:
+            data = QtCore.QMimeData()
+            data.setUrls([QtCore.QUrl(url) for url in entry.text.splitlines()])
+            # The file list is already in the history, don't capture it again
+            clipboard.blockSignals(True)
+            clipboard.setMimeData(data)
+            clipboard.blockSignals(False)
+        elif entry.kind == ENTRY_LARGE and self.manager is not None:
+            content_hash = entry.content_hash
+            self.manager.loader.run(
+                lambda repository: repository.load_content(content_hash),
+                lambda text: self._copy_full_text(entry, text),
+            )
+        elif self.manager is not None and self.manager.is_history_button_clicked:
+            # Only copy to clipboard without triggering new save
+            clipboard.blockSignals(True)
+            clipboard.setText(entry.text)
+            clipboard.blockSignals(False)
+        else:
+            clipboard.setText(entry.text)
+        self.flash(entry)
+
+    def _copy_full_text(self, entry, text):
+        if text is None:
+            logger.error("Large clip is not saved yet, copying its preview")
+            text = entry.text
+        clipboard = QApplication.clipboard()
+        # Already in the history, copying it back must not ingest it again
+        clipboard.blockSignals(True)
+        clipboard.setText(text)
+        clipboard.blockSignals(False)
+
+    def flash(self, entry):
+        """Green border on the copied row for COPY_FEEDBACK_MS"""
+        model = self.model()
+        entry.copied = True
+        model.entry_changed(entry)
+
+        def revert():
+            entry.copied = False
+            model.entry_changed(entry)
+        QtCore.QTimer.singleShot(COPY_FEEDBACK_MS, revert)
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        model = self.model()
+        if self.placeholder and (model is None or model.rowCount() == 0):
+            painter = QtGui.QPainter(self.viewport())
+            painter.setFont(QtGui.QFont(*ROW_FONT))
+            painter.setPen(PLACEHOLDER_TEXT)
+            painter.drawText(
+                self.viewport().rect().adjusted(20, 20, -20, -20),
+                QtCore.Qt.AlignCenter | QtCore.Qt.TextWordWrap, self.placeholder,
+            )
@@ -1,101 +1,55 @@
-from PyQt5 import QtWidgets, QtCore, QtGui # type: ignore
-from PyQt5.QtWidgets import QApplication # type: ignore
-from stylesheets.animation_style import *  
+from PyQt5 import QtCore, QtGui # type: ignore
+from collections import OrderedDict
+from config import ELIDE_CACHE_ENTRIES
+
+#? No line shows more characters than this, so only max_lines times as much of a clip is laid out
+LINE_SAMPLE_CHARS = 1000
+#? QTextLayout lays out one paragraph, it breaks the line at this character instead of at '\n'
+LINE_BREAK = '\u2028'
+
+#? (id of the text, width, font, max lines) -> (text, lines), least recently used first.
+#? Holding the text keeps its id from being reused by another one while it is cached
+_layouts = OrderedDict()
+
+
+def elided_lines(text, font, width, max_lines):
+    """
+    The first `max_lines` lines of `text` wrapped at `width` px in `font`, the last
+    one elided with "…" if the text goes on. Only the start of `text` that can
+    show is laid out, and the result is kept for the next paint of the same
+    text object at the same size, found without reading the text.
+    """
+    if not text or width <= 0 or max_lines <= 0:
+        return []
+    key = (id(text), width, font.key(), max_lines)
+    cached = _layouts.get(key)
+    if cached is not None:
+        _layouts.move_to_end(key)
+        return cached[1]
+
+    sample = text[:max_lines * LINE_SAMPLE_CHARS].replace('\n', LINE_BREAK)
+    layout = QtGui.QTextLayout(sample, font)
+    option = QtGui.QTextOption()
+    option.setWrapMode(QtGui.QTextOption.WrapAtWordBoundaryOrAnywhere)
+    layout.setTextOption(option)
+    layout.beginLayout()
+    starts = []
+    # Lines past max_lines are never created, whatever the length of the sample
+    while len(starts) < max_lines:
+        line = layout.createLine()
+        if not line.isValid():
+            break
+        line.setLineWidth(width)
+        starts.append((line.textStart(), line.textLength()))
+    layout.endLayout()
+
+    lines = [sample[start:start + length].rstrip(' ' + LINE_BREAK) for start, length in starts[:-1]]
+    if starts:
+        # The last line takes whatever is left and is cut with "…" if it doesn't fit
+        rest = sample[starts[-1][0]:].replace(LINE_BREAK, ' ')
+        lines.append(QtGui.QFontMetrics(font).elidedText(rest, QtCore.Qt.ElideRight, width))
+    _layouts[key] = (text, lines)
+    if len(_layouts) > ELIDE_CACHE_ENTRIES:
+        _layouts.popitem(last=False)
+    return lines
 
-class ElidedLabel(QtWidgets.QLabel):
-    def __init__(self, manager=None, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.setTextFormat(QtCore.Qt.PlainText)
-        self.setWordWrap(True)
-        self.setSizePolicy(QtWidgets.QSizePolicy.Ignored, QtWidgets.QSizePolicy.Ignored)
-        self._original_text = ""
-        self._paddings = (0, 0)
-        self._max_lines = 3  # Show up to 3 lines
-        self.setStyleSheet("padding: 5px;")
-        self.setCursor(QtCore.Qt.PointingHandCursor)  # Optional: Set cursor on init
-        self.manager = manager
-
-    def setOriginalText(self, text):
-        self._original_text = text
-        self.update_elided_text()
-
-    def setTextPadding(self, left=0, right=0):
-        self._paddings = (left, right)
-        self.update_elided_text()
-
-    def setMaxLines(self, lines):
-        self._max_lines = lines
-        self.update_elided_text()
-
-    def resizeEvent(self, event):
-        self.update_elided_text()
-        return super().resizeEvent(event)
-
-    def update_elided_text(self):
-        if not self._original_text or self.width() <= 0:
-            self.setText("")
-            return
-
-        metrics = QtGui.QFontMetrics(self.font())
-        available_width = self.width() - self._paddings[0] - self._paddings[1]
-        line_spacing = metrics.lineSpacing()
-        max_height = line_spacing * self._max_lines
-
-        lines = []
-        paragraphs = self._original_text.split('\n')
-
-        for para in paragraphs:
-            words = para.split(' ')
-            current_line = ""
-
-            for word in words:
-                test_line = current_line + (" " if current_line else "") + word
-                if metrics.width(test_line) > available_width:
-                    if current_line:
-                        lines.append(current_line)
-                        current_line = word
-                    else:
-                        # Word too long, break it
-                        lines.append(word[:int(available_width / metrics.averageCharWidth()) - 1])
-                        word = word[int(available_width / metrics.averageCharWidth()) - 1:]
-                else:
-                    current_line = test_line
-            if current_line:
-                lines.append(current_line)
-                current_line = ""
-
-            if len(lines) * line_spacing >= max_height:
-                break  # Stop after reaching max lines
-
-        # Truncate to max allowed lines
-        lines = lines[:int(max_height / line_spacing)]
-
-        self.setText("\n".join(lines))
-    
-    def mousePressEvent(self, event):
-        if event.button() == QtCore.Qt.LeftButton and self._original_text:
-            clipboard = QApplication.clipboard()
-
-            if self.manager and self.manager.is_history_button_clicked:
-                # Only copy to clipboard without triggering new save
-                clipboard.blockSignals(True)  # Prevent triggering on_clipboard_changed
-                clipboard.setText(self._original_text)
-                clipboard.blockSignals(False)
-                print(f"[History Mode] Copied: {self._original_text}")
-            else:
-                clipboard.setText(self._original_text)
-                print(f"[Normal Mode] Copied: {self._original_text}")
-
-            self.animate_copy_feedback()
-        
-        super().mousePressEvent(event)
-    
-    def animate_copy_feedback(self):
-        # Change border color to green indicate success
-        self.setStyleSheet(ANIMATE_COPY_FEEDBACK)
-
-        # Revert back after 1 second
-        QtCore.QTimer.singleShot(1000, self.revert_style)
-    
-    def revert_style(self):
-        self.setStyleSheet(REVERT_STYLE)
\ No newline at end of file
@@ -0,0 +1,16 @@
+import hashlib
+
+def content_hash(text):
+    """SHA-256 hex digest of clipboard text, used as the dedupe key in the DB"""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+def blob_content_hash(mime_type, blob_hash):
+    """Dedupe key of a clip stored in the blob store, never equal to the key of a plain text"""
+    return hashlib.sha256(f"{mime_type}\0{blob_hash}".encode('utf-8')).hexdigest()
+
+def content_hash_chunked(text, chunk_chars):
+    """content_hash(text) without encoding the whole text at once, for very large clips"""
+    digest = hashlib.sha256()
+    for start in range(0, len(text), chunk_chars):
+        digest.update(text[start:start + chunk_chars].encode('utf-8'))
+    return digest.hexdigest()
@@ -0,0 +1,89 @@
+import json
+import re
+
+from config import CLASSIFY_SAMPLE_CHARS
+
+#? Value of contents.kind, set once when a clip is first saved (Db.writer)
+KIND_TEXT = "text"
+KIND_URL = "url"
+KIND_CODE = "code"
+KIND_JSON = "json"
+KIND_IMAGE = "image"
+KIND_FILES = "files"
+KIND_HTML = "html"
+
+#? In the order the kind filter lists them
+KINDS = (KIND_TEXT, KIND_URL, KIND_CODE, KIND_JSON, KIND_IMAGE, KIND_FILES, KIND_HTML)
+KIND_LABELS = {
+    KIND_TEXT: "Text",
+    KIND_URL: "Links",
+    KIND_CODE: "Code",
+    KIND_JSON: "JSON",
+    KIND_IMAGE: "Images",
+    KIND_FILES: "Files",
+    KIND_HTML: "HTML",
+}
+
+#? Blob store payloads are classified by their format alone
+_MIME_KINDS = {
+    "image/png": KIND_IMAGE,
+    "text/uri-list": KIND_FILES,
+    "text/html": KIND_HTML,
+}
+
+# One or more links and nothing else, one per line
+_URL_RE = re.compile(r'(?:(?:[a-z][a-z0-9+.-]*://|www\.|mailto:)\S+\s*)+', re.IGNORECASE)
+# Just the start of a JSON value, for texts too long to parse
+_JSON_START_RE = re.compile(r'[\[{]\s*(?:"|[\[\]{}]|-?\d|true\b|false\b|null\b)')
+# Lines only code starts like this, each counts twice
+_CODE_STRONG_RE = re.compile(
+    r'^\s*(?:'
+    r'def \w+\s*\(|class \w+\s*[:({<]|from [\w.]+ import |import [\w.]+\s*$|'
+    r'function\s*\w*\s*\(|(?:const|let|var) \w+\s*=|#include\s*[<"]|#!/|'
+    r'(?:public|private|protected|static)\s+[\w<>\[\]]+\s+\w+|'
+    r'(?:if|for|while|switch|catch)\s*\(.*\)\s*\{|'
+    r'SELECT\s.+\sFROM\s|CREATE (?:TABLE|INDEX|VIEW)\s'
+    r')',
+    re.MULTILINE,
+)
+# Lines that look like code but also turn up in prose: statement ends, assignments, comments
+_CODE_WEAK_RE = re.compile(
+    r'(?:[;{}]\s*$|^\s*[\w.\[\]]+\s*[-+*/]?=\s*\S|^\s*(?:#|//)\s)',
+    re.MULTILINE,
+)
+
+
+def classify(text, mime_type=None):
+    """
+    The kind (KIND_*) of a clip. Only the first CLASSIFY_SAMPLE_CHARS characters
+    are looked at, so a huge clip costs the same as a short one.
+    """
+    kind = _MIME_KINDS.get(mime_type)
+    if kind is not None:
+        return kind
+
+    sample = text[:CLASSIFY_SAMPLE_CHARS].strip()
+    if not sample:
+        return KIND_TEXT
+    if _URL_RE.fullmatch(sample):
+        return KIND_URL
+    if _is_json(text, sample):
+        return KIND_JSON
+
+    score = 2 * len(_CODE_STRONG_RE.findall(sample)) + len(_CODE_WEAK_RE.findall(sample))
+    if score >= 2:
+        return KIND_CODE
+    return KIND_TEXT
+
+
+def _is_json(text, sample):
+    """An object or array, parsed when it is short enough, otherwise judged by how it starts and ends"""
+    if sample[0] not in "[{" or not _JSON_START_RE.match(sample):
+        return False
+    if len(text) > CLASSIFY_SAMPLE_CHARS:
+        return text[-CLASSIFY_SAMPLE_CHARS:].rstrip()[-1:] in ("]", "}")
+    try:
+        json.loads(sample)
+    except ValueError:
+        return False
+    return True
@@ -0,0 +1,64 @@
+import os
+import sys
+import logging
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+
+
+def setup_logging():
+    try:
+        # Get the application's base directory (works in both script and frozen app)
+        if getattr(sys, 'frozen', False):
+            # If the application is frozen (compiled with PyInstaller)
+            base_dir = os.path.dirname(sys.executable)
+        else:
+            # If running as a normal Python script
+            base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        
+        # Create logs directory
+        logs_dir = os.path.join(base_dir, "sys-logs")
+        if not os.path.exists(logs_dir):
+            os.makedirs(logs_dir)
+        
+        # Log file path with date
+        today = datetime.now().strftime("%Y-%m-%d")
+        log_file = os.path.join(logs_dir, f"clipboard-manager-{today}.log")
+        
+        # Configure logger
+        logger = logging.getLogger('clipboard_manager')
+        logger.setLevel(logging.DEBUG)
+        
+        # Clear any existing handlers (avoid duplicate logs)
+        if logger.hasHandlers():
+            logger.handlers.clear()
+        
+        # Create file handler with rotation
+        file_handler = RotatingFileHandler(log_file, maxBytes=5*1024*1024, backupCount=3)
+        file_handler.setLevel(logging.DEBUG)
+        
+        # Create console handler
+        console_handler = logging.StreamHandler()
+        console_handler.setLevel(logging.DEBUG)
+        
+        # Create formatter and add it to handlers
+        formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+        file_handler.setFormatter(formatter)
+        console_handler.setFormatter(formatter)
+        
+        # Add handlers to logger
+        logger.addHandler(file_handler)
+        logger.addHandler(console_handler)
+        
+        # Log the paths to help debug
+        logger.info(f"Application directory: {base_dir}")
+        logger.info(f"Log file location: {log_file}")
+        
+        return logger
+    except Exception as e:
+        # If there's an error with logging setup, create a simple fallback
+        print(f"Error setting up logging: {e}")
+        fallback_logger = logging.getLogger('clipboard_manager_fallback')
+        fallback_logger.addHandler(logging.StreamHandler())
+        fallback_logger.setLevel(logging.DEBUG)
+        fallback_logger.error(f"Failed to set up file logging: {e}")
+        return fallback_logger
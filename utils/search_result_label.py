@@ -0,0 +1,63 @@
+from PyQt5 import QtWidgets, QtCore, QtGui # type: ignore
+from PyQt5.QtWidgets import QApplication # type: ignore
+from stylesheets.animation_style import ANIMATE_COPY_FEEDBACK
+from stylesheets.label_text_style import SEARCH_RESULT_STYLE
+from utils.clip_list import ENTRY_TEXT, ENTRY_IMAGE, ENTRY_FILES
+
+
+class SearchResultLabel(QtWidgets.QLabel):
+    """
+    One search hit: date line plus highlighted snippet, click copies the full clip.
+    `kind` is a utils.clip_list entry kind and the copy is made the way the clip
+    list makes it: an ENTRY_IMAGE from `blob_store` by `blob_hash`, an ENTRY_FILES
+    as the files, anything else as its text.
+    """
+
+    def __init__(self, content, date, snippet_html, *args, kind=ENTRY_TEXT, blob_hash=None, blob_store=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._content = content
+        self._kind = kind
+        self._blob_hash = blob_hash
+        self._blob_store = blob_store
+        self.setTextFormat(QtCore.Qt.RichText)
+        self.setWordWrap(True)
+        self.setAlignment(QtCore.Qt.AlignLeft | QtCore.Qt.AlignTop)
+        self.setCursor(QtCore.Qt.PointingHandCursor)
+        self.setObjectName("search_result_label")
+        self.setStyleSheet(SEARCH_RESULT_STYLE)
+        self.setText(f'<span style="color: #888;">{date}</span><br>{snippet_html}')
+
+    def mousePressEvent(self, event):
+        if event.button() == QtCore.Qt.LeftButton and self.copy_clip():
+            self.setStyleSheet(ANIMATE_COPY_FEEDBACK)
+            # A bound method, so the timer is dropped with the label if a new search deletes it first
+            QtCore.QTimer.singleShot(1000, self.end_copy_feedback)
+
+        super().mousePressEvent(event)
+
+    def copy_clip(self):
+        """Put the clip back on the clipboard, False if its image could not be read"""
+        data = None
+        if self._kind == ENTRY_IMAGE:
+            blob = self._blob_store.read(self._blob_hash) if self._blob_store is not None else None
+            image = QtGui.QImage.fromData(blob) if blob else QtGui.QImage()
+            if image.isNull():
+                return False
+        elif self._kind == ENTRY_FILES:
+            data = QtCore.QMimeData()
+            data.setUrls([QtCore.QUrl(url) for url in self._content.splitlines()])
+
+        clipboard = QApplication.clipboard()
+        # Copying an old clip back should not save it again as a new one
+        clipboard.blockSignals(True)
+        if self._kind == ENTRY_IMAGE:
+            clipboard.setImage(image)
+        elif data is not None:
+            clipboard.setMimeData(data)
+        else:
+            clipboard.setText(self._content)
+        clipboard.blockSignals(False)
+        return True
+
+    def end_copy_feedback(self):
+        self.setStyleSheet(SEARCH_RESULT_STYLE)
@@ -0,0 +1,59 @@
+import hashlib
+import re
+
+from config import SIMHASH_SAMPLE_CHARS
+
+#? 64-bit fingerprints, stored in contents.simhash as a signed SQLite INTEGER
+SIMHASH_BITS = 64
+_MASK = (1 << SIMHASH_BITS) - 1
+_SHINGLE = 3
+
+#? (shift, mask) of the bands indexed by migration v12. Two fingerprints within 6 bits of each
+#? other agree on at least one of these 7 bands, so looking them up finds every such pair.
+BANDS = ((0, 511), (9, 511), (18, 511), (27, 511), (36, 511), (45, 511), (54, 1023))
+#? Largest distance those lookups are guaranteed to find every match for
+MAX_INDEXED_DISTANCE = len(BANDS) - 1
+
+_DIGITS_RE = re.compile(r'\d+')
+# Byte -> its 8 bits as 16-bit little-endian counters, see simhash()
+_BIT_COUNTERS = [
+    b"".join(((byte >> bit) & 1).to_bytes(2, "little") for bit in range(8))
+    for byte in range(256)
+]
+
+
+def normalize(text):
+    """Case, runs of whitespace and numbers (timestamps, counters, ids) don't make clips different"""
+    return _DIGITS_RE.sub("0", " ".join(text[:SIMHASH_SAMPLE_CHARS].lower().split()))
+
+
+def simhash(text):
+    """
+    SimHash of the character shingles of normalize(text), signed so SQLite can store it.
+    Texts that differ in a character or two are a few bits apart, unrelated ones about 32.
+    """
+    text = normalize(text)
+    shingles = {text[i:i + _SHINGLE] for i in range(max(1, len(text) - _SHINGLE + 1))}
+    # Every shingle hash is spread into 64 16-bit counters of one big int, so a single
+    # addition per shingle counts all its bits (a sample never has 65536 shingles)
+    total = 0
+    for shingle in shingles:
+        digest = hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest()
+        total += int.from_bytes(b"".join([_BIT_COUNTERS[byte] for byte in digest]), "little")
+    counters = total.to_bytes(SIMHASH_BITS * 2, "little")
+
+    value = 0
+    for bit in range(SIMHASH_BITS):
+        if 2 * int.from_bytes(counters[2 * bit:2 * bit + 2], "little") > len(shingles):
+            value |= 1 << bit
+    return value - (1 << SIMHASH_BITS) if value >> (SIMHASH_BITS - 1) else value
+
+
+def hamming(a, b):
+    """Number of differing bits between two fingerprints"""
+    return bin((a ^ b) & _MASK).count("1")
+
+
+def band_values(value):
+    """The fingerprint's value in each of BANDS, bound to SQL_NEAR_DUPLICATE_CANDIDATES"""
+    return [(value >> shift) & mask for shift, mask in BANDS]
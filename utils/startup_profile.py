@@ -0,0 +1,72 @@
+from PyQt5 import QtCore # type: ignore
+import time
+import logging
+
+logger = logging.getLogger('clipboard_manager')
+
+#? Milestones, in the order they are normally reached: main.py imported the window module,
+#? ClipboardManager was constructed, the window was painted once, the newest of today's clips
+#? are listed, every clip of today is listed (startup is over)
+MARK_IMPORTS = "imports"
+MARK_WINDOW = "window"
+MARK_FIRST_PAINT = "first_paint"
+MARK_FIRST_SCREEN = "first_screen"
+MARK_HISTORY = "history"
+
+#? Deferred work starts anyway if the window is not painted in time (started hidden or minimized)
+DEFERRED_START_TIMEOUT_MS = 2000
+
+
+class StartupProfile(QtCore.QObject):
+    """
+    Startup timeline: each milestone is recorded once, in ms since `started`
+    (perf_counter() taken as the first thing in main.py). The summary is logged
+    when MARK_HISTORY is reached and `finished` is emitted with it, which is
+    what `main.py --startup-profile` prints.
+
+    Work that is not needed for the first screen is registered with
+    after_first_paint() and starts once the window has been painted.
+    """
+
+    finished = QtCore.pyqtSignal(dict)
+
+    def __init__(self, started=None, parent=None):
+        super().__init__(parent)
+        self.started = time.perf_counter() if started is None else started
+        self.marks = {}
+        self._after_paint = []
+        self._deferred_timer = QtCore.QTimer(self)
+        self._deferred_timer.setSingleShot(True)
+        self._deferred_timer.timeout.connect(self._run_deferred)
+
+    def mark(self, name):
+        if name in self.marks:
+            return
+        self.marks[name] = round((time.perf_counter() - self.started) * 1000, 1)
+        if name == MARK_HISTORY:
+            logger.info("Startup (ms): " + ", ".join(f"{key} {value}" for key, value in self.marks.items()))
+            self.finished.emit(dict(self.marks))
+
+    def after_first_paint(self, window, callback):
+        """Run `callback` on the event loop right after `window` is first painted"""
+        if MARK_FIRST_PAINT in self.marks:
+            QtCore.QTimer.singleShot(0, callback)
+            return
+        if not self._after_paint:
+            window.installEventFilter(self)
+            self._deferred_timer.start(DEFERRED_START_TIMEOUT_MS)
+        self._after_paint.append(callback)
+
+    def eventFilter(self, obj, event):
+        if event.type() == QtCore.QEvent.Paint and MARK_FIRST_PAINT not in self.marks:
+            self.mark(MARK_FIRST_PAINT)
+            obj.removeEventFilter(self)
+            # Queued, so the paint in progress reaches the screen first
+            QtCore.QTimer.singleShot(0, self._run_deferred)
+        return False
+
+    def _run_deferred(self):
+        self._deferred_timer.stop()
+        callbacks, self._after_paint = self._after_paint, []
+        for callback in callbacks:
+            callback()
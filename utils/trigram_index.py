@@ -0,0 +1,183 @@
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from math import ceil
+
+from config import FILTER_INDEX_BUDGET_CHARS, FILTER_INDEX_SAMPLE_CHARS, FILTER_MIN_SIMILARITY
+
+#? A query is matched on at most this many of its trigrams, the rarest ones, so a long
+#? query costs no more than a short one
+QUERY_TRIGRAMS = 8
+#? Candidates re-ranked per result asked for, see search()
+_RERANK_FACTOR = 4
+
+
+def _normalize(text):
+    return " ".join(text[:FILTER_INDEX_SAMPLE_CHARS].lower().split())
+
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class TrigramIndex:
+    """
+    In-memory trigram index over the texts listed in the window, for the
+    as-you-type filter: search() ranks them by how many of the query's trigrams
+    they contain, so typos and partial words still match.
+
+    Each text is indexed on its first FILTER_INDEX_SAMPLE_CHARS characters.
+    Texts get increasing ids and every posting list is an array of ids in
+    insertion order, 4 bytes per entry. Once more than `budget_chars` characters
+    are indexed the oldest texts are dropped; their ids are then a prefix of each
+    posting list, cut off in one pass once they make up a quarter of the postings.
+
+    Not thread-safe: build one on a worker and hand it over, or use it from one thread.
+    """
+
+    def __init__(self, budget_chars=FILTER_INDEX_BUDGET_CHARS):
+        self.budget_chars = budget_chars
+        self._postings = {}
+        self._docs = {}  # id -> (normalized sample, text, trigram count, kind)
+        self._ids = {}   # text -> id
+        #? Indexed ids are always the range [_first_id, _next_id), texts are only dropped oldest first
+        self._first_id = 0
+        self._next_id = 0
+        self._chars = 0
+        self._live_postings = 0
+        self._dead_postings = 0
+
+    def __len__(self):
+        return len(self._docs)
+
+    def __contains__(self, text):
+        return text in self._ids
+
+    def texts(self):
+        """Indexed texts, oldest first"""
+        return [text for _, text, _, _ in self._docs.values()]
+
+    def kind_of(self, text):
+        """The kind `text` was added with, None if it is not indexed"""
+        doc_id = self._ids.get(text)
+        return None if doc_id is None else self._docs[doc_id][3]
+
+    def entries(self):
+        """(text, kind) of the indexed texts, oldest first"""
+        return [(text, kind) for _, text, _, kind in self._docs.values()]
+
+    def add(self, text, kind=None):
+        """
+        Index `text` as the newest entry, a text already indexed is left where it is.
+        `kind` is what search() filters on, the utils.content_kind stored with the clip.
+        """
+        if text in self._ids:
+            return
+        sample = _normalize(text)
+        grams = _trigrams(sample)
+        doc_id = self._next_id
+        self._next_id += 1
+        for gram in grams:
+            postings = self._postings.get(gram)
+            if postings is None:
+                postings = self._postings[gram] = array("I")
+            postings.append(doc_id)
+        self._docs[doc_id] = (sample, text, len(grams), kind)
+        self._ids[text] = doc_id
+        self._chars += len(sample)
+        self._live_postings += len(grams)
+
+        while self._chars > self.budget_chars and self._first_id < doc_id:
+            self._evict_oldest()
+
+    def update(self, texts):
+        """add() every text of `texts`, oldest first"""
+        for text in texts:
+            self.add(text)
+
+    def clear(self):
+        self._postings.clear()
+        self._docs.clear()
+        self._ids.clear()
+        self._first_id = self._next_id
+        self._chars = self._live_postings = self._dead_postings = 0
+
+    def search(self, query, limit, where=None, kind=None):
+        """
+        Up to `limit` indexed texts best matching `query`, best first. A text matches
+        when it contains at least FILTER_MIN_SIMILARITY of the query's trigrams;
+        containing the whole query ranks it above any partial match, newer texts
+        win ties. `kind` keeps only texts added with that kind, `where(text)` can reject texts.
+        """
+        needle = _normalize(query)
+        if not needle:
+            return []
+        if len(needle) < 3:
+            return self._scan(needle, limit, where, kind)
+
+        # Rarest first, a missing trigram (a typo) just counts as not matched
+        grams = sorted(_trigrams(needle), key=lambda gram: len(self._postings.get(gram, ())))
+        selected = grams[:QUERY_TRIGRAMS]
+        required = max(1, ceil(len(selected) * FILTER_MIN_SIMILARITY))
+        counts = Counter()
+        for gram in selected:
+            counts.update(self._postings.get(gram, ()))
+
+        # Grouped by trigrams matched, newest first within each group
+        first_id = self._first_id
+        tiers = [[] for _ in range(len(selected) + 1)]
+        for doc_id, matched in reversed(counts.items()):
+            if matched >= required and doc_id >= first_id:
+                tiers[matched].append(doc_id)
+        # Filtered before the cut, or the newest texts of other kinds would crowd out every match
+        candidates = []
+        wanted = limit * _RERANK_FACTOR
+        for matched in range(len(selected), required - 1, -1):
+            for doc_id in tiers[matched]:
+                _, text, _, doc_kind = self._docs[doc_id]
+                if (kind is None or doc_kind == kind) and (where is None or where(text)):
+                    candidates.append((matched, doc_id))
+                    if len(candidates) == wanted:
+                        break
+            if len(candidates) >= wanted:
+                break
+        ranked = sorted(
+            (
+                (matched + (len(selected) if needle in self._docs[doc_id][0] else 0), doc_id)
+                for matched, doc_id in candidates
+            ),
+            reverse=True,
+        )
+        return [self._docs[doc_id][1] for _, doc_id in ranked[:limit]]
+
+    def _scan(self, needle, limit, where, kind):
+        """Queries too short for a trigram: substring match, newest first"""
+        results = []
+        for sample, text, _, doc_kind in reversed(self._docs.values()):
+            if needle in sample and (kind is None or doc_kind == kind) and (where is None or where(text)):
+                results.append(text)
+                if len(results) == limit:
+                    break
+        return results
+
+    def _evict_oldest(self):
+        sample, text, grams, _ = self._docs.pop(self._first_id)
+        self._first_id += 1
+        del self._ids[text]
+        self._chars -= len(sample)
+        self._live_postings -= grams
+        self._dead_postings += grams
+        if self._dead_postings * 4 > self._live_postings:
+            self._compact()
+
+    def _compact(self):
+        """Drop the ids of evicted texts, always the oldest and so a prefix of every posting list"""
+        first_id = self._first_id
+        for gram in list(self._postings):
+            postings = self._postings[gram]
+            dead = bisect_left(postings, first_id)
+            if dead == len(postings):
+                del self._postings[gram]
+            elif dead:
+                del postings[:dead]
+        self._dead_postings = 0